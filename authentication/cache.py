@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from rest_framework_simplejwt.settings import api_settings
+
+USER_KEY_PREFIX = 'auth:user'
+# Enough for permissions and the profile; the password hash is never cached
+CACHED_USER_FIELDS = ('id', 'username', 'email', 'first_name', 'last_name', 'is_active', 'is_staff', 'is_superuser')
+
+
+def user_cache_key(user_id):
+    return f"{USER_KEY_PREFIX}:{user_id}"
+
+
+def cached_field_names():
+    """CACHED_USER_FIELDS in model field order, as Model.from_db expects"""
+    return [field.attname for field in get_user_model()._meta.concrete_fields if field.attname in CACHED_USER_FIELDS]
+
+
+def get_cached_user(user_id):
+    """Return the user with ``user_id`` from the cache, loading it from the primary on a miss.
+
+    The user comes back with the uncached fields deferred: reading them
+    queries the database, and save() only writes the loaded fields.
+    Raises User.DoesNotExist.
+    """
+    user_model = get_user_model()
+    field_names = cached_field_names()
+    key = user_cache_key(user_id)
+    values = cache.get(key)
+    if values is not None:
+        return user_model.from_db(DEFAULT_DB_ALIAS, field_names, values)
+
+    # Read from the primary so a replica cannot put a stale user back in the cache
+    user = user_model._default_manager.using(DEFAULT_DB_ALIAS).only(*field_names).get(
+        **{api_settings.USER_ID_FIELD: user_id}
+    )
+    cache.set(key, [getattr(user, name) for name in field_names], settings.AUTH_USER_CACHE_TIMEOUT)
+    return user
+
+
+def invalidate_cached_user(user_id):
+    """Drop the cached user now and again once the transaction commits,
+    so a concurrent request cannot cache the row as it was before the commit.
+    """
+    key = user_cache_key(user_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
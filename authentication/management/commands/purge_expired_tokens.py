@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from authentication.tokens import purge_expired_tokens
+
+
+class Command(BaseCommand):
+    help = "Delete expired refresh tokens and their blacklist entries in bounded batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--pause', type=float, default=0.1,
+            help="Seconds to sleep between batches, to spread the load on the database"
+        )
+        parser.add_argument(
+            '--interval', type=float, default=None,
+            help="Keep running and purge every INTERVAL seconds instead of once"
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            purged = purge_expired_tokens(batch_size=options['batch_size'], pause=options['pause'])
+            self.stdout.write(f"Purged {purged} expired tokens")
+            if options['interval'] is None:
+                return
+            try:
+                time.sleep(options['interval'])
+            except KeyboardInterrupt:
+                return
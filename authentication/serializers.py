@@ -1,6 +1,10 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
-from django.contrib.auth import authenticate
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer as BaseTokenObtainPairSerializer
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer as BaseTokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from instrumentation.timing import TimedSerializerMixin
+from .tokens import RefreshToken, RotatedRefreshToken
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, min_length=8)
@@ -20,28 +24,31 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         user = User.objects.create_user(**validated_data)
         return user
 
-class UserLoginSerializer(serializers.Serializer):
-    username = serializers.CharField()
-    password = serializers.CharField()
-    
-    def validate(self, attrs):
-        username = attrs.get('username')
-        password = attrs.get('password')
-        
-        if username and password:
-            user = authenticate(username=username, password=password)
-            if not user:
-                raise serializers.ValidationError('Invalid credentials')
-            if not user.is_active:
-                raise serializers.ValidationError('User account is disabled')
-            attrs['user'] = user
-        else:
-            raise serializers.ValidationError('Must include username and password')
-        
-        return attrs
-
-class UserProfileSerializer(serializers.ModelSerializer):
+class UserProfileSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'username', 'email', 'first_name', 'last_name', 'is_staff']
         read_only_fields = ['id', 'username']
+
+class TokenRefreshSerializer(BaseTokenRefreshSerializer):
+    """Refresh with blacklist checks through the cache.
+
+    When refresh tokens are rotated and blacklisted, the database lookup is
+    skipped: blacklisting the presented token rejects a reused one.
+    """
+
+    @property
+    def token_class(self):
+        if api_settings.ROTATE_REFRESH_TOKENS and api_settings.BLACKLIST_AFTER_ROTATION:
+            return RotatedRefreshToken
+        return RefreshToken
+
+
+class TokenObtainPairSerializer(BaseTokenObtainPairSerializer):
+    """Issue the token pair and the user's profile from a single authentication"""
+    token_class = RefreshToken
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        data['user'] = UserProfileSerializer(self.user).data
+        return data
@@ -0,0 +1,68 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from authentication.cache import user_cache_key
+
+
+class CachedJWTAuthenticationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='attorney',
+            password='testpass123',
+            email='attorney@example.com',
+            is_staff=True
+        )
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}')
+
+    def test_cached_user_skips_users_query(self):
+        """Test that only the first request looks the user up"""
+        self.client.get(reverse('verify_token'))
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('verify_token'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['user']['username'], 'attorney')
+        self.assertTrue(response.data['user']['is_staff'])
+
+    def test_password_hash_is_not_cached(self):
+        self.client.get(reverse('verify_token'))
+
+        cached = cache.get(user_cache_key(self.user.pk))
+        self.assertNotIn(self.user.password, cached)
+
+    def test_profile_update_keeps_password_and_invalidates(self):
+        """Test that saving the cached user writes only the cached fields"""
+        self.client.get(reverse('verify_token'))
+
+        response = self.client.patch(reverse('user_profile'), {'first_name': 'Updated'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.first_name, 'Updated')
+        self.assertTrue(self.user.check_password('testpass123'))
+        response = self.client.get(reverse('verify_token'))
+        self.assertEqual(response.data['user']['first_name'], 'Updated')
+
+    def test_deactivated_user_is_rejected(self):
+        self.client.get(reverse('verify_token'))
+
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.client.get(reverse('verify_token'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_user_is_rejected(self):
+        self.client.get(reverse('verify_token'))
+
+        self.user.delete()
+
+        response = self.client.get(reverse('verify_token'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,87 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from authentication.tokens import RefreshToken, purge_expired_tokens
+
+
+class CachedBlacklistTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='attorney', password='testpass123', is_staff=True)
+
+    def refresh(self, token):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(reverse('token_refresh'), {'refresh': token})
+
+    def test_rotation_rejects_reused_token(self):
+        token = str(RefreshToken.for_user(self.user))
+
+        response = self.refresh(token)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('refresh', response.data)
+        self.assertEqual(BlacklistedToken.objects.count(), 1)
+
+        with self.assertNumQueries(0):
+            response = self.refresh(token)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_database_rejects_reuse_when_cache_is_lost(self):
+        token = str(RefreshToken.for_user(self.user))
+        self.refresh(token)
+        cache.clear()
+
+        response = self.refresh(token)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(BlacklistedToken.objects.count(), 1)
+
+    def test_logged_out_token_cannot_refresh(self):
+        refresh = RefreshToken.for_user(self.user)
+        self.client.force_authenticate(user=self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('logout'), {'refresh_token': str(refresh)})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.refresh(str(refresh))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PurgeExpiredTokensTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='attorney', password='testpass123')
+
+    def create_token(self, jti, expires_in, blacklisted=False):
+        token = OutstandingToken.objects.create(
+            user=self.user, jti=jti, token=jti, expires_at=timezone.now() + expires_in
+        )
+        if blacklisted:
+            BlacklistedToken.objects.create(token=token)
+        return token
+
+    def test_purges_expired_tokens_in_batches(self):
+        for i in range(5):
+            self.create_token(f'expired-{i}', timedelta(days=-1), blacklisted=i % 2 == 0)
+        live = self.create_token('live', timedelta(days=1), blacklisted=True)
+
+        self.assertEqual(purge_expired_tokens(batch_size=2), 5)
+
+        self.assertQuerysetEqual(OutstandingToken.objects.all(), [live])
+        self.assertEqual(BlacklistedToken.objects.get().token, live)
+
+    def test_command_reports_purged_tokens(self):
+        self.create_token('expired', timedelta(days=-1))
+
+        out = StringIO()
+        call_command('purge_expired_tokens', '--batch-size', '10', '--pause', '0', stdout=out)
+        self.assertIn("Purged 1 expired tokens", out.getvalue())
+        self.assertFalse(OutstandingToken.objects.exists())
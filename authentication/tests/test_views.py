@@ -1,3 +1,5 @@
+from unittest import mock
+
 from django.test import TestCase
 from django.urls import reverse
 from django.contrib.auth.models import User
@@ -26,6 +28,20 @@ class AuthenticationTest(TestCase):
         self.assertIn('access', response.data)
         self.assertIn('refresh', response.data)
         self.assertIn('user', response.data)
+
+    def test_login_hashes_password_once(self):
+        """Test that login authenticates once and returns the profile of that user"""
+        url = reverse('token_obtain_pair')
+        data = {
+            'username': 'testuser',
+            'password': 'testpass123'
+        }
+        with mock.patch.object(User, 'check_password', autospec=True, side_effect=User.check_password) as check:
+            response = self.client.post(url, data)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(check.call_count, 1)
+        self.assertEqual(response.data['user']['username'], 'testuser')
+        self.assertTrue(response.data['user']['is_staff'])
     
     def test_login_invalid_credentials(self):
         """Test login with invalid credentials"""
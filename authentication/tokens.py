@@ -0,0 +1,94 @@
+"""
+Refresh tokens whose blacklist is checked through the cache.
+
+The blacklist tables stay the source of truth. A blacklisted jti is also
+cached until the token expires, so replayed tokens are rejected without a
+query. Rotation skips the separate blacklist lookup altogether: blacklisting
+the presented token fails when it was blacklisted already.
+"""
+import time
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken as BaseRefreshToken
+from rest_framework_simplejwt.utils import aware_utcnow, datetime_from_epoch
+
+BLACKLIST_KEY_PREFIX = 'auth:blacklisted'
+
+
+def blacklist_cache_key(jti):
+    return f"{BLACKLIST_KEY_PREFIX}:{jti}"
+
+
+def cache_blacklisted(jti, expires_at):
+    """Remember a blacklisted jti until its token expires"""
+    timeout = int((expires_at - aware_utcnow()).total_seconds()) + 1
+    if timeout > 0:
+        cache.set(blacklist_cache_key(jti), True, timeout)
+
+
+class RefreshToken(BaseRefreshToken):
+    # Whether check_blacklist queries the database when the cache has no
+    # entry; rotation turns it off because blacklist() detects reuse itself
+    check_database = True
+
+    def check_blacklist(self):
+        jti = self.payload[api_settings.JTI_CLAIM]
+        if cache.get(blacklist_cache_key(jti)):
+            raise TokenError(_("Token is blacklisted"))
+        if self.check_database and BlacklistedToken.objects.filter(token__jti=jti).exists():
+            cache_blacklisted(jti, datetime_from_epoch(self.payload['exp']))
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        """Blacklist this token; raises TokenError when it already was"""
+        jti = self.payload[api_settings.JTI_CLAIM]
+        token, _created = OutstandingToken.objects.get_or_create(
+            jti=jti,
+            defaults={
+                'token': str(self),
+                'expires_at': datetime_from_epoch(self.payload['exp']),
+            },
+        )
+        try:
+            with transaction.atomic():
+                return BlacklistedToken.objects.create(token=token)
+        except IntegrityError:
+            cache_blacklisted(jti, token.expires_at)
+            raise TokenError(_("Token is blacklisted"))
+
+
+class RotatedRefreshToken(RefreshToken):
+    check_database = False
+
+
+def purge_expired_tokens(batch_size=1000, pause=0.0):
+    """Delete expired outstanding tokens and their blacklist entries.
+
+    Rows are deleted batch_size at a time, each batch in its own short
+    transaction, with ``pause`` seconds between batches. Batches are taken in
+    primary key order: tokens share one lifetime, so the expired ones have
+    the lowest ids and each batch is found without reading the whole table.
+    Returns the number of outstanding tokens deleted.
+    """
+    now = aware_utcnow()
+    purged = 0
+    while True:
+        ids = list(
+            OutstandingToken.objects.filter(expires_at__lte=now)
+            .order_by('id').values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return purged
+        with transaction.atomic():
+            BlacklistedToken.objects.filter(token_id__in=ids).delete()
+            OutstandingToken.objects.filter(id__in=ids).delete()
+        purged += len(ids)
+        if len(ids) < batch_size:
+            return purged
+        if pause:
+            time.sleep(pause)
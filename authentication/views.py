@@ -3,32 +3,18 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenObtainPairView
 from django.contrib.auth.models import User
 from .serializers import (
+    TokenObtainPairSerializer,
     UserRegistrationSerializer, 
-    UserLoginSerializer, 
     UserProfileSerializer
 )
+from .tokens import RefreshToken
 
 class CustomTokenObtainPairView(TokenObtainPairView):
     """Custom login view that returns user info along with tokens"""
-    
-    def post(self, request, *args, **kwargs):
-        response = super().post(request, *args, **kwargs)
-        
-        if response.status_code == 200:
-            # Get user info
-            serializer = UserLoginSerializer(data=request.data)
-            if serializer.is_valid():
-                user = serializer.validated_data['user']
-                user_data = UserProfileSerializer(user).data
-                
-                # Add user info to response
-                response.data['user'] = user_data
-        
-        return response
+    serializer_class = TokenObtainPairSerializer
 
 class UserRegistrationView(generics.CreateAPIView):
     """Register new attorney/admin users"""
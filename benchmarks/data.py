@@ -0,0 +1,56 @@
+import secrets
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db.models import F
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from leads.blobs import store_uploaded_resume
+from leads.models import Lead, ResumeBlob
+
+BENCHMARK_USERNAME = 'benchmark'
+SEED_EMAIL_DOMAIN = 'benchmark.example.com'
+LOAD_EMAIL_DOMAIN = 'load.benchmark.example.com'
+SEED_BATCH_SIZE = 1000
+
+
+def seeded_leads():
+    return Lead.objects.filter(email__endswith=f'@{SEED_EMAIL_DOMAIN}')
+
+
+def seed_leads(count):
+    """Top the table up to ``count`` benchmark leads and return their ids.
+
+    Leads are bulk inserted and share one stored resume, so seeding large
+    tables takes seconds rather than minutes.
+    """
+    existing = seeded_leads().count()
+    if existing < count:
+        blob = store_uploaded_resume(SimpleUploadedFile("resume.pdf", b"%PDF-1.4 benchmark resume"))
+        for start in range(existing, count, SEED_BATCH_SIZE):
+            stop = min(start + SEED_BATCH_SIZE, count)
+            Lead.objects.bulk_create([
+                Lead(
+                    first_name="Benchmark",
+                    last_name=str(i),
+                    email=f"lead{i}@{SEED_EMAIL_DOMAIN}",
+                    resume=blob.file.name,
+                    resume_blob=blob
+                )
+                for i in range(start, stop)
+            ])
+        # bulk_create skips the signal that keeps the reference count
+        ResumeBlob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') + count - existing)
+    return list(seeded_leads().order_by('id').values_list('id', flat=True)[:count])
+
+
+def get_benchmark_user():
+    """Return (user, password, refresh token) for a staff account.
+
+    The password is regenerated on every run so it is never a known value.
+    """
+    user, _ = User.objects.get_or_create(username=BENCHMARK_USERNAME, defaults={'is_staff': True})
+    password = secrets.token_urlsafe(16)
+    user.set_password(password)
+    user.save(update_fields=['password'])
+    return user, password, RefreshToken.for_user(user)
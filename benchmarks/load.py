@@ -0,0 +1,263 @@
+"""
+A small closed-loop HTTP load generator for the benchmark commands.
+
+Each of ``concurrency`` threads keeps one keep-alive connection open and
+sends requests back to back, so throughput and latency reflect the server
+rather than connection setup.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+import http.client
+import itertools
+import math
+import threading
+import time
+from urllib.parse import urlsplit
+import uuid
+
+from django.db import close_old_connections, connection
+from django.test import Client
+
+
+@dataclass
+class LoadResult:
+    name: str
+    latencies: list = field(default_factory=list)
+    statuses: dict = field(default_factory=dict)
+    queries: list = field(default_factory=list)
+    errors: int = 0
+    elapsed: float = 0.0
+    cpu_time: float = None
+
+    @property
+    def requests(self):
+        return len(self.latencies)
+
+    @property
+    def throughput(self):
+        return self.requests / self.elapsed if self.elapsed else 0.0
+
+    def percentile(self, p):
+        return percentile(self.latencies, p)
+
+    @property
+    def queries_per_request(self):
+        """Mean database queries per request, or None when they were not counted"""
+        return sum(self.queries) / len(self.queries) if self.queries else None
+
+    @property
+    def cpu_per_request(self):
+        """Mean process CPU seconds per request, or None when CPU was not measured"""
+        if self.cpu_time is None or not self.requests:
+            return None
+        return self.cpu_time / self.requests
+
+    def record(self, status, seconds, queries=None):
+        self.latencies.append(seconds)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if status >= 400:
+            self.errors += 1
+        if queries is not None:
+            self.queries.append(queries)
+
+    def summary(self):
+        queries = self.queries_per_request
+        cpu = self.cpu_per_request
+        return {
+            'name': self.name,
+            'requests': self.requests,
+            'errors': self.errors,
+            'throughput': round(self.throughput, 1),
+            'p50_ms': round(self.percentile(50) * 1000, 2),
+            'p95_ms': round(self.percentile(95) * 1000, 2),
+            'p99_ms': round(self.percentile(99) * 1000, 2),
+            'queries': None if queries is None else round(queries, 2),
+            'cpu_ms': None if cpu is None else round(cpu * 1000, 2),
+        }
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of values (0.0 when empty)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(p / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def multipart_body(fields, files):
+    """Encode form fields and (name, filename, content, content_type) files"""
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+        )
+    for name, filename, content, content_type in files:
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f'Content-Type: {content_type}\r\n\r\n'.encode() + content + b'\r\n'
+        )
+    parts.append(f'--{boundary}--\r\n'.encode())
+    return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+
+class BaseLoadGenerator:
+    """Send ``total`` requests built by ``make_request(i)`` at a fixed concurrency.
+
+    ``make_request`` returns (method, path, body, headers); ``path`` may
+    include a query string.
+    """
+    concurrency = 10
+    # Whether the requests are served in this process, so its CPU time is theirs
+    measures_cpu = False
+
+    def send(self, method, path, body=None, headers=None):
+        """Send one request and return (status, seconds, query count or None)"""
+        raise NotImplementedError
+
+    def finish_thread(self):
+        """Release the calling worker thread's resources"""
+
+    def run(self, name, make_request, total):
+        result = LoadResult(name)
+        counter = itertools.count()
+        lock = threading.Lock()
+
+        def worker():
+            try:
+                while True:
+                    i = next(counter)
+                    if i >= total:
+                        return
+                    try:
+                        status, seconds, queries = self.send(*make_request(i))
+                    except (OSError, http.client.HTTPException):
+                        with lock:
+                            result.errors += 1
+                        continue
+                    with lock:
+                        result.record(status, seconds, queries)
+            finally:
+                self.finish_thread()
+
+        started = time.perf_counter()
+        cpu_started = time.process_time()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = [executor.submit(worker) for _ in range(self.concurrency)]
+        result.elapsed = time.perf_counter() - started
+        if self.measures_cpu:
+            result.cpu_time = time.process_time() - cpu_started
+        for future in futures:
+            # Surface bugs in make_request instead of reporting an empty run
+            future.result()
+        return result
+
+
+class LoadGenerator(BaseLoadGenerator):
+    """Drives a running server over HTTP with one keep-alive connection per thread"""
+
+    def __init__(self, base_url, concurrency=10, timeout=30):
+        url = urlsplit(base_url)
+        self.host = url.hostname
+        self.port = url.port or (443 if url.scheme == 'https' else 80)
+        self.https = url.scheme == 'https'
+        self.prefix = url.path.rstrip('/')
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.local = threading.local()
+
+    def connection(self):
+        conn = getattr(self.local, 'connection', None)
+        if conn is None:
+            cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+            conn = cls(self.host, self.port, timeout=self.timeout)
+            self.local.connection = conn
+        return conn
+
+    def reset_connection(self):
+        conn = getattr(self.local, 'connection', None)
+        if conn is not None:
+            conn.close()
+        self.local.connection = None
+
+    def send(self, method, path, body=None, headers=None):
+        started = time.perf_counter()
+        for attempt in range(2):
+            conn = self.connection()
+            try:
+                conn.request(method, self.prefix + path, body=body, headers=headers or {})
+                response = conn.getresponse()
+                response.read()
+                break
+            except (http.client.HTTPException, ConnectionError):
+                # The server closed an idle keep-alive connection; retry once on a new one
+                self.reset_connection()
+                if attempt:
+                    raise
+        if response.getheader('Connection', '').lower() == 'close':
+            self.reset_connection()
+        return response.status, time.perf_counter() - started, None
+
+    def finish_thread(self):
+        self.reset_connection()
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class ClientLoadGenerator(BaseLoadGenerator):
+    """
+    Drives the application in this process through Django's test client,
+    one client and database connection per thread, counting the queries
+    each request runs. No server or network is involved.
+    """
+    measures_cpu = True
+
+    def __init__(self, concurrency=10):
+        self.concurrency = concurrency
+        self.local = threading.local()
+
+    def send(self, method, path, body=None, headers=None):
+        client = getattr(self.local, 'client', None)
+        if client is None:
+            client = self.local.client = Client(raise_request_exception=False)
+        headers = dict(headers or {})
+        content_type = headers.pop('Content-Type', 'application/octet-stream')
+        counter = QueryCounter()
+        started = time.perf_counter()
+        with connection.execute_wrapper(counter):
+            response = client.generic(method, path, data=body or b'', content_type=content_type, headers=headers)
+            if response.streaming:
+                b''.join(response.streaming_content)
+        seconds = time.perf_counter() - started
+        # The test client skips this end-of-request step; a real server
+        # closes or keeps the connection according to CONN_MAX_AGE
+        close_old_connections()
+        return response.status_code, seconds, counter.count
+
+    def finish_thread(self):
+        connection.close()
+
+
+def format_table(results):
+    """Render LoadResult summaries as a fixed-width table"""
+    rows = [result.summary() for result in results]
+    columns = ['name', 'requests', 'errors', 'throughput', 'p50_ms', 'p95_ms', 'p99_ms']
+    for column in ('queries', 'cpu_ms'):
+        if any(row[column] is not None for row in rows):
+            columns.append(column)
+    widths = {
+        column: max(len(column), *(len(str(row[column])) for row in rows)) if rows else len(column)
+        for column in columns
+    }
+    lines = ['  '.join(column.ljust(widths[column]) for column in columns)]
+    for row in rows:
+        lines.append('  '.join(str(row[column]).ljust(widths[column]) for column in columns))
+    return '\n'.join(lines)
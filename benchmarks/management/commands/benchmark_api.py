@@ -0,0 +1,133 @@
+from contextlib import contextmanager, nullcontext
+import json
+import shutil
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+from benchmarks.load import ClientLoadGenerator, LoadGenerator, format_table
+from benchmarks.runner import SCENARIOS, ApiBenchmark, compare_to_baseline
+
+
+@contextmanager
+def throttling_disabled():
+    """Measure the application, not the API rate limits"""
+    rates = SimpleRateThrottle.THROTTLE_RATES
+    saved = dict(rates)
+    rates.update({scope: None for scope in rates})
+    try:
+        yield
+    finally:
+        rates.clear()
+        rates.update(saved)
+
+
+@contextmanager
+def benchmark_database(keepdb):
+    """Run against a throwaway copy of the schema, like the test runner does"""
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=keepdb)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed leads and measure latency percentiles, throughput, queries and CPU per request "
+        "of the lead intake, attorney and auth endpoints under concurrent load"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--leads', type=int, default=1000, help="Leads in the table while measuring")
+        parser.add_argument('--requests', type=int, default=500, help="Measured requests per scenario")
+        parser.add_argument('--warmup', type=int, default=20, help="Unmeasured requests per scenario")
+        parser.add_argument('--concurrency', type=int, default=10)
+        parser.add_argument(
+            '--scenarios', default=','.join(SCENARIOS),
+            help=f"Comma separated, from: {', '.join(SCENARIOS)}"
+        )
+        parser.add_argument(
+            '--url',
+            help=(
+                "Benchmark a running server instead of this process. Seeds the configured "
+                "database, and query counts are not available"
+            )
+        )
+        parser.add_argument('--keepdb', action='store_true', help="Keep the benchmark database between runs")
+        parser.add_argument('--no-cache', action='store_true', help="Measure with response caching disabled")
+        parser.add_argument('--output', help="Write the results as JSON, for use as a --baseline")
+        parser.add_argument('--baseline', help="Fail if results regressed against this JSON file")
+        parser.add_argument(
+            '--threshold', type=float, default=0.2,
+            help="Allowed latency/throughput change against the baseline, as a fraction (default 0.2)"
+        )
+
+    def handle(self, *args, **options):
+        scenarios = [name.strip() for name in options['scenarios'].split(',') if name.strip()]
+        unknown = set(scenarios) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+        if options['leads'] < 1:
+            raise CommandError("--leads must be at least 1")
+
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline']) as file:
+                baseline = json.load(file)
+
+        if options['url']:
+            generator = LoadGenerator(options['url'], concurrency=options['concurrency'])
+            results = self.measure(generator, scenarios, options)
+        else:
+            results = self.measure_in_process(scenarios, options)
+
+        self.stdout.write(format_table(results))
+        summaries = [result.summary() for result in results]
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                json.dump({'options': self.describe(options), 'results': summaries}, file, indent=2)
+
+        if baseline is not None:
+            regressions = compare_to_baseline(summaries, baseline, options['threshold'])
+            if regressions:
+                raise CommandError("Performance regressed:\n" + '\n'.join(regressions))
+            self.stdout.write(self.style.SUCCESS("No regressions against the baseline"))
+
+    def measure_in_process(self, scenarios, options):
+        media_root = tempfile.mkdtemp()
+        caches = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+        try:
+            with benchmark_database(options['keepdb']), \
+                    override_settings(
+                        ALLOWED_HOSTS=['testserver'],
+                        MEDIA_ROOT=media_root,
+                        EMAIL_TRANSPORT='leads.services.LocalTransport'
+                    ), \
+                    (override_settings(CACHES=caches) if options['no_cache'] else nullcontext()), \
+                    throttling_disabled():
+                generator = ClientLoadGenerator(concurrency=options['concurrency'])
+                return self.measure(generator, scenarios, options)
+        finally:
+            shutil.rmtree(media_root, ignore_errors=True)
+
+    def measure(self, generator, scenarios, options):
+        self.stdout.write(
+            f"Measuring {', '.join(scenarios)} with {options['leads']} leads, "
+            f"{options['requests']} requests per scenario, concurrency {options['concurrency']}"
+        )
+        benchmark = ApiBenchmark(
+            generator,
+            leads=options['leads'],
+            requests=options['requests'],
+            warmup=options['warmup']
+        )
+        return benchmark.run(scenarios)
+
+    def describe(self, options):
+        keys = ['leads', 'requests', 'warmup', 'concurrency', 'url', 'no_cache']
+        return {key: options[key] for key in keys}
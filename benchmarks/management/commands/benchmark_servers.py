@@ -0,0 +1,126 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks.data import LOAD_EMAIL_DOMAIN, get_benchmark_user, seed_leads
+from benchmarks.load import LoadGenerator, format_table, multipart_body
+
+# (scenario, sync path on the WSGI server, async path on the ASGI server)
+SCENARIOS = {
+    'list': ('/api/leads/list/', '/api/leads/async/list/'),
+    'detail': ('/api/leads/{pk}/', '/api/leads/async/{pk}/'),
+    'create': ('/api/leads/', '/api/leads/async/'),
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise CommandError(f"Server exited with code {process.returncode}")
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise CommandError(f"Server did not start listening on port {port}")
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare concurrent throughput of the sync lead views under gunicorn (WSGI) "
+        "with the async views under gunicorn + uvicorn workers (ASGI)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000, help="Requests per scenario and server")
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--workers', type=int, default=2, help="gunicorn workers per server")
+        parser.add_argument('--leads', type=int, default=500, help="Leads to seed before measuring")
+        parser.add_argument(
+            '--scenarios', default='list,detail',
+            help=f"Comma separated, from: {', '.join(SCENARIOS)}"
+        )
+        parser.add_argument(
+            '--wsgi-url',
+            help="Benchmark an already running WSGI deployment (raise THROTTLE_USER_RATE on it first)"
+        )
+        parser.add_argument('--asgi-url', help="Benchmark an already running ASGI deployment")
+
+    def handle(self, *args, **options):
+        scenarios = [name.strip() for name in options['scenarios'].split(',') if name.strip()]
+        unknown = set(scenarios) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+        if options['leads'] < 1:
+            raise CommandError("--leads must be at least 1")
+
+        self.lead_ids = seed_leads(options['leads'])
+        user, password, refresh = get_benchmark_user()
+        self.headers = {'Authorization': f"Bearer {refresh.access_token}"}
+
+        servers = []
+        try:
+            wsgi_url = options['wsgi_url'] or self.start_server(servers, 'wsgi', options['workers'])
+            asgi_url = options['asgi_url'] or self.start_server(servers, 'asgi', options['workers'])
+            results = []
+            for scenario in scenarios:
+                sync_path, async_path = SCENARIOS[scenario]
+                results.append(self.measure(f"{scenario} wsgi/sync", wsgi_url, sync_path, scenario, options))
+                results.append(self.measure(f"{scenario} asgi/async", asgi_url, async_path, scenario, options))
+        finally:
+            for process in servers:
+                process.terminate()
+                process.wait(timeout=10)
+
+        self.stdout.write(format_table(results))
+
+    def start_server(self, servers, kind, workers):
+        port = free_port()
+        command = [sys.executable, '-m', 'gunicorn', '--bind', f'127.0.0.1:{port}', '--workers', str(workers), '--log-level', 'warning']
+        if kind == 'asgi':
+            command += ['-k', 'uvicorn.workers.UvicornWorker', 'leads_project.asgi:application']
+        else:
+            command += ['leads_project.wsgi:application']
+        # Measure the servers, not the API rate limits
+        env = {
+            **os.environ,
+            **{
+                name: '1000000/min'
+                for name in ('THROTTLE_ANON_RATE', 'THROTTLE_USER_RATE', 'THROTTLE_INTAKE_IP_RATE', 'THROTTLE_INTAKE_EMAIL_RATE')
+            },
+        }
+        if kind == 'asgi':
+            # Same as the asgi service in docker-compose.yml
+            env.setdefault('DB_POOL', 'True')
+        process = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL)
+        servers.append(process)
+        wait_for_port(port, process)
+        return f'http://127.0.0.1:{port}'
+
+    def measure(self, name, base_url, path, scenario, options):
+        generator = LoadGenerator(base_url, concurrency=options['concurrency'])
+        run_id = time.time_ns()
+
+        def make_request(i):
+            if scenario == 'create':
+                body, content_type = multipart_body(
+                    {'first_name': 'Load', 'last_name': str(i), 'email': f'{run_id}-{i}@{LOAD_EMAIL_DOMAIN}'},
+                    [('resume', 'resume.pdf', b'%PDF-1.4 load', 'application/pdf')]
+                )
+                return 'POST', path, body, {'Content-Type': content_type}
+            return 'GET', path.format(pk=self.lead_ids[i % len(self.lead_ids)]), None, self.headers
+
+        self.stdout.write(f"Running {name} ({options['requests']} requests, concurrency {options['concurrency']})")
+        return generator.run(name, make_request, options['requests'])
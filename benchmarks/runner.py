@@ -0,0 +1,118 @@
+"""
+Scenarios for the benchmark_api command.
+
+Every scenario is one endpoint; requests are spread over the seeded leads
+so caches and indexes are exercised the way many clients would.
+"""
+import json
+import time
+
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .data import LOAD_EMAIL_DOMAIN, get_benchmark_user, seed_leads
+from .load import multipart_body
+
+SCENARIOS = ('intake', 'list', 'detail', 'update', 'login', 'refresh', 'verify')
+
+# Mean queries per request may shift slightly with cache-miss timing
+QUERY_TOLERANCE = 0.1
+
+
+class ApiBenchmark:
+    """Seed leads and a staff user, then drive each scenario through a load generator"""
+
+    def __init__(self, generator, leads=1000, requests=500, warmup=20):
+        self.generator = generator
+        self.leads = leads
+        self.requests = requests
+        self.warmup = warmup
+        self.run_id = time.time_ns()
+
+    def setup(self, scenarios):
+        self.lead_ids = seed_leads(self.leads)
+        user, self.password, refresh = get_benchmark_user()
+        self.username = user.username
+        self.auth = {'Authorization': f'Bearer {refresh.access_token}'}
+        self.refresh_tokens = []
+        if 'refresh' in scenarios:
+            # Refresh tokens are rotated, so each one can only be used once
+            self.refresh_tokens = [
+                str(RefreshToken.for_user(user)) for _ in range(self.requests + self.warmup)
+            ]
+
+    def run(self, scenarios):
+        self.setup(scenarios)
+        results = []
+        for scenario in scenarios:
+            make_request = getattr(self, f'request_{scenario}')
+            if self.warmup:
+                self.generator.run(scenario, lambda i: make_request(self.requests + i), self.warmup)
+            results.append(self.generator.run(scenario, make_request, self.requests))
+        return results
+
+    def lead_id(self, i):
+        return self.lead_ids[i % len(self.lead_ids)]
+
+    def json_body(self, data):
+        return json.dumps(data).encode(), {'Content-Type': 'application/json'}
+
+    def request_intake(self, i):
+        body, content_type = multipart_body(
+            {'first_name': 'Load', 'last_name': str(i), 'email': f'{self.run_id}-{i}@{LOAD_EMAIL_DOMAIN}'},
+            # Distinct content, so every submission stores a new resume
+            [('resume', 'resume.pdf', f'%PDF-1.4 {self.run_id}-{i}'.encode(), 'application/pdf')]
+        )
+        return 'POST', reverse('lead-create'), body, {'Content-Type': content_type}
+
+    def request_list(self, i):
+        return 'GET', reverse('lead-list'), None, self.auth
+
+    def request_detail(self, i):
+        return 'GET', reverse('lead-detail', kwargs={'pk': self.lead_id(i)}), None, self.auth
+
+    def request_update(self, i):
+        body, headers = self.json_body({'status': 'REACHED_OUT'})
+        return 'PATCH', reverse('lead-update', kwargs={'pk': self.lead_id(i)}), body, {**self.auth, **headers}
+
+    def request_login(self, i):
+        body, headers = self.json_body({'username': self.username, 'password': self.password})
+        return 'POST', reverse('token_obtain_pair'), body, headers
+
+    def request_refresh(self, i):
+        body, headers = self.json_body({'refresh': self.refresh_tokens[i]})
+        return 'POST', reverse('token_refresh'), body, headers
+
+    def request_verify(self, i):
+        return 'GET', reverse('verify_token'), None, self.auth
+
+
+def compare_to_baseline(summaries, baseline, threshold):
+    """Return a message for every scenario that regressed against the baseline.
+
+    Latency (p95), throughput and CPU per request may move by ``threshold``
+    (a fraction) before they count. Query counts and error counts barely depend on the
+    machine, so any real increase counts.
+    """
+    previous = {summary['name']: summary for summary in baseline['results']}
+    regressions = []
+    for summary in summaries:
+        name = summary['name']
+        before = previous.get(name)
+        if before is None:
+            continue
+        if summary['errors'] > before['errors']:
+            regressions.append(f"{name}: {summary['errors']} errors (baseline {before['errors']})")
+        if before['p95_ms'] and summary['p95_ms'] > before['p95_ms'] * (1 + threshold):
+            regressions.append(f"{name}: p95 {summary['p95_ms']}ms (baseline {before['p95_ms']}ms)")
+        if before['throughput'] and summary['throughput'] < before['throughput'] * (1 - threshold):
+            regressions.append(
+                f"{name}: {summary['throughput']} req/s (baseline {before['throughput']} req/s)"
+            )
+        if (summary.get('cpu_ms') is not None and before.get('cpu_ms')
+                and summary['cpu_ms'] > before['cpu_ms'] * (1 + threshold)):
+            regressions.append(f"{name}: {summary['cpu_ms']}ms CPU/request (baseline {before['cpu_ms']}ms)")
+        if (summary.get('queries') is not None and before.get('queries') is not None
+                and summary['queries'] > before['queries'] + QUERY_TOLERANCE):
+            regressions.append(f"{name}: {summary['queries']} queries/request (baseline {before['queries']})")
+    return regressions
@@ -0,0 +1,67 @@
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+
+from benchmarks.data import seed_leads
+from benchmarks.management.commands.benchmark_api import throttling_disabled
+from benchmarks.load import ClientLoadGenerator, percentile
+from benchmarks.runner import ApiBenchmark, compare_to_baseline
+from leads.models import Lead, ResumeBlob
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, EMAIL_TRANSPORT='leads.services.LocalTransport')
+class ApiBenchmarkTest(TransactionTestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_seed_leads_tops_up_and_counts_references(self):
+        """Test that seeding is incremental and keeps the shared blob's reference count"""
+        self.assertEqual(len(seed_leads(5)), 5)
+        self.assertEqual(len(seed_leads(8)), 8)
+
+        self.assertEqual(Lead.objects.count(), 8)
+        self.assertEqual(ResumeBlob.objects.get().ref_count, 8)
+
+    def test_scenarios_run_without_errors(self):
+        """Test that every measured scenario succeeds and reports query counts and CPU time"""
+        benchmark = ApiBenchmark(ClientLoadGenerator(concurrency=2), leads=5, requests=6, warmup=1)
+        with throttling_disabled():
+            results = benchmark.run(['intake', 'list', 'detail', 'update', 'login', 'refresh', 'verify'])
+
+        for result in results:
+            self.assertEqual(result.errors, 0, (result.name, result.statuses))
+            self.assertEqual(result.requests, 6)
+            self.assertEqual(len(result.queries), 6)
+            self.assertIsNotNone(result.summary()['cpu_ms'])
+        self.assertEqual(Lead.objects.filter(status=Lead.REACHED_OUT).count(), 5)
+
+
+class BaselineTest(SimpleTestCase):
+    def summary(self, **values):
+        return {'name': 'list', 'errors': 0, 'throughput': 100.0, 'p95_ms': 10.0, 'queries': 2.0, 'cpu_ms': 4.0,
+                **values}
+
+    def test_percentile(self):
+        self.assertEqual(percentile([5, 1, 4, 2, 3], 50), 3)
+        self.assertEqual(percentile([5, 1, 4, 2, 3], 99), 5)
+        self.assertEqual(percentile([], 95), 0.0)
+
+    def test_changes_within_threshold_pass(self):
+        baseline = {'results': [self.summary()]}
+        current = [self.summary(throughput=85.0, p95_ms=11.5, cpu_ms=4.6)]
+        self.assertEqual(compare_to_baseline(current, baseline, threshold=0.2), [])
+
+    def test_regressions_reported(self):
+        """Test that slower, less throughput, more CPU, more queries and new errors all fail"""
+        baseline = {'results': [self.summary()]}
+        current = [self.summary(throughput=50.0, p95_ms=20.0, cpu_ms=8.0, queries=3.0, errors=1)]
+        self.assertEqual(len(compare_to_baseline(current, baseline, threshold=0.2)), 5)
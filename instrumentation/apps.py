@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class InstrumentationConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'instrumentation'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from .timing import install_query_recorder
+        connection_created.connect(install_query_recorder)
@@ -0,0 +1,18 @@
+import json
+import logging
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, with request metrics as top-level fields"""
+
+    def format(self, record):
+        data = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            **getattr(record, 'request_metrics', {}),
+        }
+        if record.exc_info:
+            data['exception'] = self.formatException(record.exc_info)
+        return json.dumps(data, default=str)
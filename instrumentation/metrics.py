@@ -0,0 +1,118 @@
+"""
+In-process histograms rendered in the Prometheus text exposition format.
+
+Values are kept per process: with several gunicorn workers, each worker
+reports its own series, like prometheus_client without multiprocess mode.
+"""
+import threading
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100, 200)
+
+
+def escape_label(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{escape_label(value)}"' for name, value in labels) + '}'
+
+
+def format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Cumulative bucket counts, sum and count per label combination"""
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DURATION_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series['buckets'][i] += 1
+            series['sum'] += value
+            series['count'] += 1
+
+    def collect(self):
+        with self.lock:
+            series = {key: {**value, 'buckets': list(value['buckets'])} for key, value in self.series.items()}
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        for key in sorted(series):
+            values = series[key]
+            labels = list(zip(self.labelnames, key))
+            for bound, count in zip(self.buckets, values['buckets']):
+                bucket_labels = format_labels(labels + [('le', format_value(bound))])
+                lines.append(f'{self.name}_bucket{bucket_labels} {count}')
+            lines.append(f'{self.name}_sum{format_labels(labels)} {format_value(values["sum"])}')
+            lines.append(f'{self.name}_count{format_labels(labels)} {values["count"]}')
+        return lines
+
+    def clear(self):
+        with self.lock:
+            self.series.clear()
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def histogram(self, *args, **kwargs):
+        metric = Histogram(*args, **kwargs)
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.collect())
+        return '\n'.join(lines) + '\n'
+
+    def clear(self):
+        for metric in self.metrics:
+            metric.clear()
+
+
+registry = Registry()
+
+REQUEST_DURATION = registry.histogram(
+    'http_request_duration_seconds',
+    "Time to produce the response, by view",
+    ('method', 'view', 'status')
+)
+REQUEST_QUERIES = registry.histogram(
+    'http_request_db_queries',
+    "SQL queries run per request",
+    ('method', 'view'),
+    buckets=COUNT_BUCKETS
+)
+REQUEST_DB_DURATION = registry.histogram(
+    'http_request_db_duration_seconds',
+    "Time spent in SQL queries per request",
+    ('method', 'view')
+)
+REQUEST_SERIALIZER_DURATION = registry.histogram(
+    'http_request_serializer_duration_seconds',
+    "Time spent validating and rendering serializers per request",
+    ('method', 'view')
+)
+EXTERNAL_CALL_DURATION = registry.histogram(
+    'external_call_duration_seconds',
+    "Duration of calls to external services",
+    ('service', 'outcome')
+)
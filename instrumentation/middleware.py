@@ -0,0 +1,94 @@
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from .metrics import REQUEST_DB_DURATION, REQUEST_DURATION, REQUEST_QUERIES, REQUEST_SERIALIZER_DURATION
+from .timing import RequestMetrics, current_metrics
+
+logger = logging.getLogger(__name__)
+
+
+class InstrumentationMiddleware:
+    """
+    Measure every request: wall time, SQL query count and time, serializer
+    time and external calls.
+
+    The figures go to a Server-Timing header, one structured log record per
+    request and the histograms served at /metrics. For streaming responses
+    the time covers producing the response, not sending its body.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics, token, started = self.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.finish(request, response, metrics, started)
+
+    async def __acall__(self, request):
+        metrics, token, started = self.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.finish(request, response, metrics, started)
+
+    def start(self):
+        metrics = RequestMetrics()
+        return metrics, current_metrics.set(metrics), time.perf_counter()
+
+    def finish(self, request, response, metrics, started):
+        duration = time.perf_counter() - started
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else 'unmatched'
+
+        REQUEST_DURATION.observe(duration, method=request.method, view=view, status=response.status_code)
+        REQUEST_QUERIES.observe(metrics.queries, method=request.method, view=view)
+        REQUEST_DB_DURATION.observe(metrics.db_time, method=request.method, view=view)
+        REQUEST_SERIALIZER_DURATION.observe(metrics.timers.get('serializer', 0.0), method=request.method, view=view)
+
+        if settings.SERVER_TIMING_ENABLED:
+            response['Server-Timing'] = self.server_timing(duration, metrics)
+        self.log(request, response, view, duration, metrics)
+        return response
+
+    def server_timing(self, duration, metrics):
+        entries = [
+            f'total;dur={duration * 1000:.1f}',
+            f'db;dur={metrics.db_time * 1000:.1f};desc="{metrics.queries} queries"',
+        ]
+        for name, seconds in sorted(metrics.timers.items()):
+            entries.append(f'{name};dur={seconds * 1000:.1f}')
+        return ', '.join(entries)
+
+    def log(self, request, response, view, duration, metrics):
+        slow = duration * 1000 >= settings.SLOW_REQUEST_MS
+        fields = {
+            'method': request.method,
+            'path': request.path,
+            'view': view,
+            'status': response.status_code,
+            'duration_ms': round(duration * 1000, 1),
+            'queries': metrics.queries,
+            'db_ms': round(metrics.db_time * 1000, 1),
+            **{f'{name}_ms': round(seconds * 1000, 1) for name, seconds in metrics.timers.items()},
+            'slow': slow,
+        }
+        logger.log(
+            logging.WARNING if slow else logging.INFO,
+            "%s %s %s %.1fms %d queries",
+            request.method, request.path, response.status_code, fields['duration_ms'], metrics.queries,
+            extra={'request_metrics': fields}
+        )
@@ -0,0 +1,130 @@
+import json
+import logging
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import AsyncClient, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from instrumentation.formatters import JsonFormatter
+from instrumentation.metrics import EXTERNAL_CALL_DURATION, Histogram, registry
+from instrumentation.timing import external_call
+from leads.models import Lead
+
+
+def parse_server_timing(header):
+    """Map each Server-Timing metric name to its dur (and desc) values"""
+    timings = {}
+    for entry in header.split(', '):
+        name, *params = entry.split(';')
+        timings[name] = dict(param.split('=', 1) for param in params)
+    return timings
+
+
+class InstrumentationMiddlewareTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        registry.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='attorney', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.access = f'Bearer {RefreshToken.for_user(self.user).access_token}'
+        for i in range(3):
+            Lead.objects.create(
+                first_name="Lead",
+                last_name=str(i),
+                email=f"lead{i}@example.com",
+                resume=SimpleUploadedFile("test_resume.pdf", b"file_content")
+            )
+
+    def test_server_timing_header(self):
+        """Test that responses report total, DB and serializer time"""
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('lead-list'))
+
+        timings = parse_server_timing(response['Server-Timing'])
+        self.assertEqual(timings['db']['desc'], '"1 queries"')
+        self.assertIn('serializer', timings)
+        self.assertGreaterEqual(float(timings['total']['dur']), float(timings['db']['dur']))
+
+    @override_settings(SERVER_TIMING_ENABLED=False)
+    def test_server_timing_can_be_disabled(self):
+        response = self.client.get(reverse('lead-list'))
+        self.assertNotIn('Server-Timing', response)
+
+    def test_metrics_endpoint(self):
+        """Test that request histograms are exposed in the Prometheus text format"""
+        self.client.get(reverse('lead-list'))
+        response = self.client.get(reverse('metrics'))
+
+        self.assertEqual(response.status_code, 200)
+        body = response.content.decode()
+        self.assertIn('# TYPE http_request_duration_seconds histogram', body)
+        self.assertIn('http_request_duration_seconds_count{method="GET",view="lead-list",status="200"} 1', body)
+        self.assertIn('http_request_db_queries_bucket{method="GET",view="lead-list",le="1"} 1', body)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_metrics_token(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 401)
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+
+    def test_request_log_record(self):
+        """Test that each request is logged with its metrics as structured fields"""
+        with self.assertLogs('instrumentation.middleware', level='INFO') as logs:
+            self.client.get(reverse('lead-list'))
+
+        fields = logs.records[0].request_metrics
+        self.assertEqual(fields['view'], 'lead-list')
+        self.assertEqual(fields['status'], 200)
+        self.assertEqual(fields['queries'], 1)
+        self.assertFalse(fields['slow'])
+
+    async def test_async_view_queries_attributed(self):
+        """Test that async ORM queries count toward the request that ran them"""
+        response = await AsyncClient().get(reverse('lead-list-async'), headers={'Authorization': self.access})
+
+        self.assertEqual(response.status_code, 200)
+        timings = parse_server_timing(response['Server-Timing'])
+        self.assertRegex(timings['db']['desc'], r'"[1-9]\d* queries"')
+
+
+class MetricsTest(SimpleTestCase):
+    def test_histogram_exposition(self):
+        histogram = Histogram('test_seconds', "Test", ('view',), buckets=(0.1, 1))
+        histogram.observe(0.05, view='a"b')
+        histogram.observe(0.5, view='a"b')
+
+        self.assertEqual(histogram.collect(), [
+            '# HELP test_seconds Test',
+            '# TYPE test_seconds histogram',
+            'test_seconds_bucket{view="a\\"b",le="0.1"} 1',
+            'test_seconds_bucket{view="a\\"b",le="1"} 2',
+            'test_seconds_bucket{view="a\\"b",le="+Inf"} 2',
+            'test_seconds_sum{view="a\\"b"} 0.55',
+            'test_seconds_count{view="a\\"b"} 2',
+        ])
+
+    def test_external_call_records_failures(self):
+        """Test that a failing provider call is observed with outcome=error"""
+        EXTERNAL_CALL_DURATION.clear()
+        with self.assertRaises(ConnectionError):
+            with external_call('mailjet'):
+                raise ConnectionError("Mailjet unavailable")
+
+        self.assertIn(
+            'external_call_duration_seconds_count{service="mailjet",outcome="error"} 1',
+            EXTERNAL_CALL_DURATION.collect()
+        )
+
+    def test_json_formatter(self):
+        record = logging.LogRecord('instrumentation.middleware', logging.INFO, __file__, 1, "GET /", (), None)
+        record.request_metrics = {'queries': 2, 'db_ms': 1.5}
+
+        data = json.loads(JsonFormatter().format(record))
+        self.assertEqual(data['message'], "GET /")
+        self.assertEqual(data['queries'], 2)
+        self.assertEqual(data['level'], 'INFO')
@@ -0,0 +1,88 @@
+"""
+Per-request timing, collected in a context variable.
+
+Context variables follow the request through sync_to_async and
+async_to_sync, so queries and timers are attributed to the right request
+in both the WSGI and the ASGI deployment.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+import time
+
+from .metrics import EXTERNAL_CALL_DURATION
+
+current_metrics = ContextVar('request_metrics', default=None)
+
+
+@dataclass
+class RequestMetrics:
+    queries: int = 0
+    db_time: float = 0.0
+    timers: dict = field(default_factory=dict)
+    active: set = field(default_factory=set)
+
+    def add(self, name, seconds):
+        self.timers[name] = self.timers.get(name, 0.0) + seconds
+
+
+def record_query(execute, sql, params, many, context):
+    metrics = current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.db_time += time.perf_counter() - started
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    """connection_created receiver; wrappers outlive reconnects, so add it once"""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@contextmanager
+def timed(name):
+    """Add the time spent in the block to the current request's ``name`` timer.
+
+    Nested blocks with the same name are only counted once.
+    """
+    metrics = current_metrics.get()
+    if metrics is None or name in metrics.active:
+        yield
+        return
+    metrics.active.add(name)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.active.discard(name)
+        metrics.add(name, time.perf_counter() - started)
+
+
+@contextmanager
+def external_call(service):
+    """Time a call to an external service, per request and in the histogram"""
+    started = time.perf_counter()
+    outcome = 'error'
+    try:
+        with timed(service):
+            yield
+        outcome = 'ok'
+    finally:
+        EXTERNAL_CALL_DURATION.observe(time.perf_counter() - started, service=service, outcome=outcome)
+
+
+class TimedSerializerMixin:
+    """Count validation and representation of this serializer as serializer time"""
+
+    def run_validation(self, *args, **kwargs):
+        with timed('serializer'):
+            return super().run_validation(*args, **kwargs)
+
+    def to_representation(self, *args, **kwargs):
+        with timed('serializer'):
+            return super().to_representation(*args, **kwargs)
@@ -1,9 +1,43 @@
 from django.contrib import admin
-from .models import Lead
+from .filters import search_leads
+from .models import EmailOutbox, Lead, NotificationPreference, ResumeAnalysis, ResumeBlob
 
 @admin.register(Lead)
 class LeadAdmin(admin.ModelAdmin):
     list_display = ['first_name', 'last_name', 'email', 'status', 'created_at']
     list_filter = ['status', 'created_at']
     search_fields = ['first_name', 'last_name', 'email']
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = ['resume_blob', 'created_at', 'updated_at']
+    
+    def get_search_results(self, request, queryset, search_term):
+        # Use the GIN-indexed full-text search instead of ILIKE '%term%' scans
+        return search_leads(queryset, search_term), False
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = ['kind', 'lead', 'recipient', 'status', 'attempts', 'next_attempt_at', 'sent_at']
+    list_filter = ['status', 'kind']
+    readonly_fields = ['created_at', 'sent_at']
+
+@admin.register(NotificationPreference)
+class NotificationPreferenceAdmin(admin.ModelAdmin):
+    list_display = ['email', 'mode', 'updated_at']
+    list_filter = ['mode']
+
+@admin.register(ResumeBlob)
+class ResumeBlobAdmin(admin.ModelAdmin):
+    list_display = ['sha256', 'size', 'ref_count', 'created_at']
+    search_fields = ['sha256']
+    readonly_fields = ['sha256', 'file', 'size', 'ref_count', 'created_at']
+
+@admin.register(ResumeAnalysis)
+class ResumeAnalysisAdmin(admin.ModelAdmin):
+    list_display = ['blob', 'status', 'page_count', 'processed_at']
+    list_filter = ['status']
+    search_fields = ['blob__sha256', 'text']
+    readonly_fields = ['blob', 'text', 'page_count', 'thumbnail', 'metadata', 'error', 'created_at', 'processed_at']
+    actions = ['reprocess']
+
+    @admin.action(description="Queue selected resumes for reprocessing")
+    def reprocess(self, request, queryset):
+        queryset.update(status=ResumeAnalysis.PENDING, error='', claimed_until=None)
@@ -0,0 +1,220 @@
+"""
+Async-native lead endpoints for the ASGI deployment.
+
+DRF views are synchronous, so these are plain Django async views that reuse
+the DRF serializers. Reads use the async ORM; lead creation writes the lead,
+its resume blob and its outbox rows in one transaction, which the async ORM
+cannot do yet, so that part runs in a worker thread via sync_to_async.
+"""
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.cache import cache
+from django.http import HttpResponseNotModified, JsonResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.views import View
+from rest_framework.exceptions import APIException, NotFound, Throttled
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
+from rest_framework.request import Request
+from rest_framework.throttling import UserRateThrottle
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+from authentication.authentication import CachedJWTAuthentication
+from utils.throttling import IntakeEmailThrottle, IntakeIPThrottle
+
+from .cache import etag_matches, get_cache_timeout, get_cached_response_key, set_cached_response_headers
+from .conditional import get_lead_validators, set_validator_headers
+from .events import stream_events, unsign_stream_ticket
+from .filters import filter_leads
+from .idempotency import find_replay
+from .models import Lead
+from .pagination import KeysetPagination
+from .serializers import LeadCreateSerializer, LeadFilterSerializer, LeadListSerializer
+from .views import submit_lead
+
+jwt_authentication = CachedJWTAuthentication()
+
+
+async def authenticate(request):
+    """Resolve the simplejwt access token of a request.
+
+    Returns (user, None), or (None, error response) when authentication fails.
+    """
+    header = jwt_authentication.get_header(request)
+    raw_token = jwt_authentication.get_raw_token(header) if header else None
+    if not raw_token:
+        return None, JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+    try:
+        validated_token = jwt_authentication.get_validated_token(raw_token)
+        user = await sync_to_async(jwt_authentication.get_user)(validated_token)
+    except (InvalidToken, AuthenticationFailed) as exc:
+        detail = exc.detail if isinstance(exc.detail, dict) else {'detail': exc.detail}
+        return None, JsonResponse(detail, status=401)
+    return user, None
+
+
+async def authenticate_ticket(ticket):
+    """Resolve a stream ticket; returns (user, None) or (None, error response)"""
+    try:
+        user_id = unsign_stream_ticket(ticket)
+    except signing.BadSignature:
+        return None, JsonResponse({'detail': 'Stream ticket is invalid or expired.'}, status=401)
+    user = await get_user_model().objects.filter(pk=user_id, is_active=True).afirst()
+    if user is None:
+        return None, JsonResponse({'detail': 'User not found'}, status=401)
+    return user, None
+
+
+async def check_throttle(request, user):
+    """Apply the same per-user rate as the DRF views; returns a 429 response when exceeded"""
+    drf_request = Request(request)
+    drf_request.user = user
+    throttle = UserRateThrottle()
+    if await sync_to_async(throttle.allow_request)(drf_request, None):
+        return None
+    return throttled(throttle)
+
+
+def throttled(throttle):
+    wait = throttle.wait()
+    response = JsonResponse({'detail': Throttled(wait).detail}, status=429)
+    if wait is not None:
+        response['Retry-After'] = str(int(wait))
+    return response
+
+
+async def authenticate_and_throttle(request):
+    user, error = await authenticate(request)
+    if error is None:
+        error = await check_throttle(request, user)
+    return user, error
+
+
+def not_found():
+    return JsonResponse({'detail': 'Not found.'}, status=404)
+
+
+class AsyncView(View):
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Token authenticated like the DRF views, so no CSRF cookie is involved
+        view = super().as_view(**initkwargs)
+        view.csrf_exempt = True
+        return view
+
+
+class AsyncLeadCreateView(AsyncView):
+    """Async variant of LeadCreateView"""
+    throttle_classes = [IntakeIPThrottle, IntakeEmailThrottle]
+
+    async def post(self, request, *args, **kwargs):
+        return await sync_to_async(self.create)(request)
+
+    def create(self, request):
+        request = Request(request, parsers=[MultiPartParser(), FormParser(), JSONParser()])
+        try:
+            # A retry replaying a stored response does not use up the intake budget
+            if find_replay(request) is None:
+                for throttle_class in self.throttle_classes:
+                    throttle = throttle_class()
+                    if not throttle.allow_request(request, self):
+                        return throttled(throttle)
+            data, status_code, headers = submit_lead(
+                request,
+                LeadCreateSerializer(data=request.data, context={'request': request})
+            )
+        except APIException as exc:
+            detail = exc.detail if isinstance(exc.detail, (dict, list)) else {'detail': exc.detail}
+            return JsonResponse(detail, status=exc.status_code, safe=False)
+        return JsonResponse(data, status=status_code, headers=headers)
+
+
+class AsyncLeadListView(AsyncView):
+    """Async variant of LeadListView, reading the page with async iteration.
+
+    Pages are served from the same versioned response cache, with the same
+    ETag and Cache-Control headers.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        user, error = await authenticate_and_throttle(request)
+        if error:
+            return error
+
+        key, etag = await sync_to_async(get_cached_response_key)(request.build_absolute_uri())
+        if etag_matches(request, etag):
+            return set_cached_response_headers(HttpResponseNotModified(), etag)
+        data = await cache.aget(key)
+        if data is None:
+            data, error = await self.get_page_data(request)
+            if error:
+                return error
+            await cache.aset(key, data, get_cache_timeout())
+        return set_cached_response_headers(JsonResponse(data), etag)
+
+    async def get_page_data(self, request):
+        """Return (page data, None), or (None, error response) for bad parameters"""
+        request = Request(request)
+        filters = LeadFilterSerializer(data=request.query_params)
+        if not filters.is_valid():
+            return None, JsonResponse(filters.errors, status=400)
+
+        paginator = KeysetPagination()
+        try:
+            page_queryset = paginator.get_page_queryset(
+                filter_leads(Lead.objects.all(), filters.validated_data),
+                request
+            )
+        except NotFound as exc:
+            return None, JsonResponse({'detail': exc.detail}, status=404)
+        rows = paginator.set_page([lead async for lead in page_queryset])
+
+        data = LeadListSerializer(rows, many=True, context={'request': request}).data
+        return paginator.get_paginated_data(data), None
+
+
+class AsyncLeadDetailView(AsyncView):
+    """Async variant of LeadDetailView with the same updated_at validators"""
+
+    async def get(self, request, pk, *args, **kwargs):
+        user, error = await authenticate_and_throttle(request)
+        if error:
+            return error
+
+        updated_at = await Lead.objects.filter(pk=pk).values_list('updated_at', flat=True).afirst()
+        if updated_at is None:
+            return not_found()
+        etag, last_modified = get_lead_validators(pk, updated_at)
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            try:
+                lead = await Lead.objects.aget(pk=pk)
+            except Lead.DoesNotExist:
+                return not_found()
+            etag, last_modified = get_lead_validators(pk, lead.updated_at)
+            response = JsonResponse(LeadListSerializer(lead, context={'request': request}).data)
+        return set_validator_headers(response, etag, last_modified)
+
+
+class LeadEventStreamView(AsyncView):
+    """Server-Sent Events stream of lead.created and lead.status_changed events.
+
+    EventSource cannot send headers, so browsers pass a short-lived ticket
+    from LeadEventTicketView as ?ticket= instead. The access token itself is
+    only accepted in the Authorization header, so it never ends up in URLs.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        ticket = request.GET.get('ticket')
+        if ticket is None:
+            user, error = await authenticate(request)
+        else:
+            user, error = await authenticate_ticket(ticket)
+        if error:
+            return error
+
+        response = StreamingHttpResponse(stream_events(), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        # Stop nginx from buffering the stream
+        response['X-Accel-Buffering'] = 'no'
+        return response
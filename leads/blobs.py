@@ -0,0 +1,184 @@
+from datetime import timedelta
+import hashlib
+import logging
+import os
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, F, OuterRef
+from django.utils import timezone
+
+from .models import Lead, ResumeAnalysis, ResumeBlob
+
+logger = logging.getLogger(__name__)
+
+BLOB_PREFIX = 'resumes/blobs'
+UPLOAD_PREFIX = 'resumes/uploads'
+
+
+def blob_name(sha256, filename):
+    """Content-addressed path, e.g. resumes/blobs/9f/9f86d08...15a08.pdf"""
+    extension = os.path.splitext(filename)[1].lower()
+    return f"{BLOB_PREFIX}/{sha256[:2]}/{sha256}{extension}"
+
+
+def hash_file(file, chunk_size=64 * 1024):
+    digest = hashlib.sha256()
+    for chunk in file.chunks(chunk_size):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def delete_on_commit(name):
+    transaction.on_commit(lambda: default_storage.delete(name))
+
+
+def get_or_create_blob(sha256, size, filename, write):
+    """Return (blob, created) for the given content hash.
+
+    ``write(name)`` stores the bytes under ``name`` and returns the final
+    storage name; it is only called when the content has never been seen.
+    New blobs are queued for the process_resumes worker.
+    """
+    blob = ResumeBlob.objects.filter(sha256=sha256).first()
+    if blob is not None:
+        return blob, False
+
+    name = blob_name(sha256, filename)
+    if not default_storage.exists(name):
+        name = write(name)
+    try:
+        with transaction.atomic():
+            blob = ResumeBlob.objects.create(sha256=sha256, file=name, size=size)
+            ResumeAnalysis.objects.create(blob=blob)
+            return blob, True
+    except IntegrityError:
+        # An identical file was stored concurrently; keep theirs
+        blob = ResumeBlob.objects.get(sha256=sha256)
+        if name != blob.file.name:
+            default_storage.delete(name)
+        return blob, False
+
+
+def store_uploaded_resume(uploaded_file):
+    """Store a multipart upload, reusing the existing blob for identical content"""
+    sha256 = getattr(uploaded_file, 'sha256', None) or hash_file(uploaded_file)
+    blob, _ = get_or_create_blob(
+        sha256,
+        uploaded_file.size,
+        uploaded_file.name,
+        lambda name: default_storage.save(name, uploaded_file)
+    )
+    return blob
+
+
+def store_direct_upload(backend, key, sha256, size):
+    """Adopt a direct-to-storage upload as a blob.
+
+    New content is copied server-side to its content-addressed name; the
+    upload object itself is removed once the transaction commits.
+    """
+    blob, _ = get_or_create_blob(
+        sha256,
+        size,
+        key,
+        lambda name: backend.copy(key, name)
+    )
+    if key != blob.file.name:
+        delete_on_commit(key)
+    return blob
+
+
+def backfill(batch_size=500):
+    """Move resumes stored before content addressing into blobs.
+
+    Returns (migrated, missing) counts.
+    """
+    migrated = missing = 0
+    leads = (
+        Lead.objects
+        .filter(resume_blob__isnull=True)
+        .exclude(resume='')
+        .only('id', 'resume')
+    )
+    for lead in leads.iterator(chunk_size=batch_size):
+        old_name = lead.resume.name
+        if not default_storage.exists(old_name):
+            missing += 1
+            continue
+
+        with default_storage.open(old_name) as file:
+            sha256 = hash_file(file)
+            size = file.size
+
+        with transaction.atomic():
+            def write(name):
+                with default_storage.open(old_name) as source:
+                    return default_storage.save(name, source)
+
+            blob, _ = get_or_create_blob(sha256, size, old_name, write)
+            Lead.objects.filter(pk=lead.pk).update(resume=blob.file.name, resume_blob=blob)
+            ResumeBlob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') + 1)
+            if old_name != blob.file.name and not Lead.objects.filter(resume=old_name).exists():
+                delete_on_commit(old_name)
+        migrated += 1
+    return migrated, missing
+
+
+def collect_garbage(grace=timedelta(days=1)):
+    """Delete unreferenced blobs older than grace and expired direct uploads.
+
+    Returns (blobs_deleted, uploads_deleted) counts.
+    """
+    cutoff = timezone.now() - grace
+    blobs_deleted = 0
+    orphans = (
+        ResumeBlob.objects
+        .filter(ref_count=0, created_at__lt=cutoff)
+        .exclude(Exists(Lead.objects.filter(resume_blob=OuterRef('pk'))))
+        .values_list('pk', flat=True)
+    )
+    for pk in list(orphans):
+        with transaction.atomic():
+            blob = ResumeBlob.objects.select_for_update().filter(pk=pk, ref_count=0).first()
+            if blob is None:
+                continue
+            delete_on_commit(blob.file.name)
+            thumbnail = ResumeAnalysis.objects.filter(blob=blob).values_list('thumbnail', flat=True).first()
+            if thumbnail:
+                delete_on_commit(thumbnail)
+            blob.delete()
+            blobs_deleted += 1
+
+    return blobs_deleted, expire_uploads()
+
+
+def expire_uploads():
+    """Delete direct uploads whose slot expired before a lead adopted them.
+
+    A lead can only reference an upload while its token is valid, so
+    anything older than RESUME_UPLOAD_EXPIRY_SECONDS is unreachable.
+    """
+    return collect_abandoned_uploads(timezone.now() - timedelta(seconds=settings.RESUME_UPLOAD_EXPIRY_SECONDS))
+
+
+def collect_abandoned_uploads(cutoff):
+    """Remove direct uploads that were never turned into a lead"""
+    if not default_storage.exists(UPLOAD_PREFIX):
+        return 0
+
+    deleted = 0
+    directories, _ = default_storage.listdir(UPLOAD_PREFIX)
+    for directory in directories:
+        prefix = f"{UPLOAD_PREFIX}/{directory}"
+        _, files = default_storage.listdir(prefix)
+        for filename in files:
+            name = f"{prefix}/{filename}"
+            if default_storage.get_modified_time(name) >= cutoff:
+                continue
+            if Lead.objects.filter(resume=name).exists():
+                continue
+            default_storage.delete(name)
+            deleted += 1
+    return deleted
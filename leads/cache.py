@@ -0,0 +1,105 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from leads_project.replicas import served_by_replica
+
+VERSION_KEY = 'leads:version'
+RESPONSE_KEY_PREFIX = 'leads:response'
+
+
+def cache_key(*parts):
+    digest = hashlib.sha256(':'.join(str(part) for part in parts).encode()).hexdigest()
+    return f"{RESPONSE_KEY_PREFIX}:{digest}"
+
+
+def get_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # Start from the clock so a lost key never reuses an older version
+        cache.add(VERSION_KEY, time.time_ns())
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_version():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, time.time_ns())
+
+
+def get_cached_response_key(url):
+    """Return the cache key and ETag of the current version of a URL's response"""
+    version = get_version()
+    key = cache_key(version, url)
+    return key, quote_etag(f"{version}-{key[-16:]}")
+
+
+def etag_matches(request, etag):
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if not if_none_match:
+        return False
+    etags = parse_etags(if_none_match)
+    return '*' in etags or etag in etags
+
+
+def get_cache_timeout():
+    # A replica may not have replayed the write that bumped the version
+    # yet, so its responses are only kept as long as replicas may lag
+    if served_by_replica():
+        return min(settings.LEAD_CACHE_TIMEOUT, settings.DB_REPLICA_MAX_LAG_SECONDS)
+    return settings.LEAD_CACHE_TIMEOUT
+
+
+def set_cached_response_headers(response, etag):
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def invalidate_lead_cache():
+    """Invalidate every cached lead response.
+
+    The version is bumped immediately and again once the transaction
+    commits, so a response built from data read before the commit cannot
+    survive under the new version.
+    """
+    bump_version()
+    transaction.on_commit(bump_version)
+
+
+class CachedResponseMixin:
+    """
+    Serve GET responses from the cache, keyed by the full URL and the lead
+    data version, with a matching ETag so unchanged polls get a 304.
+
+    Authentication and permissions are still checked on every request.
+    """
+
+    def get(self, request, *args, **kwargs):
+        key, etag = get_cached_response_key(request.build_absolute_uri())
+        if etag_matches(request, etag):
+            return self.finalize_cached_response(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
+
+        data = cache.get(key)
+        if data is None:
+            response = super().get(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            cache.set(key, response.data, self.get_cache_timeout())
+        else:
+            response = Response(data)
+        return self.finalize_cached_response(response, etag)
+
+    def get_cache_timeout(self):
+        return get_cache_timeout()
+
+    def finalize_cached_response(self, response, etag):
+        return set_cached_response_headers(response, etag)
@@ -0,0 +1,31 @@
+from django.http import Http404
+from django.utils.http import http_date, quote_etag
+
+from .models import Lead
+
+
+def get_lead_validators(pk, updated_at):
+    """Return (etag, last_modified timestamp) for a lead version.
+
+    ``updated_at`` changes on every save, so it is the lead's version.
+    """
+    version = int(updated_at.timestamp() * 1_000_000)
+    return quote_etag(f"{pk}-{version}"), int(updated_at.timestamp())
+
+
+def get_lead_updated_at(pk, lock=False):
+    """Fetch only updated_at, so preconditions are checked without loading the lead"""
+    queryset = Lead.objects.filter(pk=pk)
+    if lock:
+        queryset = queryset.select_for_update()
+    updated_at = queryset.values_list('updated_at', flat=True).first()
+    if updated_at is None:
+        raise Http404
+    return updated_at
+
+
+def set_validator_headers(response, etag, last_modified):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = 'private, no-cache'
+    return response
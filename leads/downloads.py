@@ -0,0 +1,141 @@
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import FileResponse, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeFile:
+    """Expose `length` bytes of a file starting at `start` as a file-like object"""
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.file.seek(start)
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """Return (start, end) for a single satisfiable byte range.
+
+    Returns None when the header should be ignored (absent, malformed or
+    multi-range) and raises ValueError when the range is unsatisfiable.
+    """
+    match = RANGE_RE.match(header or '')
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError(header)
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
+
+
+def get_resume_validators(lead):
+    """Return (etag, last_modified timestamp) for a lead's resume.
+
+    Content-addressed resumes use their SHA-256 as a strong ETag.
+    """
+    blob = lead.resume_blob
+    if blob is not None:
+        return quote_etag(blob.sha256), int(blob.created_at.timestamp())
+    modified = default_storage.get_modified_time(lead.resume.name)
+    etag = quote_etag(f"{lead.pk}-{int(modified.timestamp())}")
+    return etag, int(modified.timestamp())
+
+
+def serve_resume(request, lead):
+    """Build the download response for a lead's resume.
+
+    With RESUME_DOWNLOAD_ACCEL set, the front proxy streams the file via
+    X-Accel-Redirect (nginx) or X-Sendfile (Apache/lighttpd) and handles
+    ranges itself. Otherwise Django serves it with FileResponse, which lets
+    the WSGI server use zero-copy sendfile for full downloads.
+    """
+    name = lead.resume.name
+    etag, last_modified = get_resume_validators(lead)
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = build_file_response(request, name, etag, last_modified)
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = 'private, max-age=3600'
+    if response.status_code in (200, 206):
+        extension = os.path.splitext(name)[1]
+        response['Content-Disposition'] = f'attachment; filename="lead-{lead.pk}-resume{extension}"'
+    return response
+
+
+def build_file_response(request, name, etag, last_modified):
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+    accel = settings.RESUME_DOWNLOAD_ACCEL
+
+    if accel == 'x-accel-redirect':
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = settings.RESUME_ACCEL_REDIRECT_PREFIX.rstrip('/') + '/' + name
+        return response
+    if accel == 'x-sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = default_storage.path(name)
+        return response
+
+    size = default_storage.size(name)
+    file = default_storage.open(name, 'rb')
+    response = None
+    if if_range_matches(request, etag, last_modified):
+        try:
+            byte_range = parse_range(request.META.get('HTTP_RANGE'), size)
+        except ValueError:
+            file.close()
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+        if byte_range is not None:
+            start, end = byte_range
+            response = FileResponse(RangeFile(file, start, end - start + 1), content_type=content_type, status=206)
+            response['Content-Length'] = str(end - start + 1)
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+
+    if response is None:
+        response = FileResponse(file, content_type=content_type)
+        response['Content-Length'] = str(size)
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+def if_range_matches(request, etag, last_modified):
+    """Ranges only apply if If-Range (when sent) still matches the current file"""
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+    if if_range.startswith('"') or if_range.startswith('W/'):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
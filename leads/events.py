@@ -0,0 +1,235 @@
+"""
+Real-time lead events for the /api/leads/events/ Server-Sent Events stream.
+
+Events are published inside the transaction that changes the lead and only
+reach subscribers once it commits. With LEAD_EVENTS_BACKEND = 'postgres'
+they travel through PostgreSQL NOTIFY, so every ASGI process sees writes
+made by any web or worker process; 'local' keeps them within one process.
+"""
+import asyncio
+import json
+import logging
+import threading
+
+import psycopg2
+import psycopg2.extensions
+from django.conf import settings
+from django.core import signing
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, connections, transaction
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'lead_events'
+LEAD_CREATED = 'lead.created'
+LEAD_STATUS_CHANGED = 'lead.status_changed'
+
+# NOTIFY payloads are limited to 8000 bytes
+STATUS_CHANGE_CHUNK_SIZE = 500
+RECONNECT_DELAY_SECONDS = 5
+TICKET_SALT = 'leads.events.ticket'
+
+
+def sign_stream_ticket(user):
+    return signing.dumps({'user': user.pk}, salt=TICKET_SALT)
+
+
+def unsign_stream_ticket(ticket):
+    """Return the user id of a ticket issued by LeadEventTicketView.
+
+    Raises signing.BadSignature (or its SignatureExpired subclass) for forged
+    or stale tickets. The salt keeps tickets from being accepted anywhere else.
+    """
+    payload = signing.loads(ticket, salt=TICKET_SALT, max_age=settings.LEAD_EVENTS_TICKET_SECONDS)
+    return payload['user']
+
+
+def publish_lead_event(event_type, data):
+    """Queue an event for delivery when the current transaction commits"""
+    payload = json.dumps({'type': event_type, 'data': data}, cls=DjangoJSONEncoder)
+    if settings.LEAD_EVENTS_BACKEND == 'postgres':
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [CHANNEL, payload])
+    else:
+        transaction.on_commit(lambda: broker.publish(payload))
+
+
+def publish_lead_created(lead):
+    publish_lead_event(LEAD_CREATED, {
+        'id': lead.pk,
+        'first_name': lead.first_name,
+        'last_name': lead.last_name,
+        'email': lead.email,
+        'status': lead.status,
+        'created_at': lead.created_at,
+        'updated_at': lead.updated_at,
+    })
+
+
+def publish_status_changed(ids, status, updated_at):
+    for start in range(0, len(ids), STATUS_CHANGE_CHUNK_SIZE):
+        publish_lead_event(LEAD_STATUS_CHANGED, {
+            'ids': ids[start:start + STATUS_CHANGE_CHUNK_SIZE],
+            'status': status,
+            'updated_at': updated_at,
+        })
+
+
+class Subscription:
+    """One stream's event queue, bound to the event loop serving it"""
+
+    def __init__(self, loop, maxsize):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+    def put(self, payload):
+        if self.overflowed:
+            return
+        if self.queue.full():
+            # A client that cannot keep up is disconnected and will reconnect
+            self.overflowed = True
+            self.queue.get_nowait()
+            self.queue.put_nowait(None)
+            return
+        self.queue.put_nowait(payload)
+
+
+class EventBroker:
+    """Fans published events out to the subscribers of this process"""
+
+    def __init__(self):
+        self.subscribers = set()
+        self.lock = threading.Lock()
+        self.listener = None
+
+    def subscribe(self):
+        loop = asyncio.get_running_loop()
+        subscription = Subscription(loop, settings.LEAD_EVENTS_QUEUE_SIZE)
+        with self.lock:
+            self.subscribers.add(subscription)
+            if settings.LEAD_EVENTS_BACKEND == 'postgres':
+                self.ensure_listener(loop)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            self.subscribers.discard(subscription)
+            if not self.subscribers and self.listener is not None:
+                self.listener.stop()
+                self.listener = None
+
+    def publish(self, payload):
+        """Deliver a JSON payload; safe to call from any thread"""
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for subscription in subscribers:
+            if not subscription.loop.is_closed():
+                subscription.loop.call_soon_threadsafe(subscription.put, payload)
+
+    def ensure_listener(self, loop):
+        if self.listener is not None and self.listener.loop is loop:
+            return
+        if self.listener is not None:
+            self.listener.stop()
+        self.listener = PostgresListener(loop, self.publish)
+        self.listener.start()
+
+
+class PostgresListener:
+    """
+    LISTENs on a dedicated connection and hands notifications to the broker.
+
+    The connection's socket is watched by the event loop, so no thread is
+    blocked waiting for events.
+    """
+
+    def __init__(self, loop, callback):
+        self.loop = loop
+        self.callback = callback
+        self.connection = None
+        self.fileno = None
+        self.stopped = False
+
+    def start(self):
+        if self.stopped:
+            return
+        params = connections['default'].get_connection_params()
+        params.pop('cursor_factory', None)
+        try:
+            self.connection = psycopg2.connect(**params)
+            self.connection.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+            with self.connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {CHANNEL}")
+        except psycopg2.Error as exc:
+            logger.warning("Could not listen for lead events, retrying: %s", exc)
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
+            self.schedule_restart()
+            return
+        self.fileno = self.connection.fileno()
+        self.loop.add_reader(self.fileno, self.poll)
+
+    def poll(self):
+        try:
+            self.connection.poll()
+        except psycopg2.Error as exc:
+            logger.warning("Lead event listener lost its connection, reconnecting: %s", exc)
+            self.close()
+            self.schedule_restart()
+            return
+        while self.connection.notifies:
+            self.callback(self.connection.notifies.pop(0).payload)
+
+    def schedule_restart(self):
+        if not self.stopped:
+            self.loop.call_later(RECONNECT_DELAY_SECONDS, self.start)
+
+    def close(self):
+        if self.connection is None:
+            return
+        if not self.loop.is_closed():
+            self.loop.remove_reader(self.fileno)
+        self.connection.close()
+        self.connection = None
+
+    def stop(self):
+        self.stopped = True
+        self.close()
+
+
+broker = EventBroker()
+
+
+def format_event(payload):
+    event = json.loads(payload)
+    return f"event: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+
+
+async def stream_events():
+    """Yield Server-Sent Events until the stream times out or falls behind.
+
+    Comment lines keep idle connections open through proxies; ending the
+    stream after LEAD_EVENTS_MAX_STREAM_SECONDS makes EventSource clients
+    reconnect, which also frees streams of clients that went away silently.
+    """
+    subscription = broker.subscribe()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.LEAD_EVENTS_MAX_STREAM_SECONDS
+    try:
+        yield f"retry: {settings.LEAD_EVENTS_RETRY_MILLISECONDS}\n\n"
+        while True:
+            timeout = min(settings.LEAD_EVENTS_HEARTBEAT_SECONDS, deadline - loop.time())
+            if timeout <= 0:
+                return
+            try:
+                payload = await asyncio.wait_for(subscription.queue.get(), timeout)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if payload is None:
+                return
+            yield format_event(payload)
+    finally:
+        broker.unsubscribe(subscription)
@@ -0,0 +1,42 @@
+import csv
+import json
+from datetime import datetime
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+EXPORT_FIELDS = [
+    'id', 'first_name', 'last_name', 'email',
+    'resume', 'status', 'created_at', 'updated_at'
+]
+
+
+class Echo:
+    """File-like object whose write() just returns the line for streaming"""
+
+    def write(self, value):
+        return value
+
+
+def iter_export_rows(queryset, chunk_size):
+    """Yield plain dicts straight from a server-side cursor, never model instances"""
+    return (
+        queryset
+        .order_by('-created_at', '-id')
+        .values(*EXPORT_FIELDS)
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def stream_csv(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        yield writer.writerow([
+            value.isoformat() if isinstance(value, datetime) else value
+            for value in (row[field] for field in EXPORT_FIELDS)
+        ])
+
+
+def stream_ndjson(rows):
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder) + '\n'
@@ -0,0 +1,147 @@
+"""
+Resume parsing used by the process_resumes worker.
+
+Everything here is plain Python with no Django or database access, so it can
+run inside a process pool. PDFs are parsed with pypdf and their thumbnails
+rendered with pypdfium2.
+"""
+import io
+import re
+import zipfile
+from xml.etree import ElementTree
+
+import pypdf
+import pypdfium2
+from PIL import Image
+
+THUMBNAIL_SIZE = (300, 400)
+MAX_TEXT_LENGTH = 200_000
+
+WORD_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+DC_NS = '{http://purl.org/dc/elements/1.1/}'
+DCTERMS_NS = '{http://purl.org/dc/terms/}'
+APP_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/extended-properties}'
+
+
+def extract_resume(data: bytes, extension: str):
+    """Return a dict with text, page_count, thumbnail (PNG bytes or None) and metadata"""
+    extension = extension.lower().lstrip('.')
+    if extension == 'pdf':
+        result = extract_pdf(data)
+    elif extension == 'docx':
+        result = extract_docx(data)
+    else:
+        result = extract_doc(data)
+    result['text'] = normalize_text(result['text'])[:MAX_TEXT_LENGTH]
+    result['metadata']['size'] = len(data)
+    return result
+
+
+def normalize_text(text):
+    text = text.replace('\x00', '')
+    text = re.sub(r'[ \t\r\f\v]+', ' ', text)
+    text = re.sub(r'\n\s*\n+', '\n\n', text)
+    return text.strip()
+
+
+def make_thumbnail(image_bytes):
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        image = image.convert('RGB')
+        image.thumbnail(THUMBNAIL_SIZE)
+        output = io.BytesIO()
+        image.save(output, format='PNG')
+        return output.getvalue()
+
+
+# PDF
+
+PDF_METADATA_KEYS = ('/Title', '/Author', '/Creator', '/Producer', '/CreationDate')
+
+
+def extract_pdf(data):
+    reader = pypdf.PdfReader(io.BytesIO(data))
+    text = '\n\n'.join(page.extract_text() or '' for page in reader.pages)
+    info = reader.metadata or {}
+    metadata = {
+        key.lstrip('/').lower(): str(value)
+        for key, value in info.items()
+        if key in PDF_METADATA_KEYS
+    }
+    metadata['parser'] = 'pypdf'
+    return {
+        'text': text,
+        'page_count': len(reader.pages),
+        'thumbnail': render_pdf_thumbnail(data),
+        'metadata': metadata,
+    }
+
+
+def render_pdf_thumbnail(data):
+    document = pypdfium2.PdfDocument(data)
+    try:
+        if not len(document):
+            return None
+        output = io.BytesIO()
+        document[0].render(scale=1).to_pil().save(output, format='PNG')
+        return make_thumbnail(output.getvalue())
+    finally:
+        document.close()
+
+
+# DOCX
+
+def extract_docx(data):
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        names = set(archive.namelist())
+        document = ElementTree.fromstring(archive.read('word/document.xml'))
+        paragraphs = [
+            ''.join(node.text or '' for node in paragraph.iter(f'{WORD_NS}t'))
+            for paragraph in document.iter(f'{WORD_NS}p')
+        ]
+
+        metadata = {'parser': 'docx'}
+        page_count = None
+        if 'docProps/core.xml' in names:
+            core = ElementTree.fromstring(archive.read('docProps/core.xml'))
+            for key, tag in (('title', f'{DC_NS}title'), ('author', f'{DC_NS}creator'),
+                             ('creationdate', f'{DCTERMS_NS}created')):
+                node = core.find(tag)
+                if node is not None and node.text:
+                    metadata[key] = node.text
+        if 'docProps/app.xml' in names:
+            app = ElementTree.fromstring(archive.read('docProps/app.xml'))
+            pages = app.find(f'{APP_NS}Pages')
+            if pages is not None and (pages.text or '').isdigit():
+                page_count = int(pages.text)
+
+        thumbnail = None
+        for name in ('docProps/thumbnail.jpeg', 'docProps/thumbnail.png'):
+            if name in names:
+                thumbnail = make_thumbnail(archive.read(name))
+                break
+
+    return {
+        'text': '\n'.join(paragraphs),
+        'page_count': page_count,
+        'thumbnail': thumbnail,
+        'metadata': metadata,
+    }
+
+
+# Legacy DOC
+
+DOC_UTF16_RE = re.compile(rb'(?:[\x20-\x7e\n\r\t]\x00){8,}')
+DOC_ASCII_RE = re.compile(rb'[\x20-\x7e\n\r\t]{8,}')
+
+
+def extract_doc(data):
+    """Pull readable runs out of a binary Word file; no layout information"""
+    runs = [run.decode('utf-16-le') for run in DOC_UTF16_RE.findall(data)]
+    if not runs:
+        runs = [run.decode('ascii') for run in DOC_ASCII_RE.findall(data)]
+    return {
+        'text': '\n'.join(runs),
+        'page_count': None,
+        'thumbnail': None,
+        'metadata': {'parser': 'heuristic'},
+    }
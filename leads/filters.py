@@ -0,0 +1,95 @@
+import html
+import re
+
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast
+
+from .models import LEAD_SEARCH_VECTOR, RESUME_SEARCH_CONFIG, ResumeAnalysis
+
+SEARCH_TOKEN_RE = re.compile(r"[\w.+-]+")
+
+# Control characters cannot occur in extracted text, so they safely mark
+# highlights until the snippet has been HTML-escaped
+HIGHLIGHT_START = '\x02'
+HIGHLIGHT_STOP = '\x03'
+
+
+def build_search_query(term):
+    """Prefix-match every word of the term, e.g. "jo exa" -> 'jo':* & 'exa':*"""
+    tokens = SEARCH_TOKEN_RE.findall(term.replace('@', ' '))
+    if not tokens:
+        return None
+    return SearchQuery(
+        ' & '.join(f"'{token}':*" for token in tokens),
+        search_type='raw',
+        config='simple'
+    )
+
+
+def search_leads(queryset, term):
+    query = build_search_query(term)
+    if query is None:
+        return queryset
+    return queryset.alias(search=LEAD_SEARCH_VECTOR).filter(search=query)
+
+
+def build_resume_query(term):
+    """Web-search syntax: words are ANDed, "quoted phrases", or, and -exclusions"""
+    return SearchQuery(term, search_type='websearch', config=RESUME_SEARCH_CONFIG)
+
+
+def search_resumes(queryset, term):
+    """Leads whose resume text matches term, annotated with its rank.
+
+    Matches come from the GIN index on the stored resume tsvector; the
+    text itself is never scanned.
+    """
+    query = build_resume_query(term)
+    return queryset.filter(
+        resume_blob__analysis__search_vector=query
+    ).annotate(
+        # ts_rank returns real; as double precision the value round-trips
+        # exactly through pagination cursors
+        rank=Cast(SearchRank(F('resume_blob__analysis__search_vector'), query), FloatField())
+    )
+
+
+def resume_headlines(leads, term):
+    """Map resume_blob_id to an HTML snippet with matches wrapped in <mark>.
+
+    Snippets are built only for the given leads, typically one page.
+    """
+    blob_ids = {lead.resume_blob_id for lead in leads if lead.resume_blob_id}
+    if not blob_ids:
+        return {}
+    rows = (
+        ResumeAnalysis.objects
+        .filter(blob_id__in=blob_ids)
+        .annotate(headline=SearchHeadline(
+            'text',
+            build_resume_query(term),
+            config=RESUME_SEARCH_CONFIG,
+            start_sel=HIGHLIGHT_START,
+            stop_sel=HIGHLIGHT_STOP,
+            max_fragments=3
+        ))
+        .values_list('blob_id', 'headline')
+    )
+    return {
+        blob_id: html.escape(headline).replace(HIGHLIGHT_START, '<mark>').replace(HIGHLIGHT_STOP, '</mark>')
+        for blob_id, headline in rows
+    }
+
+
+def filter_leads(queryset, filters):
+    """Apply validated LeadFilterSerializer data to a lead queryset"""
+    if filters.get('status'):
+        queryset = queryset.filter(status=filters['status'])
+    if filters.get('created_after'):
+        queryset = queryset.filter(created_at__gte=filters['created_after'])
+    if filters.get('created_before'):
+        queryset = queryset.filter(created_at__lt=filters['created_before'])
+    if filters.get('search'):
+        queryset = search_leads(queryset, filters['search'])
+    return queryset
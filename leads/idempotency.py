@@ -0,0 +1,97 @@
+"""
+Idempotency-Key support for lead submissions.
+
+The key and the response are stored in the transaction that creates the
+lead. A concurrent request with the same key blocks on the unique index
+until the first one commits, then rolls back and replays the stored
+response instead.
+"""
+from datetime import timedelta
+import hashlib
+import json
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from .models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+
+
+class IdempotencyKeyMismatch(APIException):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = "Idempotency-Key was already used for a different submission."
+    default_code = 'idempotency_key_mismatch'
+
+
+class KeyTaken(Exception):
+    """A concurrent request stored a response for the same key first"""
+
+
+def get_idempotency_key(request):
+    key = request.headers.get(IDEMPOTENCY_HEADER, '').strip()
+    if len(key) > MAX_KEY_LENGTH:
+        raise ValidationError({IDEMPOTENCY_HEADER: [f"Ensure this header has no more than {MAX_KEY_LENGTH} characters."]})
+    return key or None
+
+
+def request_fingerprint(data):
+    """Hash of the submitted name and email; the resume is not compared"""
+    fields = [
+        str(data.get('first_name', '')).strip(),
+        str(data.get('last_name', '')).strip(),
+        str(data.get('email', '')).strip().lower(),
+    ]
+    return hashlib.sha256(json.dumps(fields).encode()).hexdigest()
+
+
+def expiry_cutoff():
+    return timezone.now() - timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+
+
+def find_stored_response(key, fingerprint):
+    """Return the unexpired IdempotencyKey for key, or None.
+
+    Raises IdempotencyKeyMismatch when it was stored for other data.
+    """
+    stored = IdempotencyKey.objects.filter(key=key, created_at__gte=expiry_cutoff()).first()
+    if stored is not None and stored.fingerprint != fingerprint:
+        raise IdempotencyKeyMismatch()
+    return stored
+
+
+def find_replay(request):
+    """Return the stored response a retry of request replays, or None.
+
+    Used to let retries past the intake throttles, which run before the view.
+    """
+    key = get_idempotency_key(request)
+    if key is None:
+        return None
+    return find_stored_response(key, request_fingerprint(request.data))
+
+
+def store_response(key, fingerprint, lead, status_code, response):
+    """Record the response for key; raises KeyTaken when another request did first"""
+    IdempotencyKey.objects.filter(key=key, created_at__lt=expiry_cutoff()).delete()
+    try:
+        with transaction.atomic():
+            IdempotencyKey.objects.create(
+                key=key,
+                fingerprint=fingerprint,
+                lead=lead,
+                status_code=status_code,
+                response=response
+            )
+    except IntegrityError:
+        raise KeyTaken()
+
+
+def purge_expired_keys():
+    """Delete keys older than IDEMPOTENCY_KEY_TTL_HOURS; returns how many"""
+    deleted, _ = IdempotencyKey.objects.filter(created_at__lt=expiry_cutoff()).delete()
+    return deleted
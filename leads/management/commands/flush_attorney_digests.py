@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from leads.outbox import flush_digests
+
+
+class Command(BaseCommand):
+    help = "Queue digest emails for attorneys whose digest window has elapsed"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help="Flush all held notifications regardless of the digest window"
+        )
+
+    def handle(self, *args, **options):
+        queued = flush_digests(force=options['force'])
+        self.stdout.write(f"Queued {queued} attorney digests")
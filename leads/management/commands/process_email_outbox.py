@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from leads.outbox import OutboxWorker, flush_digests
+
+
+class Command(BaseCommand):
+    help = (
+        "Send queued lead notification emails, retrying failures with exponential backoff. "
+        "Due attorney digests are flushed on every pass."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help="Drain everything that is currently due and exit"
+        )
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument(
+            '--interval', type=float, default=5.0,
+            help="Seconds to sleep when the outbox is empty"
+        )
+
+    def handle(self, *args, **options):
+        worker = OutboxWorker(batch_size=options['batch_size'])
+
+        if options['once']:
+            flush_digests()
+            processed = worker.drain()
+            self.stdout.write(f"Processed {processed} outbox entries")
+            return
+
+        self.stdout.write("Email outbox worker started")
+        try:
+            while True:
+                flush_digests()
+                if worker.drain() == 0:
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write("Email outbox worker stopped")
@@ -0,0 +1,44 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from leads.processing import ResumeProcessor
+
+
+class Command(BaseCommand):
+    help = "Extract text, page counts and thumbnails from newly stored resumes in a process pool"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help="Process everything that is currently pending and exit"
+        )
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument(
+            '--workers', type=int, default=None,
+            help="Parser processes (defaults to RESUME_PROCESSING_WORKERS)"
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5.0,
+            help="Seconds to sleep when nothing is pending"
+        )
+
+    def handle(self, *args, **options):
+        processor = ResumeProcessor(
+            workers=options['workers'] or settings.RESUME_PROCESSING_WORKERS,
+            batch_size=options['batch_size']
+        )
+        with processor:
+            if options['once']:
+                processed = processor.drain()
+                self.stdout.write(f"Processed {processed} resumes")
+                return
+
+            self.stdout.write("Resume processing worker started")
+            try:
+                while True:
+                    if processor.drain() == 0:
+                        time.sleep(options['interval'])
+            except KeyboardInterrupt:
+                self.stdout.write("Resume processing worker stopped")
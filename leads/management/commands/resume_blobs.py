@@ -0,0 +1,28 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from leads.blobs import backfill, collect_garbage, expire_uploads
+
+
+class Command(BaseCommand):
+    help = "Backfill content-addressed resume blobs, garbage-collect unreferenced ones or expire direct uploads"
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=['backfill', 'gc', 'expire-uploads'])
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--grace-hours', type=float, default=24,
+            help="Only collect blobs older than this"
+        )
+
+    def handle(self, *args, **options):
+        if options['action'] == 'backfill':
+            migrated, missing = backfill(batch_size=options['batch_size'])
+            self.stdout.write(f"Moved {migrated} resumes into blobs ({missing} files missing)")
+        elif options['action'] == 'expire-uploads':
+            uploads = expire_uploads()
+            self.stdout.write(f"Deleted {uploads} expired uploads")
+        else:
+            blobs, uploads = collect_garbage(grace=timedelta(hours=options['grace_hours']))
+            self.stdout.write(f"Deleted {blobs} orphaned blobs and {uploads} abandoned uploads")
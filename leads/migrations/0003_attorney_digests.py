@@ -0,0 +1,52 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leads', '0002_emailoutbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationPreference',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('email', models.EmailField(max_length=254, unique=True)),
+                ('mode', models.CharField(choices=[('IMMEDIATE', 'Immediate'), ('DIGEST', 'Digest')], default='IMMEDIATE', max_length=20)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='emailoutbox',
+            name='digest',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='items', to='leads.emailoutbox'),
+        ),
+        migrations.AddField(
+            model_name='emailoutbox',
+            name='recipient',
+            field=models.EmailField(blank=True, max_length=254),
+        ),
+        migrations.AlterField(
+            model_name='emailoutbox',
+            name='kind',
+            field=models.CharField(choices=[('PROSPECT_CONFIRMATION', 'Prospect Confirmation'), ('ATTORNEY_NOTIFICATION', 'Attorney Notification'), ('ATTORNEY_DIGEST', 'Attorney Digest')], max_length=32),
+        ),
+        migrations.AlterField(
+            model_name='emailoutbox',
+            name='lead',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='emails', to='leads.lead'),
+        ),
+        migrations.AlterField(
+            model_name='emailoutbox',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'Pending'), ('HELD', 'Held for digest'), ('DIGESTED', 'Included in digest'), ('SENT', 'Sent'), ('DEAD', 'Dead')], default='PENDING', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='emailoutbox',
+            index=models.Index(condition=models.Q(('status', 'HELD')), fields=['recipient', 'created_at'], name='emailoutbox_held_idx'),
+        ),
+    ]
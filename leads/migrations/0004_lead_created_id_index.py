@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:21
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('leads', '0003_attorney_digests'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='lead',
+            options={'ordering': ['-created_at', '-id']},
+        ),
+        AddIndexConcurrently(
+            model_name='lead',
+            index=models.Index(fields=['-created_at', '-id'], name='lead_created_id_idx'),
+        ),
+    ]
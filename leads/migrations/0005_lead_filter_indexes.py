@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:22
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('leads', '0004_lead_created_id_index'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='lead',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='lead_status_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='lead',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.SearchVector('first_name', 'last_name', django.db.models.functions.text.Replace('email', models.Value('@'), models.Value(' ')), config='simple'), name='lead_search_idx'),
+        ),
+    ]
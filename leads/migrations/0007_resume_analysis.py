@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:34
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def queue_existing_blobs(apps, schema_editor):
+    ResumeBlob = apps.get_model('leads', 'ResumeBlob')
+    ResumeAnalysis = apps.get_model('leads', 'ResumeAnalysis')
+    ResumeAnalysis.objects.bulk_create(
+        [ResumeAnalysis(blob_id=pk) for pk in ResumeBlob.objects.values_list('pk', flat=True)],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leads', '0006_resume_blobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumeAnalysis',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('DONE', 'Done'), ('FAILED', 'Failed')], default='PENDING', max_length=20)),
+                ('text', models.TextField(blank=True)),
+                ('page_count', models.PositiveIntegerField(blank=True, null=True)),
+                ('thumbnail', models.ImageField(blank=True, upload_to='resumes/thumbnails/')),
+                ('metadata', models.JSONField(blank=True, default=dict)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('blob', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='analysis', to='leads.resumeblob')),
+            ],
+            options={
+                'verbose_name_plural': 'resume analyses',
+                'indexes': [models.Index(condition=models.Q(('status', 'PENDING')), fields=['created_at'], name='resumeanalysis_pending_idx')],
+            },
+        ),
+        migrations.RunPython(queue_existing_blobs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:37
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+
+def index_processed_resumes(apps, schema_editor):
+    ResumeAnalysis = apps.get_model('leads', 'ResumeAnalysis')
+    ResumeAnalysis.objects.filter(status='DONE').update(
+        search_vector=SearchVector('text', config='english')
+    )
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('leads', '0007_resume_analysis'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resumeanalysis',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(index_processed_resumes, migrations.RunPython.noop),
+        AddIndexConcurrently(
+            model_name='resumeanalysis',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='resumeanalysis_search_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:15
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+import django.db.models.deletion
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('leads', '0008_resume_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdempotencyKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=255, unique=True)),
+                ('fingerprint', models.CharField(max_length=64)),
+                ('status_code', models.PositiveSmallIntegerField()),
+                ('response', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+        AddIndexConcurrently(
+            model_name='lead',
+            index=models.Index(django.db.models.functions.text.Upper('email'), models.OrderBy(models.F('created_at'), descending=True), name='lead_email_created_idx'),
+        ),
+        migrations.AddField(
+            model_name='idempotencykey',
+            name='lead',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='idempotency_keys', to='leads.lead'),
+        ),
+    ]
@@ -1,6 +1,103 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
+from django.db.models import Value
+from django.db.models.functions import Replace, Upper
+from django.utils import timezone
 from django.core.validators import FileExtensionValidator
 
+RESUME_EXTENSIONS = ['pdf', 'doc', 'docx']
+RESUME_MAX_SIZE = 5 * 1024 * 1024  # 5MB
+
+# Splitting the email on "@" makes both the mailbox and the domain searchable.
+# The expression must stay identical to the GIN index on Lead, otherwise
+# PostgreSQL cannot use the index for searches.
+LEAD_SEARCH_VECTOR = SearchVector(
+    'first_name',
+    'last_name',
+    Replace('email', Value('@'), Value(' ')),
+    config='simple'
+)
+
+
+# Resume text is stemmed, so "litigation" also finds "litigator"
+RESUME_SEARCH_CONFIG = 'english'
+RESUME_SEARCH_VECTOR = SearchVector('text', config=RESUME_SEARCH_CONFIG)
+
+
+class ResumeBlob(models.Model):
+    """A stored resume file, shared by every lead that uploaded identical bytes"""
+    sha256 = models.CharField(max_length=64, unique=True)
+    file = models.FileField(upload_to='resumes/blobs/')
+    size = models.PositiveIntegerField()
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['created_at'],
+                condition=models.Q(ref_count=0),
+                name='resumeblob_orphan_idx',
+            ),
+        ]
+    
+    def __str__(self):
+        return self.sha256
+
+
+class ResumeAnalysis(models.Model):
+    """Text, page count, thumbnail and metadata extracted from a resume blob.
+
+    Keyed by blob, so identical files uploaded by several leads are parsed once.
+    """
+    PENDING = 'PENDING'
+    DONE = 'DONE'
+    FAILED = 'FAILED'
+
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    blob = models.OneToOneField(
+        ResumeBlob,
+        on_delete=models.CASCADE,
+        related_name='analysis'
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=PENDING
+    )
+    text = models.TextField(blank=True)
+    page_count = models.PositiveIntegerField(null=True, blank=True)
+    thumbnail = models.ImageField(upload_to='resumes/thumbnails/', blank=True)
+    metadata = models.JSONField(default=dict, blank=True)
+    # Stored RESUME_SEARCH_VECTOR of text, written when the resume is processed
+    search_vector = SearchVectorField(null=True, editable=False)
+    error = models.TextField(blank=True)
+    # Set while a process_resumes worker parses the file; an expired claim can be taken again
+    claimed_until = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name_plural = 'resume analyses'
+        indexes = [
+            models.Index(
+                fields=['created_at'],
+                condition=models.Q(status='PENDING'),
+                name='resumeanalysis_pending_idx',
+            ),
+            GinIndex(fields=['search_vector'], name='resumeanalysis_search_idx'),
+        ]
+
+    def __str__(self):
+        return f"Analysis of {self.blob_id} ({self.status})"
+
+
 class Lead(models.Model):
     PENDING = 'PENDING'
     REACHED_OUT = 'REACHED_OUT'
@@ -10,12 +107,25 @@ class Lead(models.Model):
         (REACHED_OUT, 'Reached Out'),
     ]
     
+    # Status changes allowed by the bulk update endpoint
+    STATUS_TRANSITIONS = {
+        PENDING: [REACHED_OUT],
+        REACHED_OUT: [],
+    }
+    
     first_name = models.CharField(max_length=100)
     last_name = models.CharField(max_length=100)
     email = models.EmailField()
     resume = models.FileField(
         upload_to='resumes/',
-        validators=[FileExtensionValidator(allowed_extensions=['pdf', 'doc', 'docx'])]
+        validators=[FileExtensionValidator(allowed_extensions=RESUME_EXTENSIONS)]
+    )
+    resume_blob = models.ForeignKey(
+        ResumeBlob,
+        on_delete=models.PROTECT,
+        related_name='leads',
+        null=True,
+        blank=True
     )
     status = models.CharField(
         max_length=20, 
@@ -26,7 +136,134 @@ class Lead(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
-        ordering = ['-created_at']
+        ordering = ['-created_at', '-id']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='lead_created_id_idx'),
+            models.Index(fields=['status', '-created_at', '-id'], name='lead_status_created_idx'),
+            GinIndex(LEAD_SEARCH_VECTOR, name='lead_search_idx'),
+            # Duplicate submission check; email__iexact compares UPPER(email)
+            models.Index(Upper('email'), models.F('created_at').desc(), name='lead_email_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.first_name} {self.last_name} - {self.email}"
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remembered so a save can tell whether the status changed
+        if 'status' in field_names:
+            instance._loaded_status = instance.status
+        return instance
+    
+    @classmethod
+    def transition_sources(cls, target):
+        """Statuses a lead may be in to be moved to target"""
+        return [status for status in cls.STATUS_TRANSITIONS if target in cls.STATUS_TRANSITIONS[status]]
+
+
+class EmailOutbox(models.Model):
+    PROSPECT_CONFIRMATION = 'PROSPECT_CONFIRMATION'
+    ATTORNEY_NOTIFICATION = 'ATTORNEY_NOTIFICATION'
+    ATTORNEY_DIGEST = 'ATTORNEY_DIGEST'
+
+    KIND_CHOICES = [
+        (PROSPECT_CONFIRMATION, 'Prospect Confirmation'),
+        (ATTORNEY_NOTIFICATION, 'Attorney Notification'),
+        (ATTORNEY_DIGEST, 'Attorney Digest'),
+    ]
+
+    PENDING = 'PENDING'
+    HELD = 'HELD'
+    DIGESTED = 'DIGESTED'
+    SENT = 'SENT'
+    DEAD = 'DEAD'
+
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (HELD, 'Held for digest'),
+        (DIGESTED, 'Included in digest'),
+        (SENT, 'Sent'),
+        (DEAD, 'Dead'),
+    ]
+
+    # Digest emails have no lead; their leads are the items pointing at them
+    lead = models.ForeignKey(
+        Lead,
+        on_delete=models.CASCADE,
+        related_name='emails',
+        null=True,
+        blank=True
+    )
+    digest = models.ForeignKey(
+        'self',
+        on_delete=models.SET_NULL,
+        related_name='items',
+        null=True,
+        blank=True
+    )
+    kind = models.CharField(max_length=32, choices=KIND_CHOICES)
+    recipient = models.EmailField(blank=True)
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=PENDING
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(
+                fields=['next_attempt_at'],
+                condition=models.Q(status='PENDING'),
+                name='emailoutbox_due_idx',
+            ),
+            models.Index(
+                fields=['recipient', 'created_at'],
+                condition=models.Q(status='HELD'),
+                name='emailoutbox_held_idx',
+            ),
+        ]
+
+    def __str__(self):
+        if self.kind == self.ATTORNEY_DIGEST:
+            return f"{self.kind} for {self.recipient} ({self.status})"
+        return f"{self.kind} for lead {self.lead_id} ({self.status})"
+
+
+class NotificationPreference(models.Model):
+    IMMEDIATE = 'IMMEDIATE'
+    DIGEST = 'DIGEST'
+
+    MODE_CHOICES = [
+        (IMMEDIATE, 'Immediate'),
+        (DIGEST, 'Digest'),
+    ]
+
+    email = models.EmailField(unique=True)
+    mode = models.CharField(max_length=20, choices=MODE_CHOICES, default=IMMEDIATE)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.email} - {self.mode}"
+
+
+class IdempotencyKey(models.Model):
+    """The response to a lead submission sent with an Idempotency-Key header,
+    replayed when the client retries with the same key.
+    """
+    key = models.CharField(max_length=255, unique=True)
+    # Hash of the submitted fields, so a key reused for a different lead is rejected
+    fingerprint = models.CharField(max_length=64)
+    lead = models.ForeignKey(Lead, on_delete=models.CASCADE, related_name='idempotency_keys')
+    status_code = models.PositiveSmallIntegerField()
+    response = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.key} -> lead {self.lead_id}"
@@ -0,0 +1,167 @@
+from datetime import timedelta
+import logging
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import EmailOutbox, Lead, NotificationPreference
+from .services import EmailService
+
+logger = logging.getLogger(__name__)
+
+
+def get_attorney_modes():
+    """Map each attorney recipient to IMMEDIATE or DIGEST delivery"""
+    modes = dict.fromkeys(settings.ATTORNEY_EMAILS, settings.ATTORNEY_NOTIFICATION_MODE)
+    modes.update(
+        NotificationPreference.objects
+        .filter(email__in=settings.ATTORNEY_EMAILS)
+        .values_list('email', 'mode')
+    )
+    return modes
+
+
+def enqueue_lead_notifications(lead: Lead):
+    """Queue the prospect confirmation and attorney notifications for a new lead.
+
+    Must be called inside the transaction that creates the lead, so the emails
+    exist if and only if the lead does. Notifications for attorneys in digest
+    mode are held until the next digest flush.
+    """
+    entries = [EmailOutbox(lead=lead, kind=EmailOutbox.PROSPECT_CONFIRMATION, recipient=lead.email)]
+    for recipient, mode in get_attorney_modes().items():
+        entries.append(EmailOutbox(
+            lead=lead,
+            kind=EmailOutbox.ATTORNEY_NOTIFICATION,
+            recipient=recipient,
+            status=EmailOutbox.HELD if mode == NotificationPreference.DIGEST else EmailOutbox.PENDING
+        ))
+    return EmailOutbox.objects.bulk_create(entries)
+
+
+def flush_digests(force=False):
+    """Turn held attorney notifications into one digest email per recipient.
+
+    A recipient's digest is due once their oldest held notification is older
+    than ATTORNEY_DIGEST_WINDOW_MINUTES; force flushes everything held.
+    Returns the number of digests queued.
+    """
+    held = EmailOutbox.objects.filter(status=EmailOutbox.HELD)
+    if not force:
+        cutoff = timezone.now() - timedelta(minutes=settings.ATTORNEY_DIGEST_WINDOW_MINUTES)
+        held = held.filter(created_at__lte=cutoff)
+    recipients = list(held.values_list('recipient', flat=True).distinct())
+
+    queued = 0
+    for recipient in recipients:
+        with transaction.atomic():
+            items = list(
+                EmailOutbox.objects
+                .select_for_update(skip_locked=True)
+                .filter(status=EmailOutbox.HELD, recipient=recipient)
+                .only('id')
+            )
+            if not items:
+                continue
+            digest = EmailOutbox.objects.create(
+                kind=EmailOutbox.ATTORNEY_DIGEST,
+                recipient=recipient
+            )
+            EmailOutbox.objects.filter(id__in=[item.id for item in items]).update(
+                status=EmailOutbox.DIGESTED,
+                digest=digest
+            )
+            queued += 1
+    return queued
+
+
+def retry_delay(attempts):
+    """Exponential backoff: base, 2*base, 4*base, ... capped at the maximum"""
+    delay = settings.EMAIL_OUTBOX_RETRY_BASE_SECONDS * (2 ** (attempts - 1))
+    return timedelta(seconds=min(delay, settings.EMAIL_OUTBOX_RETRY_MAX_SECONDS))
+
+
+class OutboxWorker:
+    """Drains due outbox entries through an EmailService"""
+
+    def __init__(self, email_service=None, batch_size=None):
+        self.email_service = email_service or EmailService()
+        self.batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+
+    def process_batch(self):
+        """Deliver one batch of due entries and return the number processed.
+
+        Rows are locked with SKIP LOCKED so several workers can drain the
+        outbox concurrently without sending the same email twice.
+        """
+        with transaction.atomic():
+            entries = list(
+                EmailOutbox.objects
+                .select_for_update(skip_locked=True, of=('self',))
+                .select_related('lead')
+                .filter(status=EmailOutbox.PENDING, next_attempt_at__lte=timezone.now())
+                .order_by('next_attempt_at')[:self.batch_size]
+            )
+            if entries:
+                self.deliver(entries)
+        return len(entries)
+
+    def build_message(self, entry: EmailOutbox):
+        if entry.kind == EmailOutbox.PROSPECT_CONFIRMATION:
+            message = self.email_service.build_prospect_confirmation(entry.lead)
+        elif entry.kind == EmailOutbox.ATTORNEY_DIGEST:
+            leads = [
+                item.lead for item in
+                entry.items.select_related('lead').order_by('lead__created_at')
+            ]
+            message = self.email_service.build_attorney_digest(entry.recipient, leads)
+        else:
+            message = self.email_service.build_attorney_notification(entry.lead, entry.recipient)
+        message['CustomID'] = f"outbox-{entry.pk}"
+        return message
+
+    def deliver(self, entries):
+        """Send all entries as one batch and record each message's outcome"""
+        messages = [self.build_message(entry) for entry in entries]
+        started = time.perf_counter()
+        results = self.email_service.send_batch(messages)
+        logger.info(
+            "Sent %d emails in %.1fms, %d failed",
+            len(messages), (time.perf_counter() - started) * 1000, sum(not result.ok for result in results)
+        )
+        for entry, result in zip(entries, results):
+            if result.ok:
+                self.mark_sent(entry)
+            else:
+                self.mark_failed(entry, result.error or 'Provider rejected the message')
+        EmailOutbox.objects.bulk_update(
+            entries,
+            ['status', 'attempts', 'sent_at', 'last_error', 'next_attempt_at']
+        )
+
+    def mark_sent(self, entry: EmailOutbox):
+        entry.status = EmailOutbox.SENT
+        entry.attempts += 1
+        entry.sent_at = timezone.now()
+        entry.last_error = ''
+
+    def mark_failed(self, entry: EmailOutbox, error):
+        entry.attempts += 1
+        entry.last_error = error
+        if entry.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+            entry.status = EmailOutbox.DEAD
+            logger.error("Giving up on %s after %s attempts: %s", entry, entry.attempts, error)
+        else:
+            entry.next_attempt_at = timezone.now() + retry_delay(entry.attempts)
+            logger.warning("Delivery of %s failed, retrying at %s: %s", entry, entry.next_attempt_at, error)
+
+    def drain(self):
+        """Process batches until nothing is due and return the total processed"""
+        total = 0
+        while True:
+            processed = self.process_batch()
+            total += processed
+            if processed < self.batch_size:
+                return total
@@ -0,0 +1,164 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over the (created_at, id) composite key, newest first.
+
+    Each page is a single index range scan starting at the cursor position,
+    so the cost is O(page size) at any depth, and rows inserted while a
+    client is paging never shift or duplicate results.
+    """
+    cursor_query_param = 'cursor'
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    invalid_cursor_message = 'Invalid cursor'
+    ordering = ('-created_at', '-id')
+
+    def get_page_size(self, request):
+        try:
+            requested = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(requested, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.set_page(list(self.get_page_queryset(queryset, request)))
+
+    def get_page_queryset(self, queryset, request):
+        """The query for one page plus a look-ahead row; evaluate it and pass the rows to set_page"""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.cursor = self.decode_cursor(request)
+
+        if self.cursor is None:
+            return queryset.order_by(*self.ordering)[:self.page_size + 1]
+        position, reverse = self.cursor
+        return self.seek(queryset, position, reverse)[:self.page_size + 1]
+
+    def set_page(self, rows):
+        reverse = self.cursor is not None and self.cursor[1]
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        self.page = rows
+        if reverse:
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+        return rows
+
+    def seek(self, queryset, position, reverse):
+        """Rows after the cursor position, or before it (oldest first) when reversing"""
+        created_at, pk = position
+        if reverse:
+            return queryset.filter(
+                Q(created_at__gte=created_at),
+                Q(created_at__gt=created_at) | Q(id__gt=pk)
+            ).order_by('created_at', 'id')
+        # The redundant created_at bound lets the index scan start at the cursor
+        return queryset.filter(
+            Q(created_at__lte=created_at),
+            Q(created_at__lt=created_at) | Q(id__lt=pk)
+        ).order_by('-created_at', '-id')
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_data(self, data):
+        return OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ])
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_position(self, row):
+        return {'t': row.created_at.isoformat(), 'id': row.pk}
+
+    def parse_position(self, payload):
+        created_at = parse_datetime(payload['t'])
+        if created_at is None:
+            raise ValueError(payload['t'])
+        return created_at, int(payload['id'])
+
+    def encode_cursor(self, row, reverse):
+        payload = self.get_position(row)
+        if reverse:
+            payload['r'] = 1
+        token = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode()))
+            position = self.parse_position(payload)
+            reverse = bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+
+class SearchRankPagination(KeysetPagination):
+    """
+    Keyset pagination over (rank, id), best match first.
+
+    The queryset must be annotated with ``rank``. Matches still have to be
+    ranked to be ordered, but only one page of rows is fetched per request.
+    """
+    ordering = ('-rank', '-id')
+
+    def seek(self, queryset, position, reverse):
+        rank, pk = position
+        if reverse:
+            return queryset.filter(
+                Q(rank__gt=rank) | Q(rank=rank, id__gt=pk)
+            ).order_by('rank', 'id')
+        return queryset.filter(
+            Q(rank__lt=rank) | Q(rank=rank, id__lt=pk)
+        ).order_by('-rank', '-id')
+
+    def get_position(self, row):
+        return {'rank': row.rank, 'id': row.pk}
+
+    def parse_position(self, payload):
+        return float(payload['rank']), int(payload['id'])
@@ -0,0 +1,189 @@
+from collections import deque
+from datetime import timedelta
+import logging
+import multiprocessing
+import os
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .extraction import extract_resume
+from .models import RESUME_SEARCH_VECTOR, ResumeAnalysis
+
+logger = logging.getLogger(__name__)
+
+RESULT_FIELDS = ('status', 'text', 'page_count', 'thumbnail', 'metadata', 'error', 'processed_at')
+
+
+def create_pool(workers):
+    # Spawned workers do not inherit this process's database connections
+    return multiprocessing.get_context('spawn').Pool(workers)
+
+
+class ProcessingTimeout(Exception):
+    """A parse did not finish within RESUME_PROCESSING_TIMEOUT"""
+
+
+def run_inline(data, extension):
+    """Stand-in for a pool result when there are no workers"""
+    try:
+        return extract_resume(data, extension), None
+    except Exception as exc:
+        return None, exc
+
+
+class ResumeProcessor:
+    """Extracts text, page count and thumbnails for pending resume analyses.
+
+    Parsing runs in a pool of `workers` processes so CPU-heavy work stays
+    out of both the web workers and this process; without workers it runs
+    inline. The processor owns its pool and replaces it when a parse times
+    out, so use it as a context manager or call close().
+    """
+
+    def __init__(self, workers=None, batch_size=None, timeout=None):
+        self.workers = workers
+        self.pool = create_pool(workers) if workers else None
+        self.batch_size = batch_size or settings.RESUME_PROCESSING_BATCH_SIZE
+        self.timeout = timeout or settings.RESUME_PROCESSING_TIMEOUT
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Stop the worker processes, including any still parsing"""
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+
+    def process_batch(self):
+        """Process one batch of pending analyses and return the number handled.
+
+        No transaction is open while files are parsed: the batch is claimed
+        first and each result is written as soon as it arrives.
+        """
+        analyses = self.claim()
+        jobs = deque((analysis, self.submit(analysis)) for analysis in analyses)
+        while jobs:
+            analysis, job = jobs.popleft()
+            result, error = self.collect(job)
+            if isinstance(error, ProcessingTimeout):
+                self.restart_pool()
+                jobs = deque((queued, self.resubmit(queued, queued_job)) for queued, queued_job in jobs)
+            if error is None:
+                self.mark_done(analysis, result)
+            else:
+                self.mark_failed(analysis, error)
+            self.save(analysis)
+        return len(analyses)
+
+    def claim(self):
+        """Claim a batch of pending analyses in a short transaction.
+
+        Rows are locked with SKIP LOCKED only while claimed_until is set, so
+        several workers can run at once. A claim that outlives claimed_until
+        (its worker died) is picked up by the next worker.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            analyses = list(
+                ResumeAnalysis.objects
+                .select_for_update(skip_locked=True, of=('self',))
+                .select_related('blob')
+                .defer('search_vector')
+                .filter(status=ResumeAnalysis.PENDING)
+                .filter(Q(claimed_until__isnull=True) | Q(claimed_until__lte=now))
+                .order_by('created_at')[:self.batch_size]
+            )
+            # Every parse in the batch may use its whole timeout, one after another
+            claimed_until = now + timedelta(seconds=self.timeout * (len(analyses) + 1))
+            ResumeAnalysis.objects.filter(pk__in=[analysis.pk for analysis in analyses]).update(
+                claimed_until=claimed_until
+            )
+        for analysis in analyses:
+            analysis.claimed_until = claimed_until
+        return analyses
+
+    def save(self, analysis: ResumeAnalysis):
+        """Write one result and its search vector, unless another worker has claimed the row since"""
+        with transaction.atomic():
+            saved = ResumeAnalysis.objects.filter(
+                pk=analysis.pk, status=ResumeAnalysis.PENDING, claimed_until=analysis.claimed_until
+            ).update(claimed_until=None, **{field: getattr(analysis, field) for field in RESULT_FIELDS})
+            if saved:
+                # Index new text once here instead of recomputing it for every search
+                ResumeAnalysis.objects.filter(pk=analysis.pk).update(
+                    search_vector=RESUME_SEARCH_VECTOR if analysis.status == ResumeAnalysis.DONE else None
+                )
+
+    def submit(self, analysis: ResumeAnalysis):
+        name = analysis.blob.file.name
+        extension = os.path.splitext(name)[1]
+        try:
+            with default_storage.open(name, 'rb') as file:
+                data = file.read()
+        except OSError as exc:
+            return None, exc
+        if self.pool is None:
+            return run_inline(data, extension)
+        return self.pool.apply_async(extract_resume, (data, extension))
+
+    def collect(self, job):
+        if isinstance(job, tuple):
+            return job
+        try:
+            return job.get(timeout=self.timeout), None
+        except multiprocessing.TimeoutError:
+            return None, ProcessingTimeout(f"Timed out after {self.timeout} seconds")
+        except Exception as exc:
+            return None, exc
+
+    def restart_pool(self):
+        """Replace the pool after a timeout.
+
+        A running job cannot be cancelled, so the hung parse would keep its
+        worker forever; the workers are terminated and a new pool is started.
+        This also recovers jobs lost with a worker that crashed, which the
+        pool never reports and which therefore time out as well.
+        """
+        self.close()
+        self.pool = create_pool(self.workers)
+
+    def resubmit(self, analysis: ResumeAnalysis, job):
+        """Keep a job that finished before the restart, rerun one lost with the old pool"""
+        if isinstance(job, tuple) or job.ready():
+            return job
+        return self.submit(analysis)
+
+    def mark_done(self, analysis: ResumeAnalysis, result):
+        analysis.status = ResumeAnalysis.DONE
+        analysis.text = result['text']
+        analysis.page_count = result['page_count']
+        analysis.metadata = result['metadata']
+        analysis.error = ''
+        analysis.processed_at = timezone.now()
+        if result['thumbnail']:
+            # Saves the file only; the row is written by save()
+            analysis.thumbnail.save(f"{analysis.blob.sha256}.png", ContentFile(result['thumbnail']), save=False)
+
+    def mark_failed(self, analysis: ResumeAnalysis, error):
+        analysis.status = ResumeAnalysis.FAILED
+        analysis.error = str(error) or error.__class__.__name__
+        analysis.processed_at = timezone.now()
+        logger.warning("Could not process resume %s: %s", analysis.blob.sha256, analysis.error)
+
+    def drain(self):
+        """Process batches until nothing is pending and return the total processed"""
+        total = 0
+        while True:
+            processed = self.process_batch()
+            total += processed
+            if processed < self.batch_size:
+                return total
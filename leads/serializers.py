@@ -1,17 +1,82 @@
+import os
+
+from django.conf import settings
+from django.core import signing
+from django.urls import reverse
 from rest_framework import serializers
-from .models import Lead
+from instrumentation.timing import TimedSerializerMixin
+from .blobs import store_direct_upload, store_uploaded_resume
+from .models import Lead, ResumeAnalysis, RESUME_EXTENSIONS, RESUME_MAX_SIZE
+from .uploads import get_upload_backend, unsign_upload
 
-class LeadCreateSerializer(serializers.ModelSerializer):
+class LeadCreateSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    # Token from POST /api/leads/uploads/ for resumes uploaded straight to storage
+    resume_upload = serializers.CharField(write_only=True, required=False)
+    
     class Meta:
         model = Lead
-        fields = ['first_name', 'last_name', 'email', 'resume']
+        fields = ['first_name', 'last_name', 'email', 'resume', 'resume_upload']
+        extra_kwargs = {'resume': {'required': False}}
     
     def validate_resume(self, value):
-        if value.size > 5 * 1024 * 1024:  # 5MB
+        if value.size > RESUME_MAX_SIZE:
             raise serializers.ValidationError("Resume file size must be under 5MB.")
         return value
+    
+    def validate_resume_upload(self, value):
+        try:
+            key, size, sha256 = unsign_upload(value)
+        except signing.SignatureExpired:
+            raise serializers.ValidationError("Upload token has expired.")
+        except signing.BadSignature:
+            raise serializers.ValidationError("Invalid upload token.")
+        
+        stored_size = get_upload_backend().get_size(key)
+        if stored_size is None:
+            raise serializers.ValidationError("Resume has not been uploaded yet.")
+        if stored_size != size or stored_size > RESUME_MAX_SIZE:
+            raise serializers.ValidationError("Uploaded resume does not match the upload slot.")
+        return {'key': key, 'size': size, 'sha256': sha256}
+    
+    def validate(self, attrs):
+        if ('resume' in attrs) == ('resume_upload' in attrs):
+            raise serializers.ValidationError("Provide either resume or resume_upload.")
+        return attrs
+    
+    def create(self, validated_data):
+        # Resumes are stored once per distinct content; identical files share a blob
+        upload = validated_data.pop('resume_upload', None)
+        if upload:
+            blob = store_direct_upload(get_upload_backend(), **upload)
+        else:
+            blob = store_uploaded_resume(validated_data['resume'])
+        validated_data['resume'] = blob.file.name
+        validated_data['resume_blob'] = blob
+        return super().create(validated_data)
 
-class LeadListSerializer(serializers.ModelSerializer):
+class ResumeUploadSlotSerializer(serializers.Serializer):
+    filename = serializers.CharField(max_length=200)
+    content_type = serializers.CharField(max_length=100)
+    size = serializers.IntegerField(min_value=1)
+    sha256 = serializers.RegexField(r'^[0-9a-fA-F]{64}$')
+    
+    def validate_sha256(self, value):
+        return value.lower()
+    
+    def validate_filename(self, value):
+        extension = os.path.splitext(value)[1].lower().lstrip('.')
+        if extension not in RESUME_EXTENSIONS:
+            raise serializers.ValidationError(
+                f"File extension must be one of: {', '.join(RESUME_EXTENSIONS)}."
+            )
+        return value
+    
+    def validate_size(self, value):
+        if value > RESUME_MAX_SIZE:
+            raise serializers.ValidationError("Resume file size must be under 5MB.")
+        return value
+
+class LeadListSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     resume_url = serializers.SerializerMethodField()
     
     class Meta:
@@ -24,10 +89,72 @@ class LeadListSerializer(serializers.ModelSerializer):
     def get_resume_url(self, obj):
         request = self.context.get('request')
         if obj.resume and request:
-            return request.build_absolute_uri(obj.resume.url)
+            return request.build_absolute_uri(reverse('lead-resume', kwargs={'pk': obj.pk}))
+        return None
+
+class ResumeAnalysisSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    thumbnail_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ResumeAnalysis
+        fields = ['status', 'text', 'page_count', 'thumbnail_url', 'metadata', 'error', 'processed_at']
+
+    def get_thumbnail_url(self, obj):
+        request = self.context.get('request')
+        if obj.thumbnail and request:
+            return request.build_absolute_uri(
+                reverse('lead-resume-thumbnail', kwargs={'pk': self.context['view'].kwargs['pk']})
+            )
         return None
 
-class LeadUpdateSerializer(serializers.ModelSerializer):
+class LeadSearchResultSerializer(LeadListSerializer):
+    rank = serializers.FloatField(read_only=True)
+    headline = serializers.SerializerMethodField()
+
+    class Meta(LeadListSerializer.Meta):
+        fields = LeadListSerializer.Meta.fields + ['rank', 'headline']
+
+    def get_headline(self, obj):
+        return self.context.get('headlines', {}).get(obj.resume_blob_id, '')
+
+class LeadUpdateSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Lead
         fields = ['status']
+
+class LeadFilterSerializer(serializers.Serializer):
+    status = serializers.ChoiceField(choices=Lead.STATUS_CHOICES, required=False)
+    created_after = serializers.DateTimeField(required=False)
+    created_before = serializers.DateTimeField(required=False)
+    search = serializers.CharField(required=False, max_length=200)
+
+    def validate(self, attrs):
+        after = attrs.get('created_after')
+        before = attrs.get('created_before')
+        if after and before and after >= before:
+            raise serializers.ValidationError("created_after must be earlier than created_before.")
+        return attrs
+
+class ResumeSearchSerializer(LeadFilterSerializer):
+    q = serializers.CharField(max_length=200)
+
+class LeadBulkUpdateSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        allow_empty=False,
+        max_length=settings.LEAD_BULK_UPDATE_MAX_IDS
+    )
+    filter = LeadFilterSerializer(required=False)
+    status = serializers.ChoiceField(choices=Lead.STATUS_CHOICES)
+
+    def validate(self, attrs):
+        if ('ids' in attrs) == ('filter' in attrs):
+            raise serializers.ValidationError("Provide either ids or filter.")
+        if 'filter' in attrs and not attrs['filter']:
+            raise serializers.ValidationError({'filter': "At least one filter is required."})
+        if not Lead.transition_sources(attrs['status']):
+            raise serializers.ValidationError(
+                {'status': f"No lead can be moved to {attrs['status']}."}
+            )
+        return attrs
@@ -1,31 +1,266 @@
+import asyncio
+from dataclasses import dataclass
+from datetime import timedelta
+import threading
+
+from asgiref.sync import async_to_sync, sync_to_async
+import requests
+from requests.adapters import HTTPAdapter
 from mailjet_rest import Client
 from django.conf import settings
+from django.db import connection
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from instrumentation.timing import external_call
+from .cache import invalidate_lead_cache
+from .events import publish_status_changed
 from .models import Lead
 
-class EmailService:
+# Mailjet's Send API v3.1 accepts at most 50 messages per call
+MAILJET_MAX_BATCH_SIZE = 50
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_mailjet_session():
+    """Process-wide keep-alive session so batches reuse pooled connections"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=settings.MAILJET_POOL_SIZE
+                )
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _session = session
+    return _session
+
+
+@dataclass
+class SendResult:
+    ok: bool
+    message_id: str = ''
+    error: str = ''
+
+
+class MailjetTransport:
+    """Deliver messages through the Mailjet Send API"""
+
     def __init__(self):
         self.mailjet = Client(
             auth=(settings.MAILJET_API_KEY, settings.MAILJET_SECRET_KEY),
             version='v3.1'
         )
-    
+
+    def send(self, messages):
+        """Send up to MAILJET_MAX_BATCH_SIZE messages in one API call.
+
+        Returns one SendResult per message, in the order given.
+        """
+        url, headers = self.mailjet.config['send']
+        with external_call('mailjet'):
+            response = get_mailjet_session().post(
+                url,
+                json={'Messages': messages},
+                headers=headers,
+                auth=self.mailjet.auth,
+                timeout=settings.MAILJET_TIMEOUT
+            )
+        return self.parse_response(response, len(messages))
+
+    def parse_response(self, response, count):
+        try:
+            statuses = response.json().get('Messages') or []
+        except ValueError:
+            statuses = []
+
+        if len(statuses) != count:
+            ok = response.status_code == 200
+            error = '' if ok else f"Mailjet returned HTTP {response.status_code}"
+            return [SendResult(ok=ok, error=error) for _ in range(count)]
+
+        results = []
+        for item in statuses:
+            if item.get('Status') == 'success':
+                recipients = item.get('To') or [{}]
+                results.append(SendResult(ok=True, message_id=str(recipients[0].get('MessageID', ''))))
+            else:
+                errors = item.get('Errors') or [{}]
+                results.append(SendResult(ok=False, error=errors[0].get('ErrorMessage', 'Unknown error')))
+        return results
+
+
+class AsyncMailjetTransport(MailjetTransport):
+    """
+    Mailjet transport that sends the chunks of a batch concurrently over
+    one pooled httpx.AsyncClient instead of one after another.
+    """
+
+    async def asend_many(self, chunks):
+        """Send each chunk in its own API call, all at once.
+
+        Returns one item per chunk: its list of SendResult, or the exception
+        raised while sending it.
+        """
+        import httpx
+
+        url, headers = self.mailjet.config['send']
+        limits = httpx.Limits(max_connections=settings.MAILJET_POOL_SIZE)
+        async with httpx.AsyncClient(
+            auth=self.mailjet.auth,
+            headers=headers,
+            limits=limits,
+            timeout=settings.MAILJET_TIMEOUT
+        ) as client:
+            async def send(messages):
+                with external_call('mailjet'):
+                    response = await client.post(url, json={'Messages': messages})
+                return self.parse_response(response, len(messages))
+
+            return await asyncio.gather(*(send(chunk) for chunk in chunks), return_exceptions=True)
+
+
+class LocalTransport:
+    """Keep messages in memory instead of sending them (for tests and local runs)"""
+
+    outbox = []
+
+    def send(self, messages):
+        LocalTransport.outbox.extend(messages)
+        return [SendResult(ok=True) for _ in messages]
+
+
+def bulk_update_status(queryset, target):
+    """Move every eligible lead in queryset to target in a single UPDATE.
+
+    Only leads whose current status allows the transition are changed.
+    The raw UPDATE bypasses model signals, so cached lead responses are
+    invalidated and status events published here. Returns the ids of the
+    updated leads.
+    """
+    eligible = (
+        queryset
+        .filter(status__in=Lead.transition_sources(target))
+        .order_by()
+        .values('id')
+    )
+    subquery, params = eligible.query.sql_with_params()
+    table = connection.ops.quote_name(Lead._meta.db_table)
+    updated_at = timezone.now()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {table} SET status = %s, updated_at = %s "
+            f"WHERE id IN ({subquery}) RETURNING id",
+            [target, updated_at, *params]
+        )
+        updated_ids = sorted(row[0] for row in cursor.fetchall())
+    if updated_ids:
+        invalidate_lead_cache()
+        publish_status_changed(updated_ids, target, updated_at)
+    return updated_ids
+
+
+def find_duplicate_lead(email):
+    """Return the newest lead with this email created within LEAD_DUPLICATE_WINDOW_SECONDS.
+
+    Call inside the transaction that would create the lead: an advisory lock
+    on the address, held until that transaction ends, makes concurrent
+    submissions with the same email wait for each other, so only the first
+    one inserts.
+    """
+    window = settings.LEAD_DUPLICATE_WINDOW_SECONDS
+    if not window:
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_advisory_xact_lock(hashtext(%s))', [f'lead-email:{email.upper()}'])
+    return (
+        Lead.objects
+        .filter(email__iexact=email, created_at__gte=timezone.now() - timedelta(seconds=window))
+        .order_by('-created_at')
+        .first()
+    )
+
+
+def get_email_transport():
+    return import_string(settings.EMAIL_TRANSPORT)()
+
+
+class EmailService:
+    def __init__(self, transport=None):
+        self.transport = transport or get_email_transport()
+
     def send_prospect_confirmation(self, lead: Lead):
         """Send confirmation email to the prospect"""
-        data = {
-            'Messages': [
+        return self.send_batch([self.build_prospect_confirmation(lead)])[0].ok
+
+    def send_attorney_notification(self, lead: Lead):
+        """Send notification email to the attorney"""
+        return self.send_batch([self.build_attorney_notification(lead)])[0].ok
+
+    def send_batch(self, messages):
+        """Send messages in as few provider calls as possible.
+
+        Returns one SendResult per message, in the order given. A failed call
+        only fails the messages of its own chunk.
+        """
+        chunks = self.split_batch(messages)
+        if len(chunks) > 1 and hasattr(self.transport, 'asend_many'):
+            return async_to_sync(self.asend_batch)(messages)
+        results = []
+        for chunk in chunks:
+            try:
+                outcome = self.transport.send(chunk)
+            except Exception as e:
+                outcome = e
+            results.extend(self.chunk_results(chunk, outcome))
+        return results
+
+    async def asend_batch(self, messages):
+        """Async send_batch: chunks go out concurrently when the transport supports it"""
+        chunks = self.split_batch(messages)
+        if hasattr(self.transport, 'asend_many'):
+            outcomes = await self.transport.asend_many(chunks)
+        else:
+            outcomes = []
+            for chunk in chunks:
+                try:
+                    outcomes.append(await sync_to_async(self.transport.send)(chunk))
+                except Exception as e:
+                    outcomes.append(e)
+        results = []
+        for chunk, outcome in zip(chunks, outcomes):
+            results.extend(self.chunk_results(chunk, outcome))
+        return results
+
+    def split_batch(self, messages):
+        batch_size = min(settings.MAILJET_BATCH_SIZE, MAILJET_MAX_BATCH_SIZE)
+        return [messages[start:start + batch_size] for start in range(0, len(messages), batch_size)]
+
+    def chunk_results(self, chunk, outcome):
+        if isinstance(outcome, Exception):
+            error = str(outcome) or outcome.__class__.__name__
+            return [SendResult(ok=False, error=error) for _ in chunk]
+        return outcome
+
+    def build_prospect_confirmation(self, lead: Lead):
+        return {
+            "From": {
+                "Email": settings.MAILJET_FROM_EMAIL,
+                "Name": "Legal Team"
+            },
+            "To": [
                 {
-                    "From": {
-                        "Email": settings.MAILJET_FROM_EMAIL,
-                        "Name": "Legal Team"
-                    },
-                    "To": [
-                        {
-                            "Email": lead.email,
-                            "Name": f"{lead.first_name} {lead.last_name}"
-                        }
-                    ],
-                    "Subject": "Thank you for your application",
-                    "TextPart": f"""
+                    "Email": lead.email,
+                    "Name": f"{lead.first_name} {lead.last_name}"
+                }
+            ],
+            "Subject": "Thank you for your application",
+            "TextPart": f"""
 Dear {lead.first_name} {lead.last_name},
 
 Thank you for submitting your application. We have received your resume and will review it shortly.
@@ -34,37 +269,29 @@ Our team will contact you within 2-3 business days regarding next steps.
 
 Best regards,
 Legal Team
-                    """,
-                    "HTMLPart": f"""
+            """,
+            "HTMLPart": f"""
 <h3>Dear {lead.first_name} {lead.last_name},</h3>
 <p>Thank you for submitting your application. We have received your resume and will review it shortly.</p>
 <p>Our team will contact you within 2-3 business days regarding next steps.</p>
 <p>Best regards,<br/>Legal Team</p>
-                    """
-                }
-            ]
+            """
         }
-        
-        result = self.mailjet.send.create(data=data)
-        return result.status_code == 200
-    
-    def send_attorney_notification(self, lead: Lead):
-        """Send notification email to the attorney"""
-        data = {
-            'Messages': [
+
+    def build_attorney_notification(self, lead: Lead, recipient=None):
+        return {
+            "From": {
+                "Email": settings.MAILJET_FROM_EMAIL,
+                "Name": "Lead Management System"
+            },
+            "To": [
                 {
-                    "From": {
-                        "Email": settings.MAILJET_FROM_EMAIL,
-                        "Name": "Lead Management System"
-                    },
-                    "To": [
-                        {
-                            "Email": settings.ATTORNEY_EMAIL,
-                            "Name": "Attorney"
-                        }
-                    ],
-                    "Subject": f"New Lead: {lead.first_name} {lead.last_name}",
-                    "TextPart": f"""
+                    "Email": recipient or settings.ATTORNEY_EMAIL,
+                    "Name": "Attorney"
+                }
+            ],
+            "Subject": f"New Lead: {lead.first_name} {lead.last_name}",
+            "TextPart": f"""
 New lead submission received:
 
 Name: {lead.first_name} {lead.last_name}
@@ -73,8 +300,8 @@ Submitted: {lead.created_at.strftime('%Y-%m-%d %H:%M:%S')}
 Status: {lead.status}
 
 Please log in to the system to review the complete application and resume.
-                    """,
-                    "HTMLPart": f"""
+            """,
+            "HTMLPart": f"""
 <h3>New lead submission received:</h3>
 <ul>
     <li><strong>Name:</strong> {lead.first_name} {lead.last_name}</li>
@@ -83,10 +310,23 @@ Please log in to the system to review the complete application and resume.
     <li><strong>Status:</strong> {lead.status}</li>
 </ul>
 <p>Please log in to the system to review the complete application and resume.</p>
-                    """
+            """
+        }
+
+    def build_attorney_digest(self, recipient, leads):
+        context = {'leads': leads}
+        return {
+            "From": {
+                "Email": settings.MAILJET_FROM_EMAIL,
+                "Name": "Lead Management System"
+            },
+            "To": [
+                {
+                    "Email": recipient,
+                    "Name": "Attorney"
                 }
-            ]
+            ],
+            "Subject": f"{len(leads)} new lead{'s' if len(leads) != 1 else ''}",
+            "TextPart": render_to_string('leads/emails/attorney_digest.txt', context),
+            "HTMLPart": render_to_string('leads/emails/attorney_digest.html', context)
         }
-        
-        result = self.mailjet.send.create(data=data)
-        return result.status_code == 200
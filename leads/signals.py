@@ -0,0 +1,34 @@
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import invalidate_lead_cache
+from .events import publish_lead_created, publish_status_changed
+from .models import Lead, ResumeBlob
+
+
+@receiver(post_save, sender=Lead)
+def reference_resume_blob(sender, instance, created, **kwargs):
+    if created and instance.resume_blob_id:
+        ResumeBlob.objects.filter(pk=instance.resume_blob_id).update(ref_count=F('ref_count') + 1)
+
+
+@receiver(post_delete, sender=Lead)
+def release_resume_blob(sender, instance, **kwargs):
+    if instance.resume_blob_id:
+        ResumeBlob.objects.filter(pk=instance.resume_blob_id).update(ref_count=F('ref_count') - 1)
+
+
+@receiver(post_save, sender=Lead)
+@receiver(post_delete, sender=Lead)
+def invalidate_cached_leads(sender, **kwargs):
+    invalidate_lead_cache()
+
+
+@receiver(post_save, sender=Lead)
+def publish_lead_events(sender, instance, created, **kwargs):
+    if created:
+        publish_lead_created(instance)
+    elif getattr(instance, '_loaded_status', instance.status) != instance.status:
+        publish_status_changed([instance.pk], instance.status, instance.updated_at)
+    instance._loaded_status = instance.status
@@ -0,0 +1,130 @@
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import AsyncClient, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.throttling import UserRateThrottle
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from leads.models import EmailOutbox, Lead
+
+
+@override_settings(EMAIL_TRANSPORT='leads.services.LocalTransport')
+class AsyncLeadViewTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = AsyncClient()
+        self.user = User.objects.create_user(
+            username='attorney',
+            password='testpass123'
+        )
+        token = RefreshToken.for_user(self.user).access_token
+        self.auth = {'Authorization': f'Bearer {token}'}
+        self.leads = [
+            Lead.objects.create(
+                first_name="Lead",
+                last_name=str(i),
+                email=f"lead{i}@example.com",
+                resume=SimpleUploadedFile("test_resume.pdf", b"file_content")
+            )
+            for i in range(3)
+        ]
+
+    async def test_create_lead(self):
+        """Test that the async create endpoint saves the lead and queues its emails"""
+        data = {
+            'first_name': 'Jane',
+            'last_name': 'Smith',
+            'email': 'jane@example.com',
+            'resume': SimpleUploadedFile("resume.pdf", b"file_content", content_type="application/pdf")
+        }
+        response = await self.client.post(reverse('lead-create-async'), data)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['email'], 'jane@example.com')
+        lead = await Lead.objects.aget(email='jane@example.com')
+        self.assertTrue(await EmailOutbox.objects.filter(lead=lead).aexists())
+
+    async def test_create_lead_validation_error(self):
+        """Test that invalid submissions get the same 400 as the sync endpoint"""
+        response = await self.client.post(reverse('lead-create-async'), {'first_name': 'Jane'})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('email', response.json())
+
+    async def test_list_requires_authentication(self):
+        """Test that the async list rejects anonymous requests"""
+        response = await self.client.get(reverse('lead-list-async'))
+        self.assertEqual(response.status_code, 401)
+
+    async def test_list_pages_match_sync_endpoint(self):
+        """Test that the async list returns the same keyset pages as the sync list"""
+        response = await self.client.get(reverse('lead-list-async'), {'page_size': 2}, headers=self.auth)
+        self.assertEqual(response.status_code, 200)
+        first_page = response.json()
+        self.assertEqual([lead['id'] for lead in first_page['results']], [self.leads[2].id, self.leads[1].id])
+
+        response = await self.client.get(first_page['next'], headers=self.auth)
+        self.assertEqual([lead['id'] for lead in response.json()['results']], [self.leads[0].id])
+        self.assertIsNone(response.json()['next'])
+
+    async def test_list_cached_with_etag(self):
+        """Test that the async list is served from the response cache with an ETag, as the sync list is"""
+        url = reverse('lead-list-async')
+        response = await self.client.get(url, headers=self.auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], 'private, no-cache')
+        etag = response['ETag']
+
+        with mock.patch('leads.async_views.filter_leads') as filter_leads:
+            response = await self.client.get(url, headers=self.auth)
+        filter_leads.assert_not_called()
+        self.assertEqual(len(response.json()['results']), 3)
+        self.assertEqual(response['ETag'], etag)
+
+        response = await self.client.get(url, headers={**self.auth, 'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+
+        await Lead.objects.acreate(first_name='New', last_name='Lead', email='new@example.com')
+        response = await self.client.get(url, headers={**self.auth, 'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['results']), 4)
+
+    async def test_list_throttled_like_sync_views(self):
+        """Test that the async list applies the DRF user rate"""
+        with mock.patch.object(UserRateThrottle, 'THROTTLE_RATES', {'user': '2/min'}):
+            for _ in range(2):
+                response = await self.client.get(reverse('lead-list-async'), headers=self.auth)
+                self.assertEqual(response.status_code, 200)
+            response = await self.client.get(reverse('lead-list-async'), headers=self.auth)
+
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+
+    async def test_list_invalid_cursor(self):
+        """Test that a malformed cursor is a 404 as on the sync list"""
+        response = await self.client.get(reverse('lead-list-async'), {'cursor': 'garbage'}, headers=self.auth)
+        self.assertEqual(response.status_code, 404)
+
+    async def test_detail_conditional_get(self):
+        """Test that the async detail honours If-None-Match"""
+        url = reverse('lead-detail-async', kwargs={'pk': self.leads[0].pk})
+        response = await self.client.get(url, headers=self.auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['email'], 'lead0@example.com')
+
+        response = await self.client.get(url, headers={**self.auth, 'If-None-Match': response['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+        self.leads[0].email = 'changed@example.com'
+        await sync_to_async(self.leads[0].save)()
+        response = await self.client.get(url, headers=self.auth)
+        self.assertEqual(response.status_code, 200)
+
+    async def test_detail_not_found(self):
+        """Test that a missing lead is a 404"""
+        response = await self.client.get(reverse('lead-detail-async', kwargs={'pk': 0}), headers=self.auth)
+        self.assertEqual(response.status_code, 404)
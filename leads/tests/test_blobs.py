@@ -0,0 +1,111 @@
+from datetime import timedelta
+import hashlib
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from leads.blobs import backfill, blob_name, collect_garbage
+from leads.models import Lead, ResumeBlob
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ResumeBlobTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.content = b"%PDF-1.4 same resume"
+        self.sha256 = hashlib.sha256(self.content).hexdigest()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def submit(self, email, content=None):
+        data = {
+            'first_name': 'John',
+            'last_name': 'Doe',
+            'email': email,
+            'resume': SimpleUploadedFile("resume.pdf", content or self.content)
+        }
+        response = self.client.post(reverse('lead-create'), data, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return Lead.objects.get(pk=response.data['id'])
+
+    def test_identical_resumes_stored_once(self):
+        """Test that resubmitting the same file reuses one content-addressed blob"""
+        first = self.submit('john@example.com')
+        second = self.submit('john+again@example.com')
+
+        blob = ResumeBlob.objects.get()
+        self.assertEqual(blob.sha256, self.sha256)
+        self.assertEqual(blob.ref_count, 2)
+        self.assertEqual(first.resume.name, blob_name(self.sha256, 'resume.pdf'))
+        self.assertEqual(second.resume.name, first.resume.name)
+
+    def test_different_resumes_get_own_blobs(self):
+        """Test that different content is stored separately"""
+        self.submit('john@example.com')
+        self.submit('jane@example.com', content=b"%PDF-1.4 other resume")
+        self.assertEqual(ResumeBlob.objects.count(), 2)
+
+    def test_deleting_lead_releases_blob(self):
+        """Test that deleting a lead decrements the blob reference count"""
+        lead = self.submit('john@example.com')
+        lead.delete()
+        self.assertEqual(ResumeBlob.objects.get().ref_count, 0)
+
+    def test_gc_removes_orphaned_blobs(self):
+        """Test that unreferenced blobs past the grace period are collected"""
+        lead = self.submit('john@example.com')
+        name = lead.resume.name
+        lead.delete()
+        ResumeBlob.objects.update(created_at=timezone.now() - timedelta(days=2))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            blobs, _ = collect_garbage(grace=timedelta(days=1))
+
+        self.assertEqual(blobs, 1)
+        self.assertFalse(ResumeBlob.objects.exists())
+        self.assertFalse(default_storage.exists(name))
+
+    def test_gc_keeps_referenced_blobs(self):
+        """Test that blobs still used by a lead survive collection"""
+        self.submit('john@example.com')
+        ResumeBlob.objects.update(created_at=timezone.now() - timedelta(days=2))
+        self.assertEqual(collect_garbage(grace=timedelta(days=1))[0], 0)
+
+    def test_backfill_deduplicates_existing_files(self):
+        """Test that legacy resumes are moved into shared blobs"""
+        legacy = [
+            Lead.objects.create(
+                first_name="Lead",
+                last_name=str(i),
+                email=f"lead{i}@example.com",
+                resume=ContentFile(self.content, name="resume.pdf")
+            )
+            for i in range(2)
+        ]
+        old_names = [lead.resume.name for lead in legacy]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            migrated, missing = backfill()
+
+        self.assertEqual((migrated, missing), (2, 0))
+        blob = ResumeBlob.objects.get()
+        self.assertEqual(blob.ref_count, 2)
+        for lead, old_name in zip(legacy, old_names):
+            lead.refresh_from_db()
+            self.assertEqual(lead.resume_blob, blob)
+            self.assertFalse(default_storage.exists(old_name))
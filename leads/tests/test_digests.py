@@ -0,0 +1,78 @@
+from datetime import timedelta
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from leads.models import EmailOutbox, Lead, NotificationPreference
+from leads.outbox import OutboxWorker, enqueue_lead_notifications, flush_digests
+from leads.services import EmailService, LocalTransport
+
+
+@override_settings(
+    EMAIL_TRANSPORT='leads.services.LocalTransport',
+    ATTORNEY_EMAILS=['digest@example.com', 'immediate@example.com'],
+    ATTORNEY_NOTIFICATION_MODE=NotificationPreference.IMMEDIATE,
+    ATTORNEY_DIGEST_WINDOW_MINUTES=15,
+)
+class AttorneyDigestTest(TestCase):
+    def setUp(self):
+        LocalTransport.outbox = []
+        NotificationPreference.objects.create(
+            email='digest@example.com',
+            mode=NotificationPreference.DIGEST
+        )
+        self.leads = []
+        for i in range(3):
+            lead = Lead.objects.create(
+                first_name="Lead",
+                last_name=str(i),
+                email=f"lead{i}@example.com",
+                resume=SimpleUploadedFile("test_resume.pdf", b"file_content")
+            )
+            enqueue_lead_notifications(lead)
+            self.leads.append(lead)
+
+    def test_preferences_decide_immediate_or_held(self):
+        """Test that digest recipients are held while others are sent immediately"""
+        attorney = EmailOutbox.objects.filter(kind=EmailOutbox.ATTORNEY_NOTIFICATION)
+        self.assertEqual(
+            attorney.filter(recipient='immediate@example.com', status=EmailOutbox.PENDING).count(), 3
+        )
+        self.assertEqual(
+            attorney.filter(recipient='digest@example.com', status=EmailOutbox.HELD).count(), 3
+        )
+
+    def test_immediate_notifications_use_outbox_recipient(self):
+        """Test that immediate notifications are addressed to their own recipient"""
+        OutboxWorker(email_service=EmailService()).drain()
+        notifications = [m for m in LocalTransport.outbox if m['Subject'].startswith("New Lead:")]
+        self.assertEqual(len(notifications), 3)
+        self.assertEqual(
+            [m['To'][0]['Email'] for m in notifications],
+            ['immediate@example.com'] * 3
+        )
+
+    def test_digest_waits_for_window(self):
+        """Test that held notifications are not flushed before the window elapses"""
+        self.assertEqual(flush_digests(), 0)
+        self.assertFalse(EmailOutbox.objects.filter(kind=EmailOutbox.ATTORNEY_DIGEST).exists())
+
+    def test_flush_sends_single_digest(self):
+        """Test that elapsed held notifications become one digest email"""
+        EmailOutbox.objects.filter(status=EmailOutbox.HELD).update(
+            created_at=timezone.now() - timedelta(minutes=16)
+        )
+        self.assertEqual(flush_digests(), 1)
+
+        digest = EmailOutbox.objects.get(kind=EmailOutbox.ATTORNEY_DIGEST)
+        self.assertEqual(digest.recipient, 'digest@example.com')
+        self.assertEqual(digest.items.count(), 3)
+        self.assertFalse(EmailOutbox.objects.filter(status=EmailOutbox.HELD).exists())
+
+        OutboxWorker(email_service=EmailService()).drain()
+        digests = [m for m in LocalTransport.outbox if m['To'][0]['Email'] == 'digest@example.com']
+        self.assertEqual(len(digests), 1)
+        self.assertEqual(digests[0]['Subject'], "3 new leads")
+        for lead in self.leads:
+            self.assertIn(lead.email, digests[0]['TextPart'])
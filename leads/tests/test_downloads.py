@@ -0,0 +1,97 @@
+import shutil
+import tempfile
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from leads.models import Lead
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, RESUME_DOWNLOAD_ACCEL='')
+class ResumeDownloadTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='attorney',
+            password='testpass123'
+        )
+        self.content = b"%PDF-1.4 0123456789"
+        response = self.client.post(reverse('lead-create'), {
+            'first_name': 'John',
+            'last_name': 'Doe',
+            'email': 'john@example.com',
+            'resume': SimpleUploadedFile("resume.pdf", self.content)
+        }, format='multipart')
+        self.lead = Lead.objects.get(pk=response.data['id'])
+        self.url = reverse('lead-resume', kwargs={'pk': self.lead.pk})
+        self.client.force_authenticate(user=self.user)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def read(self, response):
+        return b''.join(response.streaming_content)
+
+    def test_download_requires_auth(self):
+        """Test that resumes are not publicly downloadable"""
+        self.client.force_authenticate(user=None)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_download_full_file(self):
+        """Test downloading the resume with caching validators"""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.read(response), self.content)
+        self.assertEqual(response['ETag'], f'"{self.lead.resume_blob.sha256}"')
+        self.assertIn('Last-Modified', response)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+
+    def test_resume_url_points_at_download_endpoint(self):
+        """Test that lead payloads link to the authenticated download"""
+        response = self.client.get(reverse('lead-detail', kwargs={'pk': self.lead.pk}))
+        self.assertTrue(response.data['resume_url'].endswith(self.url))
+
+    def test_if_none_match_returns_304(self):
+        """Test that a matching ETag skips the body"""
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_range_request(self):
+        """Test that a byte range returns 206 with just those bytes"""
+        response = self.client.get(self.url, HTTP_RANGE='bytes=2-5')
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(self.read(response), self.content[2:6])
+        self.assertEqual(response['Content-Range'], f'bytes 2-5/{len(self.content)}')
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=-4')
+        self.assertEqual(self.read(response), self.content[-4:])
+
+    def test_unsatisfiable_range(self):
+        """Test that a range past the end returns 416"""
+        response = self.client.get(self.url, HTTP_RANGE='bytes=1000-')
+        self.assertEqual(response.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+
+    def test_stale_if_range_returns_full_file(self):
+        """Test that a range is ignored when If-Range no longer matches"""
+        response = self.client.get(self.url, HTTP_RANGE='bytes=2-5', HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.read(response), self.content)
+
+    @override_settings(RESUME_DOWNLOAD_ACCEL='x-accel-redirect', RESUME_ACCEL_REDIRECT_PREFIX='/protected-media/')
+    def test_x_accel_redirect(self):
+        """Test handing the file off to nginx"""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.lead.resume.name}')
+        self.assertEqual(response.content, b'')
@@ -0,0 +1,126 @@
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from leads.events import LEAD_CREATED, LEAD_STATUS_CHANGED, broker
+from leads.models import Lead
+from leads.services import bulk_update_status
+
+
+def create_lead(email):
+    return Lead.objects.create(
+        first_name="John",
+        last_name="Doe",
+        email=email,
+        resume=SimpleUploadedFile("test_resume.pdf", b"file_content")
+    )
+
+
+async def read_event(response):
+    """Return the next event from an SSE response, skipping comments and retry hints"""
+    while True:
+        chunk = await asyncio.wait_for(response.streaming_content.__anext__(), 5)
+        chunk = chunk.decode() if isinstance(chunk, bytes) else chunk
+        if chunk.startswith('event:'):
+            lines = dict(line.split(': ', 1) for line in chunk.strip().splitlines())
+            return lines['event'], json.loads(lines['data'])
+
+
+class LeadEventPublishTest(TestCase):
+    @override_settings(LEAD_EVENTS_BACKEND='local')
+    def test_events_published_on_commit(self):
+        """Test that creates and status changes reach subscribers after commit"""
+        published = []
+        broker.publish, original = published.append, broker.publish
+        try:
+            with self.captureOnCommitCallbacks(execute=True):
+                lead = create_lead('john@example.com')
+            with self.captureOnCommitCallbacks(execute=True):
+                lead.email = 'john.doe@example.com'
+                lead.save()
+            with self.captureOnCommitCallbacks(execute=True):
+                lead.status = Lead.REACHED_OUT
+                lead.save()
+            other = create_lead('jane@example.com')
+            with self.captureOnCommitCallbacks(execute=True):
+                bulk_update_status(Lead.objects.filter(pk=other.pk), Lead.REACHED_OUT)
+        finally:
+            broker.publish = original
+
+        events = [json.loads(payload) for payload in published]
+        self.assertEqual(
+            [(event['type'], event['data'].get('id'), event['data'].get('ids')) for event in events],
+            [(LEAD_CREATED, lead.id, None), (LEAD_STATUS_CHANGED, None, [lead.id]), (LEAD_STATUS_CHANGED, None, [other.id])]
+        )
+
+
+class LeadEventStreamTest(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='attorney', password='testpass123')
+        self.token = str(RefreshToken.for_user(self.user).access_token)
+
+    async def test_stream_requires_token(self):
+        """Test that the stream rejects missing and invalid tokens"""
+        response = await self.async_client.get(reverse('lead-events'))
+        self.assertEqual(response.status_code, 401)
+        response = await self.async_client.get(reverse('lead-events'), headers={'Authorization': 'Bearer invalid'})
+        self.assertEqual(response.status_code, 401)
+
+    async def test_access_token_not_accepted_in_query(self):
+        """Test that the JWT itself cannot be put in the URL"""
+        response = await self.async_client.get(reverse('lead-events'), {'token': self.token})
+        self.assertEqual(response.status_code, 401)
+        response = await self.async_client.get(reverse('lead-events'), {'ticket': self.token})
+        self.assertEqual(response.status_code, 401)
+
+    @override_settings(LEAD_EVENTS_BACKEND='local', LEAD_EVENTS_MAX_STREAM_SECONDS=1)
+    async def test_stream_opened_with_ticket(self):
+        """Test that an authenticated POST issues a ticket that opens the stream until it expires"""
+        response = await self.async_client.post(reverse('lead-events-ticket'))
+        self.assertEqual(response.status_code, 401)
+        response = await self.async_client.post(
+            reverse('lead-events-ticket'),
+            headers={'Authorization': f'Bearer {self.token}'}
+        )
+        self.assertEqual(response.status_code, 201)
+        ticket = response.json()['ticket']
+
+        response = await self.async_client.get(reverse('lead-events'), {'ticket': ticket})
+        self.assertEqual(response.status_code, 200)
+        async for _ in response.streaming_content:
+            pass
+
+        with override_settings(LEAD_EVENTS_TICKET_SECONDS=0):
+            await asyncio.sleep(1)
+            response = await self.async_client.get(reverse('lead-events'), {'ticket': ticket})
+        self.assertEqual(response.status_code, 401)
+
+    @override_settings(LEAD_EVENTS_MAX_STREAM_SECONDS=2)
+    async def test_stream_delivers_committed_leads(self):
+        """Test that a lead created in another connection arrives through LISTEN/NOTIFY"""
+        response = await self.async_client.get(
+            reverse('lead-events'),
+            headers={'Authorization': f'Bearer {self.token}'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        first = await asyncio.wait_for(response.streaming_content.__anext__(), 5)
+        self.assertIn('retry:', first.decode() if isinstance(first, bytes) else first)
+
+        lead = await sync_to_async(create_lead)('john@example.com')
+        event, data = await read_event(response)
+        self.assertEqual(event, LEAD_CREATED)
+        self.assertEqual(data['id'], lead.id)
+        self.assertEqual(data['email'], 'john@example.com')
+
+        # The stream ends on its own so clients reconnect and subscriptions are freed
+        async for _ in response.streaming_content:
+            pass
+        self.assertEqual(broker.subscribers, set())
+        self.assertIsNone(broker.listener)
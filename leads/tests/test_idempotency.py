@@ -0,0 +1,164 @@
+from datetime import timedelta
+from io import StringIO
+import shutil
+import tempfile
+import threading
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import AsyncClient, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework.throttling import SimpleRateThrottle
+
+from leads.models import EmailOutbox, IdempotencyKey, Lead
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def submission(email='john@example.com', first_name='John'):
+    return {
+        'first_name': first_name,
+        'last_name': 'Doe',
+        'email': email,
+        'resume': SimpleUploadedFile("test_resume.pdf", b"file_content", content_type="application/pdf"),
+    }
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, EMAIL_TRANSPORT='leads.services.LocalTransport')
+class IntakeDeduplicationTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.url = reverse('lead-create')
+
+    def submit(self, key=None, **data):
+        headers = {'HTTP_IDEMPOTENCY_KEY': key} if key else {}
+        return self.client.post(self.url, submission(**data), format='multipart', **headers)
+
+    def test_retry_with_key_replays_response(self):
+        first = self.submit(key='retry-1')
+        emails = EmailOutbox.objects.count()
+
+        retry = self.submit(key='retry-1')
+
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(Lead.objects.count(), 1)
+        self.assertEqual(EmailOutbox.objects.count(), emails)
+
+    def test_key_reused_for_other_submission_is_rejected(self):
+        self.submit(key='retry-1')
+
+        response = self.submit(key='retry-1', email='jane@example.com')
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(Lead.objects.count(), 1)
+
+    def test_expired_key_is_reused(self):
+        self.submit(key='retry-1')
+        IdempotencyKey.objects.update(created_at=timezone.now() - timedelta(days=2))
+        Lead.objects.update(created_at=timezone.now() - timedelta(days=2))
+
+        response = self.submit(key='retry-1')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn('Idempotent-Replayed', response)
+        self.assertEqual(Lead.objects.count(), 2)
+        self.assertEqual(IdempotencyKey.objects.get().lead, Lead.objects.first())
+
+    def test_repeated_email_is_acknowledged_without_lead(self):
+        """Test that a resubmission without a key within the window is not stored again"""
+        self.submit()
+        emails = EmailOutbox.objects.count()
+
+        response = self.submit(email=' JOHN@example.com')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), {'detail': "This application has already been received."})
+        self.assertEqual(Lead.objects.count(), 1)
+        self.assertEqual(EmailOutbox.objects.count(), emails)
+
+    def test_replayed_retries_are_not_throttled(self):
+        """Test that retries with a stored key do not use up the intake rate limit"""
+        rates = {'intake_ip': None, 'intake_email': '2/hour'}
+        with mock.patch.object(SimpleRateThrottle, 'THROTTLE_RATES', rates):
+            responses = [self.submit(key='retry-1') for _ in range(5)]
+            duplicate = self.submit()
+
+        self.assertEqual([response.status_code for response in responses], [201] * 5)
+        self.assertEqual(duplicate.status_code, status.HTTP_200_OK)
+
+    def test_repeated_email_after_window_creates_lead(self):
+        self.submit()
+        Lead.objects.update(created_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(self.submit().status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Lead.objects.count(), 2)
+
+    @override_settings(LEAD_DUPLICATE_WINDOW_SECONDS=0)
+    def test_duplicate_check_can_be_disabled(self):
+        self.submit()
+        self.assertEqual(self.submit().status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Lead.objects.count(), 2)
+
+    async def test_async_create_replays_response(self):
+        client = AsyncClient()
+        url = reverse('lead-create-async')
+        first = await client.post(url, submission(), headers={'Idempotency-Key': 'retry-1'})
+        retry = await client.post(url, submission(), headers={'Idempotency-Key': 'retry-1'})
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(await Lead.objects.acount(), 1)
+
+    def test_purge_command_deletes_expired_keys(self):
+        self.submit(key='old')
+        self.submit(key='new', email='jane@example.com')
+        IdempotencyKey.objects.filter(key='old').update(created_at=timezone.now() - timedelta(days=2))
+
+        out = StringIO()
+        call_command('purge_idempotency_keys', stdout=out)
+        self.assertIn("Deleted 1 expired idempotency keys", out.getvalue())
+        self.assertEqual(list(IdempotencyKey.objects.values_list('key', flat=True)), ['new'])
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, EMAIL_TRANSPORT='leads.services.LocalTransport')
+class ConcurrentSubmissionTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_concurrent_retries_create_one_lead(self):
+        """Test that simultaneous submissions with one key and email store a single lead"""
+        barrier = threading.Barrier(3)
+        responses = []
+
+        def submit():
+            client = APIClient()
+            barrier.wait()
+            try:
+                responses.append(
+                    client.post(reverse('lead-create'), submission(), format='multipart', HTTP_IDEMPOTENCY_KEY='race')
+                )
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=submit) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(response.status_code for response in responses), [201, 201, 201])
+        self.assertEqual(len({response.json()['id'] for response in responses}), 1)
+        self.assertEqual(Lead.objects.count(), 1)
@@ -0,0 +1,187 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from leads.models import EmailOutbox, Lead
+from leads.outbox import OutboxWorker, enqueue_lead_notifications
+from leads.services import EmailService, LocalTransport, MailjetTransport, SendResult
+
+
+class FailingTransport:
+    def send(self, messages):
+        raise ConnectionError("Mailjet unavailable")
+
+
+class RecordingTransport:
+    def __init__(self):
+        self.calls = []
+
+    def send(self, messages):
+        self.calls.append(messages)
+        return [SendResult(ok=True) for _ in messages]
+
+
+class ConcurrentTransport(RecordingTransport):
+    async def asend_many(self, chunks):
+        self.calls.extend(chunks)
+        return [ConnectionError("Mailjet unavailable") if i == 1 else self.send_ok(chunk)
+                for i, chunk in enumerate(chunks)]
+
+    def send_ok(self, chunk):
+        return [SendResult(ok=True) for _ in chunk]
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self.payload = payload
+
+    def json(self):
+        return self.payload
+
+
+@override_settings(
+    EMAIL_TRANSPORT='leads.services.LocalTransport',
+    EMAIL_OUTBOX_MAX_ATTEMPTS=3,
+    EMAIL_OUTBOX_RETRY_BASE_SECONDS=30,
+)
+class EmailOutboxTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        LocalTransport.outbox = []
+        self.lead = Lead.objects.create(
+            first_name="John",
+            last_name="Doe",
+            email="john@example.com",
+            resume=SimpleUploadedFile("test_resume.pdf", b"file_content")
+        )
+
+    def test_create_lead_queues_emails_without_sending(self):
+        """Test that lead intake only writes outbox rows"""
+        url = reverse('lead-create')
+        data = {
+            'first_name': 'Jane',
+            'last_name': 'Smith',
+            'email': 'jane@example.com',
+            'resume': SimpleUploadedFile("resume.pdf", b"file_content")
+        }
+        response = APIClient().post(url, data, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        lead = Lead.objects.get(email='jane@example.com')
+        self.assertEqual(
+            sorted(lead.emails.values_list('kind', flat=True)),
+            [EmailOutbox.ATTORNEY_NOTIFICATION, EmailOutbox.PROSPECT_CONFIRMATION]
+        )
+        self.assertEqual(LocalTransport.outbox, [])
+
+    def test_worker_sends_pending_emails(self):
+        """Test that the worker delivers queued emails and marks them sent"""
+        enqueue_lead_notifications(self.lead)
+        call_command('process_email_outbox', '--once', stdout=StringIO())
+
+        self.assertEqual(len(LocalTransport.outbox), 2)
+        self.assertFalse(EmailOutbox.objects.exclude(status=EmailOutbox.SENT).exists())
+
+    def test_failed_delivery_is_retried_with_backoff(self):
+        """Test that a failed send is rescheduled with exponential backoff"""
+        enqueue_lead_notifications(self.lead)
+        worker = OutboxWorker(email_service=EmailService(transport=FailingTransport()))
+        before = timezone.now()
+        worker.process_batch()
+
+        entry = EmailOutbox.objects.first()
+        self.assertEqual(entry.status, EmailOutbox.PENDING)
+        self.assertEqual(entry.attempts, 1)
+        self.assertIn("Mailjet unavailable", entry.last_error)
+        self.assertGreaterEqual(entry.next_attempt_at, before + timedelta(seconds=30))
+
+        # Not due yet, so a second pass does nothing
+        self.assertEqual(worker.process_batch(), 0)
+
+    def test_exhausted_entries_are_dead_lettered(self):
+        """Test that entries are dead-lettered after the maximum attempts"""
+        enqueue_lead_notifications(self.lead)
+        worker = OutboxWorker(email_service=EmailService(transport=FailingTransport()))
+        for _ in range(3):
+            EmailOutbox.objects.update(next_attempt_at=timezone.now())
+            worker.process_batch()
+
+        self.assertEqual(EmailOutbox.objects.filter(status=EmailOutbox.DEAD).count(), 2)
+        self.assertEqual(worker.process_batch(), 0)
+
+    def test_worker_coalesces_pending_emails_into_one_call(self):
+        """Test that due entries for many leads go out in a single provider call"""
+        enqueue_lead_notifications(self.lead)
+        for i in range(4):
+            lead = Lead.objects.create(
+                first_name="Lead",
+                last_name=str(i),
+                email=f"lead{i}@example.com",
+                resume=SimpleUploadedFile("test_resume.pdf", b"file_content")
+            )
+            enqueue_lead_notifications(lead)
+
+        transport = RecordingTransport()
+        OutboxWorker(email_service=EmailService(transport=transport)).process_batch()
+
+        self.assertEqual(len(transport.calls), 1)
+        self.assertEqual(len(transport.calls[0]), 10)
+        self.assertEqual(EmailOutbox.objects.filter(status=EmailOutbox.SENT).count(), 10)
+
+
+class EmailServiceBatchTest(TestCase):
+    @override_settings(MAILJET_BATCH_SIZE=3)
+    def test_send_batch_chunks_by_batch_size(self):
+        """Test that send_batch splits messages into provider-sized chunks"""
+        transport = RecordingTransport()
+        results = EmailService(transport=transport).send_batch([{}] * 7)
+
+        self.assertEqual([len(call) for call in transport.calls], [3, 3, 1])
+        self.assertEqual(len(results), 7)
+        self.assertTrue(all(result.ok for result in results))
+
+    @override_settings(MAILJET_BATCH_SIZE=3)
+    def test_send_batch_uses_concurrent_transport(self):
+        """Test that chunks go through asend_many and a failed chunk only fails its messages"""
+        transport = ConcurrentTransport()
+        results = EmailService(transport=transport).send_batch([{}] * 7)
+
+        self.assertEqual([len(call) for call in transport.calls], [3, 3, 1])
+        self.assertEqual([result.ok for result in results], [True] * 3 + [False] * 3 + [True])
+        self.assertEqual(results[3].error, "Mailjet unavailable")
+
+    @override_settings(MAILJET_BATCH_SIZE=3)
+    async def test_asend_batch_with_sync_transport(self):
+        """Test that asend_batch falls back to the transport's blocking send"""
+        transport = RecordingTransport()
+        results = await EmailService(transport=transport).asend_batch([{}] * 4)
+
+        self.assertEqual([len(call) for call in transport.calls], [3, 1])
+        self.assertTrue(all(result.ok for result in results))
+
+    def test_mailjet_per_message_results(self):
+        """Test that partial failures are reported per message"""
+        response = FakeResponse(400, {
+            'Messages': [
+                {'Status': 'success', 'To': [{'Email': 'a@example.com', 'MessageID': 123}]},
+                {'Status': 'error', 'Errors': [{'ErrorMessage': 'Invalid email'}]},
+            ]
+        })
+        results = MailjetTransport().parse_response(response, 2)
+
+        self.assertEqual(results[0], SendResult(ok=True, message_id='123'))
+        self.assertEqual(results[1], SendResult(ok=False, error='Invalid email'))
+
+    def test_mailjet_error_without_details_fails_whole_batch(self):
+        """Test that an HTTP error without per-message details fails every message"""
+        results = MailjetTransport().parse_response(FakeResponse(503, {}), 2)
+        self.assertEqual([result.ok for result in results], [False, False])
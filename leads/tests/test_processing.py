@@ -0,0 +1,331 @@
+from datetime import timedelta
+import io
+import shutil
+import tempfile
+import time
+from unittest import mock
+import zipfile
+import zlib
+from xml.sax.saxutils import escape
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from leads.extraction import extract_resume
+from leads.models import Lead, ResumeAnalysis
+from leads.processing import ResumeProcessor
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def pdf_string(text):
+    return '(' + text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)') + ')'
+
+
+def pdf_stream(content, compress):
+    data = content.encode('latin-1')
+    if compress:
+        data = zlib.compress(data)
+    return b'<< /Length %d%s >>\nstream\n%s\nendstream' % (
+        len(data), b' /Filter /FlateDecode' if compress else b'', data
+    )
+
+
+def make_pdf(lines, compress=True):
+    """A two-page PDF with the lines on its first page"""
+    text = ''.join(f'BT /F1 12 Tf 72 {720 - i * 16} Td {pdf_string(line)} Tj ET\n' for i, line in enumerate(lines))
+    page = '<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>'
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [4 0 R 6 0 R] /Count 2 >>',
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+        (page % 5).encode(),
+        pdf_stream(text, compress),
+        (page % 7).encode(),
+        pdf_stream('', compress),
+        b'<< /Title (Jane Doe CV) /Author (Jane Doe) >>',
+    ]
+    output = io.BytesIO()
+    output.write(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(output.tell())
+        output.write(b'%d 0 obj\n%s\nendobj\n' % (number, body))
+    xref = output.tell()
+    output.write(b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1))
+    output.write(b''.join(b'%010d 00000 n \n' % offset for offset in offsets))
+    output.write(b'trailer\n<< /Size %d /Root 1 0 R /Info 8 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref))
+    return output.getvalue()
+
+
+def make_docx(paragraphs, pages=3):
+    word = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+    body = ''.join(f'<w:p><w:r><w:t>{escape(text)}</w:t></w:r></w:p>' for text in paragraphs)
+    thumbnail = io.BytesIO()
+    Image.new('RGB', (600, 800), 'white').save(thumbnail, format='JPEG')
+
+    output = io.BytesIO()
+    with zipfile.ZipFile(output, 'w') as archive:
+        archive.writestr('word/document.xml', f'<w:document xmlns:w="{word}"><w:body>{body}</w:body></w:document>')
+        archive.writestr(
+            'docProps/app.xml',
+            '<Properties xmlns="http://schemas.openxmlformats.org/officeDocument/2006/extended-properties">'
+            f'<Pages>{pages}</Pages></Properties>'
+        )
+        archive.writestr(
+            'docProps/core.xml',
+            '<cp:coreProperties xmlns:cp="http://schemas.openxmlformats.org/package/2006/metadata/core-properties" '
+            'xmlns:dc="http://purl.org/dc/elements/1.1/"><dc:creator>John Doe</dc:creator></cp:coreProperties>'
+        )
+        archive.writestr('docProps/thumbnail.jpeg', thumbnail.getvalue())
+    return output.getvalue()
+
+
+class ExtractionTest(TestCase):
+    def test_pdf_text_and_pages(self):
+        """Test that text, page count and metadata are read from compressed and plain PDFs"""
+        for compress in (True, False):
+            result = extract_resume(make_pdf(['Senior Engineer', 'Python (Django)'], compress), 'pdf')
+            self.assertIn('Senior Engineer', result['text'])
+            self.assertIn('Python (Django)', result['text'])
+            self.assertEqual(result['page_count'], 2)
+            self.assertEqual(result['metadata']['title'], 'Jane Doe CV')
+            with Image.open(io.BytesIO(result['thumbnail'])) as image:
+                self.assertEqual(image.format, 'PNG')
+                self.assertLessEqual(image.height, 400)
+
+    def test_docx_text_pages_and_thumbnail(self):
+        """Test that DOCX paragraphs, page count and the embedded thumbnail are extracted"""
+        result = extract_resume(make_docx(['Immigration paralegal', 'Ten years']), 'docx')
+        self.assertEqual(result['text'], 'Immigration paralegal\nTen years')
+        self.assertEqual(result['page_count'], 3)
+        self.assertEqual(result['metadata']['author'], 'John Doe')
+        with Image.open(io.BytesIO(result['thumbnail'])) as image:
+            self.assertEqual(image.format, 'PNG')
+            self.assertLessEqual(image.height, 400)
+
+    def test_legacy_doc_heuristic(self):
+        """Test that readable runs are pulled out of binary Word files"""
+        data = b'\xd0\xcf\x11\xe0' + b'\x00' * 32 + 'Experienced litigator'.encode('utf-16-le') + b'\x01\x02'
+        self.assertEqual(extract_resume(data, 'doc')['text'], 'Experienced litigator')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ResumeProcessingTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='attorney', password='testpass123')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def submit(self, email, name, content):
+        data = {
+            'first_name': 'Jane',
+            'last_name': 'Doe',
+            'email': email,
+            'resume': SimpleUploadedFile(name, content)
+        }
+        response = self.client.post(reverse('lead-create'), data, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return Lead.objects.get(pk=response.data['id'])
+
+    def test_new_blob_queued_once(self):
+        """Test that identical resumes share a single pending analysis"""
+        content = make_pdf(['Same resume'])
+        self.submit('jane@example.com', 'resume.pdf', content)
+        self.submit('jane+again@example.com', 'resume.pdf', content)
+        self.assertEqual(ResumeAnalysis.objects.filter(status=ResumeAnalysis.PENDING).count(), 1)
+
+    def test_process_and_read_analysis(self):
+        """Test that processed text and the thumbnail are served through the API"""
+        lead = self.submit('jane@example.com', 'resume.docx', make_docx(['Asylum casework']))
+        self.assertEqual(ResumeProcessor().drain(), 1)
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(reverse('lead-resume-analysis', kwargs={'pk': lead.pk}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], ResumeAnalysis.DONE)
+        self.assertEqual(response.data['text'], 'Asylum casework')
+        self.assertEqual(response.data['page_count'], 3)
+
+        response = self.client.get(response.data['thumbnail_url'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'\x89PNG'))
+
+    def test_unparseable_resume_marked_failed(self):
+        """Test that a corrupt file fails its analysis instead of stopping the worker"""
+        self.submit('jane@example.com', 'resume.docx', b'not a zip archive')
+        with self.assertLogs('leads.processing', level='WARNING'):
+            ResumeProcessor().drain()
+        analysis = ResumeAnalysis.objects.get()
+        self.assertEqual(analysis.status, ResumeAnalysis.FAILED)
+        self.assertTrue(analysis.error)
+
+    def test_process_pool(self):
+        """Test that parsing runs in worker processes"""
+        self.submit('jane@example.com', 'resume.pdf', make_pdf(['Pooled parsing']))
+        with ResumeProcessor(workers=1) as processor:
+            processor.drain()
+        self.assertIn('Pooled parsing', ResumeAnalysis.objects.get().text)
+
+    def test_timed_out_parse_restarts_pool(self):
+        """Test that a hung parse has its worker replaced and the rest of the batch still runs"""
+        self.submit('jane@example.com', 'resume.pdf', make_pdf(['Hung parse']))
+        self.submit('john@example.com', 'resume.pdf', make_pdf(['Parsed after restart']))
+        hung = []
+
+        with ResumeProcessor(workers=1, timeout=1) as processor:
+            submit = processor.submit
+
+            def hang_first(analysis):
+                if hung:
+                    return submit(analysis)
+                hung.append(analysis)
+                return processor.pool.apply_async(time.sleep, (60,))
+
+            with mock.patch.object(processor, 'submit', side_effect=hang_first):
+                with self.assertLogs('leads.processing', level='WARNING'):
+                    processor.drain()
+
+        failed = ResumeAnalysis.objects.get(pk=hung[0].pk)
+        self.assertEqual(failed.status, ResumeAnalysis.FAILED)
+        self.assertIn('Timed out', failed.error)
+        done = ResumeAnalysis.objects.exclude(pk=hung[0].pk).get()
+        self.assertEqual(done.status, ResumeAnalysis.DONE)
+        self.assertIn('Parsed after restart', done.text)
+
+    def test_claimed_while_parsing(self):
+        """Test that a row is claimed before its file is parsed and released with the result"""
+        self.submit('jane@example.com', 'resume.docx', make_docx(['Claimed']))
+        claims = []
+
+        def parse(data, extension):
+            claims.append(ResumeAnalysis.objects.values_list('status', 'claimed_until').get())
+            return extract_resume(data, extension)
+
+        with mock.patch('leads.processing.extract_resume', side_effect=parse):
+            ResumeProcessor().drain()
+        status_during_parse, claimed_until = claims[0]
+        self.assertEqual(status_during_parse, ResumeAnalysis.PENDING)
+        self.assertGreater(claimed_until, timezone.now())
+        analysis = ResumeAnalysis.objects.get()
+        self.assertEqual(analysis.status, ResumeAnalysis.DONE)
+        self.assertIsNone(analysis.claimed_until)
+
+    def test_only_expired_claims_are_retaken(self):
+        """Test that another worker's live claim is skipped and a dead worker's claim is retaken"""
+        self.submit('jane@example.com', 'resume.docx', make_docx(['Claimed elsewhere']))
+        ResumeAnalysis.objects.update(claimed_until=timezone.now() + timedelta(minutes=5))
+        self.assertEqual(ResumeProcessor().drain(), 0)
+
+        ResumeAnalysis.objects.update(claimed_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(ResumeProcessor().drain(), 1)
+        self.assertEqual(ResumeAnalysis.objects.get().status, ResumeAnalysis.DONE)
+
+    def test_result_for_reclaimed_row_is_dropped(self):
+        """Test that a worker whose claim expired does not overwrite the new claimant's row"""
+        self.submit('jane@example.com', 'resume.docx', make_docx(['Reclaimed']))
+        processor = ResumeProcessor()
+        analysis = processor.claim()[0]
+        ResumeAnalysis.objects.update(claimed_until=timezone.now() + timedelta(minutes=5))
+        processor.mark_done(analysis, extract_resume(make_docx(['Stale']), 'docx'))
+        processor.save(analysis)
+        self.assertEqual(ResumeAnalysis.objects.get().status, ResumeAnalysis.PENDING)
+
+    def test_analysis_requires_authentication(self):
+        """Test that extracted resume text is not public"""
+        lead = self.submit('jane@example.com', 'resume.pdf', make_pdf(['Private']))
+        response = self.client.get(reverse('lead-resume-analysis', kwargs={'pk': lead.pk}))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ResumeSearchTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='attorney', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('lead-search')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def create_lead(self, email, paragraphs, process=True):
+        data = {
+            'first_name': 'Jane',
+            'last_name': 'Doe',
+            'email': email,
+            'resume': SimpleUploadedFile('resume.docx', make_docx(paragraphs))
+        }
+        response = APIClient().post(reverse('lead-create'), data, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        if process:
+            ResumeProcessor().drain()
+        return Lead.objects.get(pk=response.data['id'])
+
+    def test_ranked_matches_with_highlights(self):
+        """Test that results are ranked, stemmed and come with escaped snippets"""
+        strong = self.create_lead('strong@example.com', ['Immigration lawyer', 'Immigration appeals & asylum'])
+        weak = self.create_lead('weak@example.com', ['Tax law', 'Some immigration work'])
+        self.create_lead('other@example.com', ['Corporate litigator'])
+
+        response = self.client.get(self.url, {'q': 'immigration'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data['results']
+        self.assertEqual([lead['id'] for lead in results], [strong.id, weak.id])
+        self.assertGreater(results[0]['rank'], results[1]['rank'])
+        self.assertIn('<mark>Immigration</mark>', results[0]['headline'])
+        self.assertIn('&amp;', results[0]['headline'])
+
+        response = self.client.get(self.url, {'q': 'litigation'})
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_keyset_pages(self):
+        """Test that cursor pages cover every match exactly once"""
+        for i in range(5):
+            self.create_lead(f'lead{i}@example.com', ['Litigation ' * (i + 1), f'Case {i}'])
+
+        seen = []
+        response = self.client.get(self.url, {'q': 'litigation', 'page_size': 2})
+        while True:
+            seen.extend(lead['id'] for lead in response.data['results'])
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(len(set(seen)), 5)
+
+        response = self.client.get(response.data['previous'])
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_unprocessed_and_filtered_leads_excluded(self):
+        """Test that pending resumes and filtered-out leads are not returned"""
+        lead = self.create_lead('done@example.com', ['Immigration', 'Processed'])
+        self.create_lead('pending@example.com', ['Immigration', 'Pending'], process=False)
+        lead.status = Lead.REACHED_OUT
+        lead.save()
+
+        response = self.client.get(self.url, {'q': 'immigration'})
+        self.assertEqual([row['id'] for row in response.data['results']], [lead.id])
+        response = self.client.get(self.url, {'q': 'immigration', 'status': Lead.PENDING})
+        self.assertEqual(response.data['results'], [])
+
+    def test_query_required(self):
+        """Test that a search term is required"""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,113 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import AsyncClient, TestCase, override_settings
+import fakeredis
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework.throttling import SimpleRateThrottle
+
+from utils.throttling import IntakeIPThrottle
+
+
+def intake_rates(ip=None, email=None):
+    return mock.patch.object(SimpleRateThrottle, 'THROTTLE_RATES', {'intake_ip': ip, 'intake_email': email})
+
+
+class IntakeThrottleTest(TestCase):
+    """Intake requests without a resume are rejected by validation, after throttling"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def submit(self, email='john@example.com', ip='10.0.0.1'):
+        data = {'first_name': 'John', 'last_name': 'Doe', 'email': email}
+        return self.client.post(reverse('lead-create'), data, REMOTE_ADDR=ip)
+
+    def test_limits_submissions_per_address(self):
+        with intake_rates(ip='2/min'):
+            for i in range(2):
+                self.assertEqual(self.submit(email=f'lead{i}@example.com').status_code, status.HTTP_400_BAD_REQUEST)
+            response = self.submit(email='lead3@example.com')
+            self.assertEqual(self.submit(ip='10.0.0.2').status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', response)
+
+    def test_limits_submissions_per_email_from_any_address(self):
+        with intake_rates(email='2/hour'):
+            self.submit(ip='10.0.0.1')
+            self.submit(ip='10.0.0.2')
+            response = self.submit(email=' John@Example.com', ip='10.0.0.3')
+            self.assertEqual(self.submit(email='jane@example.com').status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    async def test_async_intake_is_throttled(self):
+        client = AsyncClient()
+        data = {'first_name': 'John', 'last_name': 'Doe', 'email': 'john@example.com'}
+        with intake_rates(ip='1/min'):
+            first = await client.post(reverse('lead-create-async'), data)
+            second = await client.post(reverse('lead-create-async'), data)
+
+        self.assertEqual(first.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(second.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', second)
+
+
+class SlidingWindowTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.now = 600.0
+        self.request = mock.Mock(META={'REMOTE_ADDR': '10.0.0.1'})
+
+    def allow(self):
+        with intake_rates(ip='4/min'):
+            throttle = IntakeIPThrottle()
+        throttle.timer = lambda: self.now
+        return throttle.allow_request(self.request, None), throttle
+
+    def test_previous_window_is_weighted_by_overlap(self):
+        """Test that five requests at the end of a window leave room for one halfway through the next"""
+        self.now = 659.0
+        self.assertTrue(all(self.allow()[0] for _ in range(4)))
+        self.assertFalse(self.allow()[0])
+
+        # 5 requests counted in the previous window, half of it still overlaps
+        self.now = 690.0
+        self.assertTrue(self.allow()[0])
+        allowed, throttle = self.allow()
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(throttle.wait(), 6.0)
+
+    def test_counters_are_one_key_per_window(self):
+        for _ in range(3):
+            self.allow()
+        self.assertEqual(cache.get(f'throttle_intake_ip_10.0.0.1:{int(self.now // 60)}'), 3)
+
+
+class RedisStandIn:
+    """Run a test case with REDIS_URL set, against an in-memory Redis stand-in"""
+
+    def setUp(self):
+        super().setUp()
+        self.redis = fakeredis.FakeRedis()
+        self.enterContext(override_settings(REDIS_URL='redis://redis:6379/0'))
+        self.enterContext(mock.patch('utils.throttling.redis_client', return_value=self.redis))
+
+
+class RedisIntakeThrottleTest(RedisStandIn, IntakeThrottleTest):
+    pass
+
+
+class RedisSlidingWindowTest(RedisStandIn, SlidingWindowTest):
+    def test_counters_are_one_key_per_window(self):
+        """Test that the counters live in Redis and expire after two windows"""
+        for _ in range(3):
+            self.allow()
+        key = f'throttle_intake_ip_10.0.0.1:{int(self.now // 60)}'
+        self.assertEqual(int(self.redis.get(key)), 3)
+        self.assertEqual(self.redis.ttl(key), 120)
+        self.assertIsNone(cache.get(key))
@@ -0,0 +1,141 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework.throttling import SimpleRateThrottle
+
+from leads.blobs import expire_uploads
+from leads.models import Lead
+from leads.uploads import sign_upload
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class DirectUploadTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.content = b"%PDF-1.4 resume"
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def request_slot(self, **overrides):
+        data = {
+            'filename': 'resume.pdf',
+            'content_type': 'application/pdf',
+            'size': len(self.content),
+            'sha256': hashlib.sha256(self.content).hexdigest(),
+            **overrides
+        }
+        return self.client.post(reverse('resume-upload'), data, format='json')
+
+    def upload(self, slot, body=None):
+        return self.client.generic(
+            slot['method'],
+            slot['url'],
+            body if body is not None else self.content,
+            content_type='application/pdf'
+        )
+
+    def create_lead(self, token):
+        data = {
+            'first_name': 'John',
+            'last_name': 'Doe',
+            'email': 'john@example.com',
+            'resume_upload': token
+        }
+        return self.client.post(reverse('lead-create'), data, format='json')
+
+    def test_two_step_upload(self):
+        """Test uploading to the presigned URL and then submitting the lead"""
+        slot = self.request_slot().data
+        self.assertEqual(self.upload(slot).status_code, status.HTTP_204_NO_CONTENT)
+
+        response = self.create_lead(slot['upload_token'])
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        lead = Lead.objects.get()
+        self.assertEqual(lead.resume_blob.sha256, hashlib.sha256(self.content).hexdigest())
+        with lead.resume.open() as stored:
+            self.assertEqual(stored.read(), self.content)
+
+    def test_lead_requires_completed_upload(self):
+        """Test that a slot cannot be used before the file is uploaded"""
+        slot = self.request_slot().data
+        response = self.create_lead(slot['upload_token'])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_forged_token_rejected(self):
+        """Test that clients cannot reference arbitrary storage keys"""
+        response = self.create_lead('resumes/someone-else.pdf')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_upload_must_match_declared_size(self):
+        """Test that the body must be exactly the size that was signed"""
+        slot = self.request_slot().data
+        response = self.upload(slot, body=self.content[:5])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(default_storage.exists(slot['key']))
+
+    def test_upload_must_match_declared_hash(self):
+        """Test that the body must have the SHA-256 that was signed"""
+        slot = self.request_slot().data
+        response = self.upload(slot, body=b"X" * len(self.content))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(default_storage.exists(slot['key']))
+
+    def test_upload_cannot_be_replaced(self):
+        """Test that a presigned URL is single use"""
+        slot = self.request_slot().data
+        self.upload(slot)
+        self.assertEqual(self.upload(slot).status_code, status.HTTP_409_CONFLICT)
+
+    def test_slot_validation(self):
+        """Test that slots enforce the resume type and size limits"""
+        self.assertEqual(
+            self.request_slot(filename='resume.exe').status_code,
+            status.HTTP_400_BAD_REQUEST
+        )
+        self.assertEqual(
+            self.request_slot(size=6 * 1024 * 1024).status_code,
+            status.HTTP_400_BAD_REQUEST
+        )
+
+    def test_bad_put_signature(self):
+        """Test that the upload endpoint rejects unsigned URLs"""
+        url = reverse('resume-upload-put', kwargs={'token': sign_upload('x', 1, '0' * 64) + 'tampered'})
+        response = self.client.put(url, b"x", content_type='application/pdf')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_upload_endpoints_are_throttled(self):
+        """Test that slot requests and uploads count towards the intake limit per address"""
+        with mock.patch.object(SimpleRateThrottle, 'THROTTLE_RATES', {'intake_ip': '2/min'}):
+            slot = self.request_slot().data
+            self.assertEqual(self.upload(slot).status_code, status.HTTP_204_NO_CONTENT)
+            response = self.request_slot()
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @override_settings(RESUME_UPLOAD_EXPIRY_SECONDS=60)
+    def test_expired_uploads_are_deleted(self):
+        """Test that uploads no lead used before the slot expired are removed"""
+        slot = self.request_slot().data
+        self.upload(slot)
+        self.assertEqual(expire_uploads(), 0)
+
+        expired = time.time() - 120
+        os.utime(default_storage.path(slot['key']), (expired, expired))
+        self.assertEqual(expire_uploads(), 1)
+        self.assertFalse(default_storage.exists(slot['key']))
@@ -1,3 +1,6 @@
+import json
+from datetime import timedelta
+from django.core.cache import cache
 from django.test import TestCase
 from django.urls import reverse
 from django.contrib.auth.models import User
@@ -8,6 +11,7 @@ from leads.models import Lead
 
 class LeadAPITest(TestCase):
     def setUp(self):
+        cache.clear()
         self.client = APIClient()
         self.user = User.objects.create_user(
             username='attorney',
@@ -51,7 +55,7 @@ class LeadAPITest(TestCase):
         url = reverse('lead-list')
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
     
     def test_update_lead_status(self):
         """Test updating lead status"""
@@ -70,3 +74,397 @@ class LeadAPITest(TestCase):
         
         lead.refresh_from_db()
         self.assertEqual(lead.status, Lead.REACHED_OUT)
+    
+    def test_update_lead_status_ignores_bulk_transitions(self):
+        """Test that a single lead can be moved back to PENDING"""
+        self.client.force_authenticate(user=self.user)
+        lead = Lead.objects.create(
+            first_name="John",
+            last_name="Doe",
+            email="john@example.com",
+            resume=self.resume_file,
+            status=Lead.REACHED_OUT
+        )
+        
+        url = reverse('lead-update', kwargs={'pk': lead.pk})
+        response = self.client.patch(url, {'status': Lead.PENDING})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        lead.refresh_from_db()
+        self.assertEqual(lead.status, Lead.PENDING)
+
+
+class LeadPaginationTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='attorney',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.leads = [
+            Lead.objects.create(
+                first_name="Lead",
+                last_name=str(i),
+                email=f"lead{i}@example.com",
+                resume=SimpleUploadedFile("test_resume.pdf", b"file_content")
+            )
+            for i in range(5)
+        ]
+        # Force ties on created_at so ordering has to fall back to id
+        Lead.objects.update(created_at=self.leads[0].created_at)
+
+    def test_pages_follow_created_at_and_id(self):
+        """Test that cursors walk every lead exactly once, newest first"""
+        url = reverse('lead-list')
+        response = self.client.get(url, {'page_size': 2})
+        seen = [lead['id'] for lead in response.data['results']]
+        self.assertIsNone(response.data['previous'])
+
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            seen += [lead['id'] for lead in response.data['results']]
+
+        self.assertEqual(seen, sorted((lead.id for lead in self.leads), reverse=True))
+
+    def test_previous_link_returns_prior_page(self):
+        """Test that the previous cursor returns the page before"""
+        url = reverse('lead-list')
+        first = self.client.get(url, {'page_size': 2})
+        second = self.client.get(first.data['next'])
+        back = self.client.get(second.data['previous'])
+        self.assertEqual(back.data['results'], first.data['results'])
+
+    def test_inserts_do_not_shift_pages(self):
+        """Test that new leads do not duplicate rows on later pages"""
+        url = reverse('lead-list')
+        first = self.client.get(url, {'page_size': 2})
+        Lead.objects.create(
+            first_name="New",
+            last_name="Lead",
+            email="new@example.com",
+            resume=SimpleUploadedFile("test_resume.pdf", b"file_content")
+        )
+        second = self.client.get(first.data['next'])
+        first_ids = {lead['id'] for lead in first.data['results']}
+        second_ids = {lead['id'] for lead in second.data['results']}
+        self.assertFalse(first_ids & second_ids)
+
+    def test_invalid_cursor(self):
+        """Test that a malformed cursor is rejected"""
+        response = self.client.get(reverse('lead-list'), {'cursor': 'garbage'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class LeadFilterTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='attorney',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.john = Lead.objects.create(
+            first_name="John",
+            last_name="Doe",
+            email="john@example.com",
+            resume=SimpleUploadedFile("test_resume.pdf", b"file_content")
+        )
+        self.jane = Lead.objects.create(
+            first_name="Jane",
+            last_name="Smith",
+            email="jane.smith@lawfirm.org",
+            status=Lead.REACHED_OUT,
+            resume=SimpleUploadedFile("test_resume.pdf", b"file_content")
+        )
+
+    def get_ids(self, params):
+        response = self.client.get(reverse('lead-list'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [lead['id'] for lead in response.data['results']]
+
+    def test_filter_by_status(self):
+        """Test filtering leads by status"""
+        self.assertEqual(self.get_ids({'status': Lead.REACHED_OUT}), [self.jane.id])
+
+    def test_filter_by_created_range(self):
+        """Test filtering leads by a created-at range"""
+        Lead.objects.filter(pk=self.john.pk).update(created_at='2024-01-01T10:00:00Z')
+        params = {
+            'created_after': '2023-12-31T00:00:00Z',
+            'created_before': '2024-01-02T00:00:00Z'
+        }
+        self.assertEqual(self.get_ids(params), [self.john.id])
+
+    def test_search_by_name_and_email(self):
+        """Test prefix search over names, mailbox and domain"""
+        self.assertEqual(self.get_ids({'search': 'smi'}), [self.jane.id])
+        self.assertEqual(self.get_ids({'search': 'john@example.com'}), [self.john.id])
+        self.assertEqual(self.get_ids({'search': 'lawfirm'}), [self.jane.id])
+        self.assertEqual(self.get_ids({'search': 'jo do'}), [self.john.id])
+
+    def test_invalid_filters_rejected(self):
+        """Test that invalid filter values return 400"""
+        response = self.client.get(reverse('lead-list'), {'status': 'UNKNOWN'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class LeadExportTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='attorney',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        for i, lead_status in enumerate([Lead.PENDING, Lead.REACHED_OUT, Lead.PENDING]):
+            Lead.objects.create(
+                first_name="Lead",
+                last_name=str(i),
+                email=f"lead{i}@example.com",
+                status=lead_status,
+                resume=SimpleUploadedFile("test_resume.pdf", b"file_content")
+            )
+
+    def read(self, response):
+        return b''.join(response.streaming_content).decode()
+
+    def test_export_requires_auth(self):
+        """Test that exporting leads requires authentication"""
+        self.client.force_authenticate(user=None)
+        response = self.client.get(reverse('lead-export'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_export_csv(self):
+        """Test streaming a CSV export"""
+        response = self.client.get(reverse('lead-export'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+
+        lines = self.read(response).splitlines()
+        self.assertTrue(lines[0].startswith('id,first_name,last_name,email'))
+        self.assertEqual(len(lines), 4)
+
+    def test_export_ndjson_with_status_filter(self):
+        """Test streaming a filtered NDJSON export"""
+        response = self.client.get(
+            reverse('lead-export'),
+            {'export_format': 'ndjson', 'status': Lead.PENDING}
+        )
+        rows = [json.loads(line) for line in self.read(response).splitlines()]
+        self.assertEqual(len(rows), 2)
+        self.assertTrue(all(row['status'] == Lead.PENDING for row in rows))
+
+    def test_export_unknown_format(self):
+        """Test that unsupported export formats are rejected"""
+        response = self.client.get(reverse('lead-export'), {'export_format': 'xml'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class LeadBulkUpdateTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='attorney',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.leads = [
+            Lead.objects.create(
+                first_name="Lead",
+                last_name=str(i),
+                email=f"lead{i}@example.com",
+                resume=SimpleUploadedFile("test_resume.pdf", b"file_content")
+            )
+            for i in range(3)
+        ]
+
+    def test_bulk_update_by_ids(self):
+        """Test updating a list of leads in one request"""
+        reached = self.leads[2]
+        Lead.objects.filter(pk=reached.pk).update(status=Lead.REACHED_OUT)
+        ids = [lead.id for lead in self.leads] + [999999]
+
+        # The UPDATE plus one NOTIFY carrying the status change event
+        with self.assertNumQueries(2):
+            response = self.client.post(
+                reverse('lead-bulk-update'),
+                {'ids': ids, 'status': Lead.REACHED_OUT},
+                format='json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['updated'], 2)
+        self.assertEqual(response.data['ids'], sorted([self.leads[0].id, self.leads[1].id]))
+        self.assertEqual(response.data['skipped_ids'], sorted([reached.id, 999999]))
+        self.assertEqual(Lead.objects.filter(status=Lead.REACHED_OUT).count(), 3)
+
+    def test_bulk_update_by_filter(self):
+        """Test updating every lead matching a filter"""
+        response = self.client.post(
+            reverse('lead-bulk-update'),
+            {'filter': {'search': 'lead1'}, 'status': Lead.REACHED_OUT},
+            format='json'
+        )
+        self.assertEqual(response.data['ids'], [self.leads[1].id])
+
+    def test_disallowed_transition_rejected(self):
+        """Test that no lead can be moved back to PENDING"""
+        response = self.client.post(
+            reverse('lead-bulk-update'),
+            {'ids': [self.leads[0].id], 'status': Lead.PENDING},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_requires_ids_or_filter(self):
+        """Test that exactly one selector must be given"""
+        response = self.client.post(
+            reverse('lead-bulk-update'),
+            {'status': Lead.REACHED_OUT},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+class LeadCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='attorney',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.lead = Lead.objects.create(
+            first_name="John",
+            last_name="Doe",
+            email="john@example.com",
+            resume=SimpleUploadedFile("test_resume.pdf", b"file_content")
+        )
+
+    def test_repeated_list_served_from_cache(self):
+        """Test that an unchanged list is served without touching the database"""
+        url = reverse('lead-list')
+        first = self.client.get(url)
+        with self.assertNumQueries(0):
+            second = self.client.get(url)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+        other = self.client.get(url, {'status': Lead.REACHED_OUT})
+        self.assertEqual(other.data['results'], [])
+
+    def test_if_none_match_returns_304(self):
+        """Test that polling with the last ETag gets 304 Not Modified"""
+        url = reverse('lead-list')
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_updates_invalidate_cache(self):
+        """Test that single and bulk status updates are visible immediately"""
+        detail_url = reverse('lead-detail', kwargs={'pk': self.lead.pk})
+        list_url = reverse('lead-list')
+        etag = self.client.get(detail_url)['ETag']
+        self.client.get(list_url)
+
+        self.client.patch(
+            reverse('lead-update', kwargs={'pk': self.lead.pk}),
+            {'status': Lead.REACHED_OUT},
+            format='json'
+        )
+        response = self.client.get(detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], Lead.REACHED_OUT)
+
+        other = Lead.objects.create(
+            first_name="Jane",
+            last_name="Doe",
+            email="jane@example.com",
+            resume=SimpleUploadedFile("test_resume.pdf", b"file_content")
+        )
+        self.assertEqual(len(self.client.get(list_url).data['results']), 2)
+
+        self.client.post(
+            reverse('lead-bulk-update'),
+            {'ids': [other.id], 'status': Lead.REACHED_OUT},
+            format='json'
+        )
+        statuses = {lead['status'] for lead in self.client.get(list_url).data['results']}
+        self.assertEqual(statuses, {Lead.REACHED_OUT})
+
+class LeadConditionalRequestTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='attorney',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.lead = Lead.objects.create(
+            first_name="John",
+            last_name="Doe",
+            email="john@example.com",
+            resume=SimpleUploadedFile("test_resume.pdf", b"file_content")
+        )
+        self.detail_url = reverse('lead-detail', kwargs={'pk': self.lead.pk})
+        self.update_url = reverse('lead-update', kwargs={'pk': self.lead.pk})
+
+    def test_detail_validators(self):
+        """Test that revalidation costs one narrow query and returns 304"""
+        response = self.client.get(self.detail_url)
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        response = self.client.get(self.detail_url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_detail_etag_changes_on_save(self):
+        """Test that saving a lead changes its ETag"""
+        etag = self.client.get(self.detail_url)['ETag']
+        self.lead.status = Lead.REACHED_OUT
+        self.lead.save()
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.data['status'], Lead.REACHED_OUT)
+
+    def test_detail_not_found(self):
+        """Test that an unknown lead is a 404"""
+        response = self.client.get(reverse('lead-detail', kwargs={'pk': 999999}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_update_with_matching_etag(self):
+        """Test that If-Match with the current ETag allows the update"""
+        etag = self.client.get(self.detail_url)['ETag']
+        response = self.client.patch(
+            self.update_url,
+            {'status': Lead.REACHED_OUT},
+            format='json',
+            HTTP_IF_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_update_with_stale_etag(self):
+        """Test that a lost update is rejected with 412 Precondition Failed"""
+        etag = self.client.get(self.detail_url)['ETag']
+        Lead.objects.filter(pk=self.lead.pk).update(updated_at=self.lead.updated_at + timedelta(seconds=1))
+
+        with self.assertLogs('django.request', level='WARNING'):
+            response = self.client.patch(
+                self.update_url,
+                {'status': Lead.REACHED_OUT},
+                format='json',
+                HTTP_IF_MATCH=etag
+            )
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.lead.refresh_from_db()
+        self.assertEqual(self.lead.status, Lead.PENDING)
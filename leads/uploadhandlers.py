@@ -0,0 +1,43 @@
+import hashlib
+
+from django.core.files.uploadhandler import (
+    MemoryFileUploadHandler,
+    TemporaryFileUploadHandler
+)
+
+
+class HashingUploadHandlerMixin:
+    """Compute the SHA-256 of each uploaded file chunk by chunk as it streams in.
+
+    The digest is attached to the resulting file as ``sha256`` so resumes can
+    be content-addressed without re-reading them after the upload.
+    """
+
+    def new_file(self, *args, **kwargs):
+        # Set before super(), which may raise StopFutureHandlers
+        self.sha256 = hashlib.sha256()
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.is_handling():
+            self.sha256.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        if file is not None:
+            file.sha256 = self.sha256.hexdigest()
+        return file
+
+    def is_handling(self):
+        return True
+
+
+class HashingMemoryFileUploadHandler(HashingUploadHandlerMixin, MemoryFileUploadHandler):
+    def is_handling(self):
+        # Large files are passed on to the temporary file handler, which hashes them
+        return self.activated
+
+
+class HashingTemporaryFileUploadHandler(HashingUploadHandlerMixin, TemporaryFileUploadHandler):
+    pass
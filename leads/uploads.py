@@ -0,0 +1,169 @@
+import base64
+import hashlib
+import os
+import uuid
+
+from django.conf import settings
+from django.core import signing
+from django.core.files.storage import default_storage
+from django.urls import reverse
+from django.utils.module_loading import import_string
+from django.utils.text import get_valid_filename
+
+from .models import RESUME_MAX_SIZE
+
+UPLOAD_TOKEN_SALT = 'leads.resume-upload'
+
+
+def build_upload_key(filename):
+    name = get_valid_filename(os.path.basename(filename)) or 'resume'
+    return f"resumes/uploads/{uuid.uuid4().hex}/{name}"
+
+
+def sign_upload(key, size, sha256):
+    return signing.dumps({'key': key, 'size': size, 'sha256': sha256}, salt=UPLOAD_TOKEN_SALT)
+
+
+def unsign_upload(token):
+    """Return (key, size, sha256) for a token issued by ResumeUploadSlotView.
+
+    Raises signing.BadSignature (or its SignatureExpired subclass) for forged
+    or stale tokens, so clients can only reference objects we handed out.
+    """
+    payload = signing.loads(
+        token,
+        salt=UPLOAD_TOKEN_SALT,
+        max_age=settings.RESUME_UPLOAD_EXPIRY_SECONDS
+    )
+    return payload['key'], payload['size'], payload['sha256']
+
+
+class FileSystemUploadBackend:
+    """
+    Presigned uploads into Django's default storage.
+
+    The "presigned URL" points at this app's own upload endpoint, which
+    streams the body to storage in chunks. Meant for development and tests;
+    production should use S3UploadBackend so resume bytes bypass app workers.
+    """
+
+    def create_upload(self, request, key, token, content_type, size, sha256):
+        url = reverse('resume-upload-put', kwargs={'token': token})
+        return {
+            'url': request.build_absolute_uri(url),
+            'method': 'PUT',
+            'headers': {'Content-Type': content_type},
+        }
+
+    def get_size(self, key):
+        if not default_storage.exists(key):
+            return None
+        return default_storage.size(key)
+
+    def save(self, key, stream, size, sha256):
+        """Stream exactly `size` bytes with the given SHA-256 into storage under `key`"""
+        if size > RESUME_MAX_SIZE:
+            raise ValueError("Resume file size must be under 5MB.")
+        body = LimitedStream(stream, size)
+        name = default_storage.save(key, body)
+        if default_storage.size(name) != size:
+            default_storage.delete(name)
+            raise ValueError("Upload body does not match the declared size")
+        if body.sha256.hexdigest() != sha256:
+            default_storage.delete(name)
+            raise ValueError("Upload body does not match the declared SHA-256")
+        return name
+
+    def copy(self, source, target):
+        with default_storage.open(source) as file:
+            return default_storage.save(target, file)
+
+
+class LimitedStream:
+    """Read at most `limit` bytes from a request stream, hashing them on the way"""
+
+    def __init__(self, stream, limit):
+        self.stream = stream
+        self.remaining = limit
+        self.sha256 = hashlib.sha256()
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.stream.read(size)
+        self.remaining -= len(data)
+        self.sha256.update(data)
+        return data
+
+    def chunks(self, chunk_size=64 * 1024):
+        while True:
+            data = self.read(chunk_size)
+            if not data:
+                return
+            yield data
+
+
+class S3UploadBackend:
+    """
+    Presigned PUT URLs for S3 or any S3-compatible store (e.g. MinIO).
+
+    Requires boto3, and Django's default storage must point at the same
+    bucket (e.g. django-storages' S3Storage) so Lead.resume can read the
+    uploaded objects. The declared SHA-256 is signed into the URL, so S3
+    rejects any body that does not match it.
+    """
+
+    def __init__(self):
+        import boto3
+
+        self.bucket = settings.RESUME_UPLOAD_S3_BUCKET
+        self.client = boto3.client(
+            's3',
+            endpoint_url=settings.RESUME_UPLOAD_S3_ENDPOINT_URL or None,
+            region_name=settings.RESUME_UPLOAD_S3_REGION or None
+        )
+
+    def create_upload(self, request, key, token, content_type, size, sha256):
+        checksum = base64.b64encode(bytes.fromhex(sha256)).decode()
+        url = self.client.generate_presigned_url(
+            'put_object',
+            Params={
+                'Bucket': self.bucket,
+                'Key': key,
+                'ContentType': content_type,
+                'ContentLength': size,
+                'ChecksumSHA256': checksum,
+            },
+            ExpiresIn=settings.RESUME_UPLOAD_EXPIRY_SECONDS
+        )
+        return {
+            'url': url,
+            'method': 'PUT',
+            'headers': {
+                'Content-Type': content_type,
+                'Content-Length': str(size),
+                'x-amz-checksum-sha256': checksum,
+            },
+        }
+
+    def copy(self, source, target):
+        self.client.copy_object(
+            Bucket=self.bucket,
+            Key=target,
+            CopySource={'Bucket': self.bucket, 'Key': source}
+        )
+        return target
+
+    def get_size(self, key):
+        from botocore.exceptions import ClientError
+
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=key)['ContentLength']
+        except ClientError:
+            return None
+
+
+def get_upload_backend():
+    return import_string(settings.RESUME_UPLOAD_BACKEND)()
@@ -1,9 +1,42 @@
 from django.urls import path
-from .views import LeadCreateView, LeadListView, LeadDetailView, LeadUpdateView
+from .async_views import (
+    AsyncLeadCreateView,
+    AsyncLeadDetailView,
+    AsyncLeadListView,
+    LeadEventStreamView
+)
+from .views import (
+    LeadCreateView,
+    LeadListView,
+    LeadSearchView,
+    LeadDetailView,
+    LeadUpdateView,
+    LeadResumeView,
+    LeadResumeAnalysisView,
+    LeadResumeThumbnailView,
+    LeadExportView,
+    LeadEventTicketView,
+    LeadBulkUpdateView,
+    ResumeUploadSlotView,
+    ResumeUploadPutView
+)
 
 urlpatterns = [
     path('', LeadCreateView.as_view(), name='lead-create'),
+    path('uploads/', ResumeUploadSlotView.as_view(), name='resume-upload'),
+    path('uploads/<str:token>/', ResumeUploadPutView.as_view(), name='resume-upload-put'),
     path('list/', LeadListView.as_view(), name='lead-list'),
+    path('async/', AsyncLeadCreateView.as_view(), name='lead-create-async'),
+    path('async/list/', AsyncLeadListView.as_view(), name='lead-list-async'),
+    path('async/<int:pk>/', AsyncLeadDetailView.as_view(), name='lead-detail-async'),
+    path('events/', LeadEventStreamView.as_view(), name='lead-events'),
+    path('events/ticket/', LeadEventTicketView.as_view(), name='lead-events-ticket'),
+    path('search/', LeadSearchView.as_view(), name='lead-search'),
+    path('export/', LeadExportView.as_view(), name='lead-export'),
+    path('bulk-update/', LeadBulkUpdateView.as_view(), name='lead-bulk-update'),
     path('<int:pk>/', LeadDetailView.as_view(), name='lead-detail'),
     path('<int:pk>/update/', LeadUpdateView.as_view(), name='lead-update'),
+    path('<int:pk>/resume/', LeadResumeView.as_view(), name='lead-resume'),
+    path('<int:pk>/resume/analysis/', LeadResumeAnalysisView.as_view(), name='lead-resume-analysis'),
+    path('<int:pk>/resume/thumbnail/', LeadResumeThumbnailView.as_view(), name='lead-resume-thumbnail'),
 ]
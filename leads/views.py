@@ -1,60 +1,339 @@
 from rest_framework import generics, status
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.views import APIView
+from django.conf import settings
+from django.core.cache import cache
 from django.contrib.auth.models import User
-from .models import Lead
-from .serializers import LeadCreateSerializer, LeadListSerializer, LeadUpdateSerializer
-from .services import EmailService
+from django.core import signing
+from django.db import transaction
+from django.http import FileResponse, Http404, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from utils.throttling import IntakeEmailThrottle, IntakeIPThrottle
+from .cache import CachedResponseMixin, cache_key
+from .conditional import get_lead_updated_at, get_lead_validators, set_validator_headers
+from .models import Lead, ResumeAnalysis
+from .downloads import serve_resume
+from .events import sign_stream_ticket
+from .exports import iter_export_rows, stream_csv, stream_ndjson
+from .filters import filter_leads, resume_headlines, search_resumes
+from .idempotency import (
+    KeyTaken,
+    find_replay,
+    find_stored_response,
+    get_idempotency_key,
+    request_fingerprint,
+    store_response
+)
+from .outbox import enqueue_lead_notifications
+from .pagination import KeysetPagination, SearchRankPagination
+from .services import bulk_update_status, find_duplicate_lead
+from .uploads import (
+    FileSystemUploadBackend,
+    build_upload_key,
+    get_upload_backend,
+    sign_upload,
+    unsign_upload
+)
+from .serializers import (
+    LeadBulkUpdateSerializer,
+    LeadCreateSerializer,
+    LeadFilterSerializer,
+    LeadListSerializer,
+    LeadSearchResultSerializer,
+    LeadUpdateSerializer,
+    ResumeAnalysisSerializer,
+    ResumeSearchSerializer,
+    ResumeUploadSlotSerializer
+)
+
+DUPLICATE_SUBMISSION_DETAIL = "This application has already been received."
+
+def create_lead(serializer):
+    """Validate and save a LeadCreateSerializer, raising ValidationError on bad input.
+
+    Returns (lead, created). A submission repeating the email of a recent
+    lead returns that lead instead of storing the lead, its resume and its
+    emails again.
+    """
+    serializer.is_valid(raise_exception=True)
+    
+    # Emails are queued in the same transaction and sent by the
+    # process_email_outbox worker, never in the request path
+    with transaction.atomic():
+        duplicate = find_duplicate_lead(serializer.validated_data['email'])
+        if duplicate is not None:
+            return duplicate, False
+        lead = serializer.save()
+        enqueue_lead_notifications(lead)
+    return lead, True
+
+def submit_lead(request, serializer):
+    """Handle a lead submission for the sync and async create views.
+
+    Returns (data, status code, headers). A retry with the same
+    Idempotency-Key gets the stored response of the first attempt. A
+    duplicate of a recent lead only gets an acknowledgement, so the
+    submitter cannot read back someone else's lead by posting their email.
+    """
+    key = get_idempotency_key(request)
+    fingerprint = request_fingerprint(request.data) if key else None
+    stored = find_stored_response(key, fingerprint) if key else None
+    if stored is None:
+        try:
+            with transaction.atomic():
+                lead, created = create_lead(serializer)
+                if created:
+                    data = LeadListSerializer(lead, context={'request': request}).data
+                    status_code = status.HTTP_201_CREATED
+                else:
+                    data = {'detail': DUPLICATE_SUBMISSION_DETAIL}
+                    status_code = status.HTTP_200_OK
+                if key:
+                    store_response(key, fingerprint, lead, status_code, data)
+            return data, status_code, {}
+        except KeyTaken:
+            stored = find_stored_response(key, fingerprint)
+    return stored.response, stored.status_code, {'Idempotent-Replayed': 'true'}
 
 class LeadCreateView(generics.CreateAPIView):
     queryset = Lead.objects.all()
     serializer_class = LeadCreateSerializer
     permission_classes = [AllowAny]
-    throttle_classes = []
-    throttle_scope = 'anon'
+    throttle_classes = [IntakeIPThrottle, IntakeEmailThrottle]
+    
+    def check_throttles(self, request):
+        # A retry replaying a stored response does not use up the intake budget
+        if find_replay(request) is None:
+            super().check_throttles(request)
     
     def create(self, request, *args, **kwargs):
-        serializer = self.get_serializer(data=request.data)
+        data, status_code, headers = submit_lead(request, self.get_serializer(data=request.data))
+        return Response(data, status=status_code, headers=headers)
+
+class ResumeUploadSlotView(APIView):
+    """Issue a presigned URL so the client uploads its resume straight to storage"""
+    permission_classes = [AllowAny]
+    throttle_classes = [IntakeIPThrottle]
+    
+    def post(self, request, *args, **kwargs):
+        serializer = ResumeUploadSlotSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        lead = serializer.save()
+        data = serializer.validated_data
         
-        # Send email notifications
-        email_service = EmailService()
-        print(f"Sending email to some email")
-        try:
-            email_service.send_prospect_confirmation(lead)
-            email_service.send_attorney_notification(lead)
-        except Exception as e:
-            # Log error but don't fail the request
-            print(f"Email sending failed: {str(e)}")
-        
-        return Response(
-            LeadListSerializer(lead, context={'request': request}).data,
-            status=status.HTTP_201_CREATED
+        key = build_upload_key(data['filename'])
+        token = sign_upload(key, data['size'], data['sha256'])
+        upload = get_upload_backend().create_upload(
+            request, key, token, data['content_type'], data['size'], data['sha256']
         )
+        return Response({
+            'upload_token': token,
+            'key': key,
+            'expires_in': settings.RESUME_UPLOAD_EXPIRY_SECONDS,
+            **upload
+        }, status=status.HTTP_201_CREATED)
 
-class LeadListView(generics.ListAPIView):
+class ResumeUploadPutView(APIView):
+    """Receiving end of FileSystemUploadBackend's presigned URLs"""
+    permission_classes = [AllowAny]
+    throttle_classes = [IntakeIPThrottle]
+    
+    def put(self, request, token, *args, **kwargs):
+        backend = get_upload_backend()
+        if not isinstance(backend, FileSystemUploadBackend):
+            raise Http404
+        
+        try:
+            key, size, sha256 = unsign_upload(token)
+        except signing.BadSignature:
+            return Response({'error': 'Invalid or expired upload URL'}, status=status.HTTP_403_FORBIDDEN)
+        if backend.get_size(key) is not None:
+            return Response({'error': 'Upload already completed'}, status=status.HTTP_409_CONFLICT)
+        
+        try:
+            backend.save(key, request.stream, size, sha256)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+class LeadListView(CachedResponseMixin, generics.ListAPIView):
     queryset = Lead.objects.all()
     serializer_class = LeadListSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    
+    def get_queryset(self):
+        filters = LeadFilterSerializer(data=self.request.query_params)
+        filters.is_valid(raise_exception=True)
+        return filter_leads(super().get_queryset(), filters.validated_data)
+
+class LeadSearchView(generics.ListAPIView):
+    """Full-text search over resume contents, best matches first"""
+    queryset = Lead.objects.all()
+    serializer_class = LeadSearchResultSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = SearchRankPagination
+
+    def get_queryset(self):
+        params = ResumeSearchSerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        self.search_term = params.validated_data['q']
+        return search_resumes(filter_leads(super().get_queryset(), params.validated_data), self.search_term)
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.get_queryset())
+        # Snippets are expensive, so only build them for the rows being returned
+        self.headlines = resume_headlines(page, self.search_term)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['headlines'] = getattr(self, 'headlines', {})
+        return context
 
 class LeadDetailView(generics.RetrieveAPIView):
+    """Lead details with ETag/Last-Modified validators derived from updated_at"""
     queryset = Lead.objects.all()
     serializer_class = LeadListSerializer
     permission_classes = [IsAuthenticated]
 
+    def retrieve(self, request, *args, **kwargs):
+        updated_at = get_lead_updated_at(self.kwargs['pk'])
+        etag, last_modified = get_lead_validators(self.kwargs['pk'], updated_at)
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is not None:
+            return set_validator_headers(response, etag, last_modified)
+
+        # The version is part of the key, so saves need no explicit invalidation
+        key = cache_key('detail', etag, request.build_absolute_uri())
+        data = cache.get(key)
+        if data is None:
+            instance = self.get_object()
+            data = self.get_serializer(instance).data
+            if instance.updated_at == updated_at:
+                cache.set(key, data, settings.LEAD_CACHE_TIMEOUT)
+            else:
+                # Saved since the validators were read; describe what is returned
+                etag, last_modified = get_lead_validators(instance.pk, instance.updated_at)
+        return set_validator_headers(Response(data), etag, last_modified)
+
+class LeadResumeView(generics.GenericAPIView):
+    """Download a lead's resume, offloading the bytes to the front proxy when configured"""
+    queryset = Lead.objects.select_related('resume_blob').only(
+        'id', 'resume', 'resume_blob__sha256', 'resume_blob__created_at'
+    )
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request, *args, **kwargs):
+        lead = self.get_object()
+        if not lead.resume:
+            raise Http404
+        return serve_resume(request._request, lead)
+
+class LeadResumeAnalysisView(generics.RetrieveAPIView):
+    """Text, page count and metadata extracted from a lead's resume"""
+    queryset = ResumeAnalysis.objects.all()
+    serializer_class = ResumeAnalysisSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_object(self):
+        return get_object_or_404(self.get_queryset(), blob__leads__pk=self.kwargs['pk'])
+
+class LeadResumeThumbnailView(LeadResumeAnalysisView):
+    """First-page thumbnail of a lead's resume as PNG"""
+
+    def get(self, request, *args, **kwargs):
+        analysis = self.get_object()
+        if not analysis.thumbnail:
+            raise Http404
+        response = FileResponse(analysis.thumbnail.open('rb'), content_type='image/png')
+        response['Cache-Control'] = 'private, max-age=3600'
+        return response
+
 class LeadUpdateView(generics.UpdateAPIView):
+    """Update a lead; If-Match / If-Unmodified-Since make the update conditional"""
     queryset = Lead.objects.all()
     serializer_class = LeadUpdateSerializer
     permission_classes = [IsAuthenticated]
     
     def update(self, request, *args, **kwargs):
         partial = kwargs.pop('partial', False)
-        instance = self.get_object()
-        serializer = self.get_serializer(instance, data=request.data, partial=partial)
-        serializer.is_valid(raise_exception=True)
-        self.perform_update(serializer)
+        with transaction.atomic():
+            # Locking the row makes the precondition check and the save atomic
+            updated_at = get_lead_updated_at(self.kwargs['pk'], lock=True)
+            etag, last_modified = get_lead_validators(self.kwargs['pk'], updated_at)
+            precondition = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if precondition is not None:
+                return set_validator_headers(precondition, etag, last_modified)
+
+            instance = self.get_object()
+            serializer = self.get_serializer(instance, data=request.data, partial=partial)
+            serializer.is_valid(raise_exception=True)
+            self.perform_update(serializer)
         
-        return Response(
-            LeadListSerializer(instance, context={'request': request}).data
+        etag, last_modified = get_lead_validators(instance.pk, instance.updated_at)
+        return set_validator_headers(
+            Response(LeadListSerializer(instance, context={'request': request}).data),
+            etag,
+            last_modified
         )
+
+class LeadBulkUpdateView(APIView):
+    """Change the status of many leads, selected by ids or by filter, in one UPDATE"""
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request, *args, **kwargs):
+        serializer = LeadBulkUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        
+        if 'ids' in data:
+            queryset = Lead.objects.filter(id__in=data['ids'])
+        else:
+            queryset = filter_leads(Lead.objects.all(), data['filter'])
+        
+        updated_ids = bulk_update_status(queryset, data['status'])
+        
+        response = {'status': data['status'], 'updated': len(updated_ids), 'ids': updated_ids}
+        if 'ids' in data:
+            updated = set(updated_ids)
+            response['skipped_ids'] = sorted(set(data['ids']) - updated)
+        return Response(response)
+
+class LeadExportView(APIView):
+    """Stream all matching leads as CSV or NDJSON in constant memory"""
+    permission_classes = [IsAuthenticated]
+    formats = {
+        'csv': (stream_csv, 'text/csv'),
+        'ndjson': (stream_ndjson, 'application/x-ndjson'),
+    }
+    
+    def get(self, request, *args, **kwargs):
+        export_format = request.query_params.get('export_format', 'csv')
+        if export_format not in self.formats:
+            raise ValidationError({'export_format': f"Must be one of: {', '.join(self.formats)}."})
+        
+        filters = LeadFilterSerializer(data=request.query_params)
+        filters.is_valid(raise_exception=True)
+        queryset = filter_leads(Lead.objects.all(), filters.validated_data)
+        
+        stream, content_type = self.formats[export_format]
+        rows = iter_export_rows(queryset, settings.LEAD_EXPORT_CHUNK_SIZE)
+        response = StreamingHttpResponse(stream(rows), content_type=content_type)
+        filename = f"leads-{timezone.now():%Y%m%d-%H%M%S}.{export_format}"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+class LeadEventTicketView(APIView):
+    """Issue a short-lived ticket for opening the event stream with EventSource"""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        return Response({
+            'ticket': sign_stream_ticket(request.user),
+            'expires_in': settings.LEAD_EVENTS_TICKET_SECONDS
+        }, status=status.HTTP_201_CREATED)
@@ -0,0 +1,38 @@
+"""
+PostgreSQL backend that borrows connections from a per-process pool.
+
+Use with CONN_MAX_AGE = 0: Django then "closes" the connection at the end
+of every request, which returns it to the pool instead of disconnecting.
+Pool settings live in OPTIONS['pool'] (max_size, timeout, max_lifetime,
+check_after).
+"""
+from django.db.backends.postgresql import base
+
+from .creation import DatabaseCreation
+from .pool import get_pool
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+    pool = None
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop('pool', None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        options = self.settings_dict['OPTIONS']
+        key = tuple(conn_params.get(name) for name in ('dbname', 'host', 'port', 'user'))
+        self.pool = get_pool((self.alias, key), **options.get('pool', {}))
+        connection = self.pool.acquire(lambda: super(DatabaseWrapper, self).get_new_connection(conn_params))
+        # Normally set while connecting; reused connections skip that step
+        self.isolation_level = base.IsolationLevel(
+            options.get('isolation_level', base.IsolationLevel.READ_COMMITTED)
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.pool.release(self.connection)
@@ -0,0 +1,136 @@
+"""
+A thread-safe, per-process pool of psycopg2 connections.
+
+Connections are handed out LIFO, so a few warm connections serve most
+requests and the rest age out. A connection that has sat idle for longer
+than ``check_after`` seconds is pinged before it is reused.
+"""
+import os
+import threading
+import time
+
+import psycopg2
+import psycopg2.extensions
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class ConnectionPool:
+    def __init__(self, max_size=10, timeout=10, max_lifetime=1800, check_after=30):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.check_after = check_after
+        self.idle = []
+        self.created = {}
+        self.size = 0
+        self.closed = False
+        self.condition = threading.Condition()
+
+    def acquire(self, connect):
+        """Return an idle connection, one made by ``connect()``, or wait for one to be released"""
+        deadline = time.monotonic() + self.timeout
+        while True:
+            with self.condition:
+                while not self.idle and self.size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise psycopg2.OperationalError(
+                            f"Timed out after {self.timeout}s waiting for one of {self.max_size} pooled connections"
+                        )
+                    self.condition.wait(remaining)
+                if self.idle:
+                    connection, released_at = self.idle.pop()
+                else:
+                    self.size += 1
+                    connection = None
+
+            if connection is None:
+                try:
+                    connection = connect()
+                except Exception:
+                    self.discard(None)
+                    raise
+                self.created[connection] = time.monotonic()
+                return connection
+            if time.monotonic() - released_at < self.check_after or self.is_usable(connection):
+                return connection
+            self.discard(connection)
+
+    def release(self, connection):
+        """Take a connection back, rolling back anything left open and discarding session state"""
+        expired = time.monotonic() - self.created.get(connection, 0) > self.max_lifetime
+        if self.closed or expired or not self.reset(connection):
+            self.discard(connection)
+            return
+        with self.condition:
+            self.idle.append((connection, time.monotonic()))
+            self.condition.notify()
+
+    def discard(self, connection):
+        if connection is not None:
+            self.created.pop(connection, None)
+            if not connection.closed:
+                connection.close()
+        with self.condition:
+            self.size -= 1
+            self.condition.notify()
+
+    def reset(self, connection):
+        if connection.closed:
+            return False
+        status = connection.info.transaction_status
+        if status == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN:
+            return False
+        try:
+            if status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                connection.rollback()
+            # SET values, advisory locks, temp tables, prepared statements and
+            # LISTENs belong to the session, so they would reach the next borrower
+            autocommit = connection.autocommit
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute('DISCARD ALL')
+            connection.autocommit = autocommit
+        except psycopg2.Error:
+            return False
+        return True
+
+    def is_usable(self, connection):
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+        except psycopg2.Error:
+            return False
+        return True
+
+    def close(self):
+        """Close idle connections now and checked-out ones when they are released"""
+        with self.condition:
+            self.closed = True
+            idle, self.idle = self.idle, []
+        for connection, _ in idle:
+            self.discard(connection)
+
+
+def get_pool(key, **options):
+    """The pool for ``key`` in this process.
+
+    Keyed by process id as well: a forked worker must not reuse connections
+    opened by its parent.
+    """
+    key = (os.getpid(), key)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool.closed:
+            pool = _pools[key] = ConnectionPool(**options)
+        return pool
+
+
+def close_pools(dbname):
+    """Close this process's pools for a database, so it can be dropped"""
+    with _pools_lock:
+        pools = [pool for (pid, (alias, key)), pool in _pools.items() if pid == os.getpid() and key[0] == dbname]
+    for pool in pools:
+        pool.close()
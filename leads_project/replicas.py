@@ -0,0 +1,194 @@
+"""
+Read-replica routing.
+
+Reads of lead and user data made by safe (GET/HEAD/OPTIONS) requests go
+to a healthy replica; everything else uses the primary:
+- writes, and reads inside a transaction on the primary
+- every query of an unsafe request
+- requests from a client that wrote within the last DB_REPLICA_PIN_SECONDS,
+  so attorneys read their own changes. The pin travels in a signed cookie,
+  so it holds whichever worker or server handles the next request
+- queries outside a request (workers, management commands)
+
+Replicas lagging more than DB_REPLICA_MAX_LAG_SECONDS or failing their
+health check are skipped until a later check passes.
+"""
+from contextvars import ContextVar
+from dataclasses import dataclass
+import logging
+import random
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+# App labels whose reads may be served by a replica. Token blacklist
+# checks and sessions always read the primary.
+REPLICA_APP_LABELS = {'leads', 'auth'}
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+PIN_COOKIE = 'replica_pin'
+PIN_SALT = 'leads_project.replicas.pin'
+
+LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+
+@dataclass
+class RoutingState:
+    primary: bool = False
+    replica: str = None
+    wrote: bool = False
+
+
+current_routing = ContextVar('replica_routing', default=None)
+
+
+class ReplicaMonitor:
+    """Caches each replica's health for DB_REPLICA_CHECK_INTERVAL seconds"""
+
+    def __init__(self):
+        self.status = {}
+        self.lock = threading.Lock()
+
+    def is_available(self, alias):
+        available, checked_at = self.status.get(alias, (False, None))
+        if checked_at is not None and time.monotonic() - checked_at < settings.DB_REPLICA_CHECK_INTERVAL:
+            return available
+        # One thread refreshes the status; the others keep using the old one
+        if not self.lock.acquire(blocking=False):
+            return available
+        try:
+            available = self.check(alias)
+            self.status[alias] = (available, time.monotonic())
+        finally:
+            self.lock.release()
+        return available
+
+    def check(self, alias):
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute(LAG_SQL)
+                lag = float(cursor.fetchone()[0])
+        except DatabaseError as exc:
+            logger.warning("Replica %s is unavailable, reading from the primary: %s", alias, exc)
+            connections[alias].close()
+            return False
+        if lag > settings.DB_REPLICA_MAX_LAG_SECONDS:
+            logger.warning("Replica %s is %.1fs behind, reading from the primary", alias, lag)
+            return False
+        return True
+
+    def reset(self):
+        self.status.clear()
+
+
+monitor = ReplicaMonitor()
+
+
+def served_by_replica():
+    """Whether the current request has read from a replica"""
+    state = current_routing.get()
+    return state is not None and state.replica is not None
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = current_routing.get()
+        if state is None or state.primary or model._meta.app_label not in REPLICA_APP_LABELS:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        if state.replica is None or not monitor.is_available(state.replica):
+            # Stick to one replica per request so its reads are consistent
+            replicas = [alias for alias in settings.DATABASE_REPLICAS if monitor.is_available(alias)]
+            if not replicas:
+                state.replica = None
+                return DEFAULT_DB_ALIAS
+            state.replica = random.choice(replicas)
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = current_routing.get()
+        if state is not None:
+            state.wrote = True
+            state.primary = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+def is_pinned(request):
+    """Whether the client wrote within DB_REPLICA_PIN_SECONDS, per its signed pin cookie"""
+    pin = request.get_signed_cookie(
+        PIN_COOKIE, default=None, salt=PIN_SALT, max_age=settings.DB_REPLICA_PIN_SECONDS
+    )
+    return pin is not None
+
+
+def set_pin(request, response):
+    response.set_signed_cookie(
+        PIN_COOKIE,
+        '1',
+        salt=PIN_SALT,
+        max_age=settings.DB_REPLICA_PIN_SECONDS,
+        secure=request.is_secure(),
+        httponly=True,
+        samesite='Lax'
+    )
+
+
+class ReplicaRoutingMiddleware:
+    """Decide per request whether reads may use a replica, and pin writers to the primary"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+        state, token = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_routing.reset(token)
+        return self.finish(request, response, state)
+
+    async def __acall__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return await self.get_response(request)
+        state, token = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_routing.reset(token)
+        return self.finish(request, response, state)
+
+    def start(self, request):
+        primary = request.method not in SAFE_METHODS or is_pinned(request)
+        state = RoutingState(primary=primary)
+        return state, current_routing.set(state)
+
+    def finish(self, request, response, state):
+        wrote = state.wrote or (request.method not in SAFE_METHODS and response.status_code < 400)
+        if wrote:
+            set_pin(request, response)
+        return response
@@ -18,15 +18,20 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework_simplejwt',
     'rest_framework_simplejwt.token_blacklist',
     'corsheaders',
     'leads',
     'authentication',
+    'benchmarks',
+    'instrumentation',
 ]
 
 MIDDLEWARE = [
+    'instrumentation.middleware.InstrumentationMiddleware',
+    'leads_project.replicas.ReplicaRoutingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -56,18 +61,62 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'leads_project.wsgi.application'
+ASGI_APPLICATION = 'leads_project.asgi.application'
+
+# Without DB_POOL each thread keeps its connection open for DB_CONN_MAX_AGE
+# seconds. With DB_POOL, requests borrow connections from a per-process pool
+# and hand them back when they finish (the asgi service in docker-compose.yml
+# enables it, since async requests do not run on long-lived threads).
+DB_POOL = config('DB_POOL', default=False, cast=bool)
+DB_POOL_MAX_SIZE = config('DB_POOL_MAX_SIZE', default=10, cast=int)
+DB_POOL_TIMEOUT = config('DB_POOL_TIMEOUT', default=10, cast=int)
+DB_POOL_MAX_LIFETIME = config('DB_POOL_MAX_LIFETIME', default=1800, cast=int)
+DB_POOL_CHECK_AFTER = config('DB_POOL_CHECK_AFTER', default=30, cast=int)
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'leads_project.db_pool' if DB_POOL else 'django.db.backends.postgresql',
         'NAME': config('DB_NAME'),
         'USER': config('DB_USER'),
         'PASSWORD': config('DB_PASSWORD'),
         'HOST': config('DB_HOST'),
         'PORT': config('DB_PORT'),
+        'CONN_MAX_AGE': 0 if DB_POOL else config('DB_CONN_MAX_AGE', default=60, cast=int),
+        'CONN_HEALTH_CHECKS': config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
+        'OPTIONS': {
+            'pool': {
+                'max_size': DB_POOL_MAX_SIZE,
+                'timeout': DB_POOL_TIMEOUT,
+                'max_lifetime': DB_POOL_MAX_LIFETIME,
+                'check_after': DB_POOL_CHECK_AFTER,
+            },
+        } if DB_POOL else {},
     }
 }
 
+# Read replicas: comma-separated host[:port] list. Replicas share the
+# primary's name and credentials; safe requests read leads and users from
+# them (see leads_project.replicas). Tests point them at the test database.
+DB_REPLICA_HOSTS = config('DB_REPLICA_HOSTS', default='', cast=lambda v: [h.strip() for h in v.split(',') if h.strip()])
+DB_REPLICA_CONNECT_TIMEOUT = config('DB_REPLICA_CONNECT_TIMEOUT', default=2, cast=int)
+DB_REPLICA_MAX_LAG_SECONDS = config('DB_REPLICA_MAX_LAG_SECONDS', default=5, cast=float)
+DB_REPLICA_CHECK_INTERVAL = config('DB_REPLICA_CHECK_INTERVAL', default=5, cast=int)
+DB_REPLICA_PIN_SECONDS = config('DB_REPLICA_PIN_SECONDS', default=10, cast=int)
+
+DATABASE_REPLICAS = []
+for number, replica_host in enumerate(DB_REPLICA_HOSTS, start=1):
+    replica_hostname, _, replica_port = replica_host.partition(':')
+    DATABASES[f'replica{number}'] = {
+        **DATABASES['default'],
+        'HOST': replica_hostname,
+        'PORT': replica_port or DATABASES['default']['PORT'],
+        'OPTIONS': {**DATABASES['default']['OPTIONS'], 'connect_timeout': DB_REPLICA_CONNECT_TIMEOUT},
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{number}')
+
+DATABASE_ROUTERS = ['leads_project.replicas.ReplicaRouter']
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -97,7 +146,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'authentication.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -107,8 +156,11 @@ REST_FRAMEWORK = {
         'rest_framework.throttling.UserRateThrottle'
     ],
     'DEFAULT_THROTTLE_RATES': {
-        'anon': '10/min',
-        'user': '100/min'
+        'anon': config('THROTTLE_ANON_RATE', default='10/min'),
+        'user': config('THROTTLE_USER_RATE', default='100/min'),
+        # Public lead intake (utils.throttling), per client address and per submitted email
+        'intake_ip': config('THROTTLE_INTAKE_IP_RATE', default='10/min'),
+        'intake_email': config('THROTTLE_INTAKE_EMAIL_RATE', default='3/hour'),
     }
 }
 
@@ -126,6 +178,7 @@ SIMPLE_JWT = {
     'USER_ID_CLAIM': 'user_id',
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
     'TOKEN_TYPE_CLAIM': 'token_type',
+    'TOKEN_REFRESH_SERIALIZER': 'authentication.serializers.TokenRefreshSerializer',
 }
 
 # CORS Settings
@@ -134,12 +187,119 @@ CORS_ALLOWED_ORIGINS = [
     "http://127.0.0.1:3000",
 ]
 
+# Cache (per-process local memory by default; set REDIS_URL to share it between workers)
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+# Seconds a cached lead list/detail response is kept
+LEAD_CACHE_TIMEOUT = config('LEAD_CACHE_TIMEOUT', default=60, cast=int)
+# Seconds the user behind a JWT is cached (0: look it up on every request).
+# Saves only invalidate the cache of the saving process, so without a shared
+# cache a deactivated user stays cached in the other processes for this long
+AUTH_USER_CACHE_TIMEOUT = config('AUTH_USER_CACHE_TIMEOUT', default=300 if REDIS_URL else 30, cast=int)
+
+# Lead intake: a submission repeating the email of a lead created in the
+# last LEAD_DUPLICATE_WINDOW_SECONDS is acknowledged but not stored again
+# (0: always create),
+# and Idempotency-Key responses are replayed for IDEMPOTENCY_KEY_TTL_HOURS
+LEAD_DUPLICATE_WINDOW_SECONDS = config('LEAD_DUPLICATE_WINDOW_SECONDS', default=600, cast=int)
+IDEMPOTENCY_KEY_TTL_HOURS = config('IDEMPOTENCY_KEY_TTL_HOURS', default=24, cast=int)
+
+# Real-time lead events: 'postgres' (LISTEN/NOTIFY, shared by all processes) or 'local' (one process)
+LEAD_EVENTS_BACKEND = config('LEAD_EVENTS_BACKEND', default='postgres')
+LEAD_EVENTS_HEARTBEAT_SECONDS = config('LEAD_EVENTS_HEARTBEAT_SECONDS', default=15, cast=int)
+LEAD_EVENTS_MAX_STREAM_SECONDS = config('LEAD_EVENTS_MAX_STREAM_SECONDS', default=300, cast=int)
+LEAD_EVENTS_RETRY_MILLISECONDS = config('LEAD_EVENTS_RETRY_MILLISECONDS', default=3000, cast=int)
+LEAD_EVENTS_QUEUE_SIZE = config('LEAD_EVENTS_QUEUE_SIZE', default=100, cast=int)
+# Lifetime of the ?ticket= that EventSource clients open the stream with
+LEAD_EVENTS_TICKET_SECONDS = config('LEAD_EVENTS_TICKET_SECONDS', default=30, cast=int)
+
 # Email Settings
 MAILJET_API_KEY = config('MAILJET_API_KEY', default='')
 MAILJET_SECRET_KEY = config('MAILJET_SECRET_KEY', default='')
 MAILJET_FROM_EMAIL = config('MAILJET_FROM_EMAIL', default='noreply@example.com')
 ATTORNEY_EMAIL = config('ATTORNEY_EMAIL', default='attorney@example.com')
+ATTORNEY_EMAILS = config('ATTORNEY_EMAILS', default=ATTORNEY_EMAIL).split(',')
+EMAIL_TRANSPORT = config('EMAIL_TRANSPORT', default='leads.services.MailjetTransport')
+MAILJET_BATCH_SIZE = config('MAILJET_BATCH_SIZE', default=50, cast=int)
+MAILJET_POOL_SIZE = config('MAILJET_POOL_SIZE', default=10, cast=int)
+MAILJET_TIMEOUT = config('MAILJET_TIMEOUT', default=30, cast=int)
+
+# Email Outbox
+EMAIL_OUTBOX_BATCH_SIZE = config('EMAIL_OUTBOX_BATCH_SIZE', default=50, cast=int)
+EMAIL_OUTBOX_MAX_ATTEMPTS = config('EMAIL_OUTBOX_MAX_ATTEMPTS', default=8, cast=int)
+EMAIL_OUTBOX_RETRY_BASE_SECONDS = config('EMAIL_OUTBOX_RETRY_BASE_SECONDS', default=30, cast=int)
+EMAIL_OUTBOX_RETRY_MAX_SECONDS = config('EMAIL_OUTBOX_RETRY_MAX_SECONDS', default=3600, cast=int)
+
+# Attorney Digests (IMMEDIATE or DIGEST; overridable per recipient in the admin)
+ATTORNEY_NOTIFICATION_MODE = config('ATTORNEY_NOTIFICATION_MODE', default='IMMEDIATE')
+ATTORNEY_DIGEST_WINDOW_MINUTES = config('ATTORNEY_DIGEST_WINDOW_MINUTES', default=15, cast=int)
+
+# Lead Export and Bulk Updates
+LEAD_EXPORT_CHUNK_SIZE = config('LEAD_EXPORT_CHUNK_SIZE', default=2000, cast=int)
+LEAD_BULK_UPDATE_MAX_IDS = config('LEAD_BULK_UPDATE_MAX_IDS', default=1000, cast=int)
 
 # File Upload Settings
 FILE_UPLOAD_MAX_MEMORY_SIZE = 5242880  # 5MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 5242880  # 5MB
+# Hash uploads while they stream in so resumes can be stored by content
+FILE_UPLOAD_HANDLERS = [
+    'leads.uploadhandlers.HashingMemoryFileUploadHandler',
+    'leads.uploadhandlers.HashingTemporaryFileUploadHandler',
+]
+
+# Direct-to-storage resume uploads (leads.uploads.FileSystemUploadBackend or S3UploadBackend)
+RESUME_UPLOAD_BACKEND = config('RESUME_UPLOAD_BACKEND', default='leads.uploads.FileSystemUploadBackend')
+RESUME_UPLOAD_EXPIRY_SECONDS = config('RESUME_UPLOAD_EXPIRY_SECONDS', default=900, cast=int)
+RESUME_UPLOAD_S3_BUCKET = config('RESUME_UPLOAD_S3_BUCKET', default='')
+RESUME_UPLOAD_S3_ENDPOINT_URL = config('RESUME_UPLOAD_S3_ENDPOINT_URL', default='')
+RESUME_UPLOAD_S3_REGION = config('RESUME_UPLOAD_S3_REGION', default='')
+
+# Resume processing (text extraction and thumbnails, see process_resumes)
+RESUME_PROCESSING_WORKERS = config('RESUME_PROCESSING_WORKERS', default=2, cast=int)
+RESUME_PROCESSING_BATCH_SIZE = config('RESUME_PROCESSING_BATCH_SIZE', default=10, cast=int)
+RESUME_PROCESSING_TIMEOUT = config('RESUME_PROCESSING_TIMEOUT', default=60, cast=int)
+
+# Resume downloads: '' (Django streams the file), 'x-accel-redirect' (nginx) or 'x-sendfile'
+RESUME_DOWNLOAD_ACCEL = config('RESUME_DOWNLOAD_ACCEL', default='')
+RESUME_ACCEL_REDIRECT_PREFIX = config('RESUME_ACCEL_REDIRECT_PREFIX', default='/protected-media/')
+
+# Instrumentation (Server-Timing headers, request logs and /metrics)
+SERVER_TIMING_ENABLED = config('SERVER_TIMING_ENABLED', default=True, cast=bool)
+# Requests at least this slow are logged as warnings
+SLOW_REQUEST_MS = config('SLOW_REQUEST_MS', default=1000, cast=int)
+# When set, /metrics requires "Authorization: Bearer <METRICS_TOKEN>"
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
+# Logging: 'text' or 'json' (one object per line, request metrics as fields)
+LOG_LEVEL = config('LOG_LEVEL', default='INFO')
+LOG_FORMAT = config('LOG_FORMAT', default='text')
+# INFO logs every request with its metrics; WARNING only slow requests
+REQUEST_LOG_LEVEL = config('REQUEST_LOG_LEVEL', default='WARNING')
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'text': {'format': '%(asctime)s %(levelname)s %(name)s %(message)s'},
+        'json': {'()': 'instrumentation.formatters.JsonFormatter'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': LOG_FORMAT},
+    },
+    'loggers': {
+        'leads': {'handlers': ['console'], 'level': LOG_LEVEL, 'propagate': False},
+        'authentication': {'handlers': ['console'], 'level': LOG_LEVEL, 'propagate': False},
+        'instrumentation': {'handlers': ['console'], 'level': REQUEST_LOG_LEVEL, 'propagate': False},
+    },
+}
@@ -0,0 +1,114 @@
+import psycopg2
+import psycopg2.extensions
+from django.db import connection
+from django.test import TransactionTestCase
+
+from leads_project.db_pool.base import DatabaseWrapper
+from leads_project.db_pool.pool import ConnectionPool, close_pools
+
+
+class ConnectionPoolTest(TransactionTestCase):
+    def setUp(self):
+        self.params = connection.get_connection_params()
+        self.pool = ConnectionPool(max_size=2, timeout=0.2, check_after=30)
+
+    def tearDown(self):
+        self.pool.close()
+
+    def connect(self):
+        return psycopg2.connect(**self.params)
+
+    def test_released_connections_are_reused(self):
+        first = self.pool.acquire(self.connect)
+        self.pool.release(first)
+
+        self.assertIs(self.pool.acquire(self.connect), first)
+        self.assertEqual(self.pool.size, 1)
+
+    def test_release_rolls_back_open_transaction(self):
+        """Test that a connection never goes back to the pool mid-transaction"""
+        conn = self.pool.acquire(self.connect)
+        with conn.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        self.assertEqual(conn.info.transaction_status, psycopg2.extensions.TRANSACTION_STATUS_INTRANS)
+
+        self.pool.release(conn)
+        self.assertEqual(conn.info.transaction_status, psycopg2.extensions.TRANSACTION_STATUS_IDLE)
+
+    def test_release_discards_session_state(self):
+        """Test that settings, advisory locks and temp tables do not reach the next borrower"""
+        conn = self.pool.acquire(self.connect)
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            cursor.execute("SET statement_timeout = '1234ms'")
+            cursor.execute('SELECT pg_advisory_lock(42)')
+            cursor.execute('CREATE TEMP TABLE leaked (id int)')
+        self.pool.release(conn)
+
+        again = self.pool.acquire(self.connect)
+        self.assertIs(again, conn)
+        with again.cursor() as cursor:
+            cursor.execute('SHOW statement_timeout')
+            self.assertNotEqual(cursor.fetchone()[0], '1234ms')
+            cursor.execute(
+                "SELECT count(*) FROM pg_locks WHERE locktype = 'advisory' AND pid = pg_backend_pid()"
+            )
+            self.assertEqual(cursor.fetchone()[0], 0)
+            cursor.execute("SELECT to_regclass('pg_temp.leaked')")
+            self.assertIsNone(cursor.fetchone()[0])
+
+    def test_closed_connection_is_discarded(self):
+        conn = self.pool.acquire(self.connect)
+        conn.close()
+        self.pool.release(conn)
+
+        self.assertEqual(self.pool.size, 0)
+        self.assertIsNot(self.pool.acquire(self.connect), conn)
+
+    def test_waits_then_times_out_when_exhausted(self):
+        self.pool.acquire(self.connect)
+        self.pool.acquire(self.connect)
+        with self.assertRaises(psycopg2.OperationalError):
+            self.pool.acquire(self.connect)
+
+    def test_stale_idle_connection_is_replaced(self):
+        """Test that idle connections are pinged and replaced when the server dropped them"""
+        self.pool.check_after = 0
+        conn = self.pool.acquire(self.connect)
+        pid = conn.info.backend_pid
+        self.pool.release(conn)
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_terminate_backend(%s)', [pid])
+
+        replacement = self.pool.acquire(self.connect)
+        self.assertIsNot(replacement, conn)
+        self.assertEqual(self.pool.size, 1)
+
+
+class PooledBackendTest(TransactionTestCase):
+    def tearDown(self):
+        close_pools(connection.settings_dict['NAME'])
+
+    def make_wrapper(self):
+        settings_dict = {
+            **connection.settings_dict,
+            'ENGINE': 'leads_project.db_pool',
+            'CONN_MAX_AGE': 0,
+            'OPTIONS': {'pool': {'max_size': 2}},
+        }
+        return DatabaseWrapper(settings_dict)
+
+    def test_close_returns_connection_to_pool(self):
+        """Test that Django's end-of-request close hands the connection to the next request"""
+        first = self.make_wrapper()
+        with first.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        raw = first.connection
+        first.close()
+
+        second = self.make_wrapper()
+        with second.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        self.assertIs(second.connection, raw)
+        self.assertFalse(raw.closed)
+        second.close()
@@ -0,0 +1,130 @@
+from unittest import mock
+
+from django.db import connection, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, TransactionTestCase, override_settings
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+from leads.models import Lead
+from leads_project.replicas import (
+    PIN_COOKIE, ReplicaMonitor, ReplicaRouter, ReplicaRoutingMiddleware, RoutingState, current_routing, monitor
+)
+
+
+@override_settings(DATABASE_REPLICAS=['replica1', 'replica2'])
+class ReplicaRouterTest(TransactionTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+        patcher = mock.patch.object(monitor, 'is_available', return_value=True)
+        self.is_available = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def route(self, state, model=Lead):
+        token = current_routing.set(state)
+        try:
+            return self.router.db_for_read(model)
+        finally:
+            current_routing.reset(token)
+
+    def test_outside_requests_reads_use_primary(self):
+        self.assertEqual(self.router.db_for_read(Lead), 'default')
+
+    def test_safe_request_sticks_to_one_replica(self):
+        state = RoutingState()
+        replica = self.route(state)
+
+        self.assertIn(replica, ['replica1', 'replica2'])
+        self.assertEqual([self.route(state) for _ in range(5)], [replica] * 5)
+
+    def test_primary_state_and_other_apps_use_primary(self):
+        self.assertEqual(self.route(RoutingState(primary=True)), 'default')
+        self.assertEqual(self.route(RoutingState(), model=OutstandingToken), 'default')
+
+    def test_reads_inside_transaction_use_primary(self):
+        with transaction.atomic():
+            self.assertEqual(self.route(RoutingState()), 'default')
+
+    def test_write_pins_rest_of_request_to_primary(self):
+        state = RoutingState()
+        token = current_routing.set(state)
+        try:
+            self.assertEqual(self.router.db_for_write(Lead), 'default')
+            self.assertEqual(self.router.db_for_read(Lead), 'default')
+        finally:
+            current_routing.reset(token)
+        self.assertTrue(state.wrote)
+
+    def test_falls_back_to_primary_without_healthy_replica(self):
+        self.is_available.side_effect = lambda alias: alias == 'replica2'
+        self.assertEqual(self.route(RoutingState()), 'replica2')
+
+        self.is_available.side_effect = None
+        self.is_available.return_value = False
+        self.assertEqual(self.route(RoutingState()), 'default')
+
+
+@override_settings(DB_REPLICA_CHECK_INTERVAL=60, DB_REPLICA_MAX_LAG_SECONDS=5)
+class ReplicaMonitorTest(TransactionTestCase):
+    def test_check_measures_lag(self):
+        """Test the lag query on a server that is not in recovery"""
+        self.assertTrue(ReplicaMonitor().check('default'))
+
+    def test_lagging_replica_is_unavailable(self):
+        with mock.patch('leads_project.replicas.LAG_SQL', 'SELECT 30'):
+            self.assertFalse(ReplicaMonitor().check('default'))
+
+    def test_unreachable_replica_is_unavailable(self):
+        with mock.patch('leads_project.replicas.LAG_SQL', 'SELECT * FROM missing_table'):
+            self.assertFalse(ReplicaMonitor().check('default'))
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+
+    def test_status_is_cached_between_checks(self):
+        replicas = ReplicaMonitor()
+        with mock.patch.object(replicas, 'check', return_value=True) as check:
+            self.assertTrue(replicas.is_available('replica1'))
+            self.assertTrue(replicas.is_available('replica1'))
+        self.assertEqual(check.call_count, 1)
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'], DB_REPLICA_PIN_SECONDS=10)
+class ReplicaRoutingMiddlewareTest(TransactionTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.states = []
+
+    def call(self, method, status=200, cookies=None):
+        def get_response(request):
+            self.states.append(current_routing.get())
+            return HttpResponse(status=status)
+
+        request = getattr(self.factory, method)('/api/leads/')
+        request.COOKIES.update(cookies or {})
+        self.response = ReplicaRoutingMiddleware(get_response)(request)
+        return self.states[-1]
+
+    def test_safe_requests_may_use_replicas(self):
+        self.assertFalse(self.call('get').primary)
+        self.assertTrue(self.call('post', status=400).primary)
+        self.assertIsNone(current_routing.get())
+
+    def test_client_reads_own_writes(self):
+        """Test that a client that updated a lead reads from the primary for a while"""
+        self.call('patch')
+        pin = self.response.cookies[PIN_COOKIE]
+        self.assertEqual(pin['max-age'], 10)
+        self.assertTrue(pin['httponly'])
+
+        self.assertTrue(self.call('get', cookies={PIN_COOKIE: pin.value}).primary)
+        self.assertFalse(self.call('get').primary)
+
+    def test_forged_pin_is_ignored(self):
+        self.assertFalse(self.call('get', cookies={PIN_COOKIE: '1'}).primary)
+
+    def test_failed_write_does_not_pin(self):
+        self.call('patch', status=400)
+        self.assertNotIn(PIN_COOKIE, self.response.cookies)
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_inactive_without_replicas(self):
+        self.assertIsNone(self.call('get'))
@@ -0,0 +1,104 @@
+from functools import lru_cache
+import hashlib
+
+from django.conf import settings
+import redis
+from rest_framework.throttling import SimpleRateThrottle
+
+
+@lru_cache(maxsize=None)
+def redis_client(url):
+    """Process-wide client (and connection pool) for a Redis URL"""
+    return redis.Redis.from_url(url)
+
+
+class SlidingWindowRateThrottle(SimpleRateThrottle):
+    """
+    Sliding window counter throttle.
+
+    DRF's SimpleRateThrottle keeps a list of request timestamps per client
+    and rewrites it on every request, which is neither atomic nor small.
+    Here each client has one counter per fixed window, and the rate is
+    estimated from the current and previous window, the previous one
+    weighted by how much of it still overlaps the sliding window.
+
+    With REDIS_URL set, the counters live in Redis and are shared by every
+    worker and server: incrementing the current window and reading the
+    previous one is a single MULTI/EXEC round trip. Without it they fall
+    back to the Django cache, which only counts within one process.
+    """
+
+    def get_cache_key(self, request, view):
+        raise NotImplementedError('.get_cache_key() must be overridden')
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        now = self.timer()
+        window = int(now // self.duration)
+        previous, current = self.count(window)
+
+        overlap = 1 - (now - window * self.duration) / self.duration
+        if previous * overlap + current <= self.num_requests:
+            return True
+        self.wait_seconds = self.get_wait(now, window, previous, current)
+        return False
+
+    def count(self, window):
+        """Count this request and return the (previous, current) window counts"""
+        current_key = f'{self.key}:{window}'
+        previous_key = f'{self.key}:{window - 1}'
+        if settings.REDIS_URL:
+            pipeline = redis_client(settings.REDIS_URL).pipeline()
+            # Kept for two windows, while it is the current or previous one
+            pipeline.incr(current_key).expire(current_key, self.duration * 2).get(previous_key)
+            current, _, previous = pipeline.execute()
+            return int(previous or 0), current
+        return self.cache.get(previous_key, 0), self.increment(current_key)
+
+    def increment(self, key):
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            # Kept for two windows, while it is the current or previous one
+            self.cache.add(key, 0, self.duration * 2)
+            return self.cache.incr(key)
+
+    def get_wait(self, now, window, previous, current):
+        """Seconds until the weighted count falls back to the limit"""
+        window_end = (window + 1) * self.duration
+        if current < self.num_requests:
+            # The previous window's weight shrinks linearly until window_end
+            return window_end - now - self.duration * (self.num_requests - current) / previous
+        # Once this window becomes the previous one, its weight has to shrink
+        # enough to make room for one more request
+        return window_end - now + self.duration * (1 - (self.num_requests - 1) / current)
+
+    def wait(self):
+        return getattr(self, 'wait_seconds', None)
+
+
+class IntakeIPThrottle(SlidingWindowRateThrottle):
+    """Limits public lead submissions per client address"""
+    scope = 'intake_ip'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+class IntakeEmailThrottle(SlidingWindowRateThrottle):
+    """Limits public lead submissions per submitted email address, from any address"""
+    scope = 'intake_email'
+
+    def get_cache_key(self, request, view):
+        email = request.data.get('email')
+        if not isinstance(email, str) or not email.strip():
+            # Rejected by the serializer
+            return None
+        ident = hashlib.sha256(email.strip().lower().encode()).hexdigest()[:32]
+        return self.cache_format % {'scope': self.scope, 'ident': ident}